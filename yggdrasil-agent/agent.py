@@ -11,16 +11,46 @@ Goals:
 
 import json
 import os
+import fcntl
 import sys
+import functools
 import time
+import atexit
 import logging
 import asyncio
+import tempfile
+import threading
+import concurrent.futures
+from collections import defaultdict, deque
+from contextlib import contextmanager
 from pathlib import Path
 from datetime import datetime, timezone
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Iterator
 import urllib.request
 import urllib.error
 
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+except ImportError:
+    requests = None
+
+try:
+    import orjson
+    _loads = orjson.loads
+    _dumps = orjson.dumps
+except ImportError:
+    _loads = json.loads
+
+    def _dumps(obj: Any) -> bytes:
+        return json.dumps(obj).encode('utf-8')
+
+import prompts
+from beads_watch import BeadsFileWatcher
+from beads_sync import update_in_progress_index
+from llm_cache import ExactCache, SemanticCache, exact_cache_enabled, semantic_cache_enabled
+
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s [Agent] %(levelname)s: %(message)s'
@@ -43,6 +73,97 @@ def log_task(level: int, message: str):
     else:
         logger.log(level, message)
 
+
+CRUSH_CONFIG_PATH = Path.home() / '.local/share/crush/crush.json'
+
+
+@functools.lru_cache(maxsize=1)
+def _read_crush_key(mtime_ns: int) -> Optional[str]:
+    """Read the Anthropic key from crush config (cached per file mtime)"""
+    try:
+        with open(CRUSH_CONFIG_PATH) as f:
+            config = json.load(f)
+            return config.get('providers', {}).get('anthropic', {}).get('api_key')
+    except Exception as e:
+        logger.warning(f"Failed to read crush config: {e}")
+        return None
+
+
+@functools.lru_cache(maxsize=8)
+def _beeai_chat_model(name: str, base_url: Optional[str] = None, api_key: Optional[str] = None):
+    """
+    One BeeAI ChatModel per (model, endpoint, key).
+    
+    Agents routed to the same host share the instance (and its HTTP client)
+    instead of each building their own.
+    """
+    from beeai_framework.backend import ChatModel
+    
+    kwargs = {}
+    if base_url:
+        kwargs['base_url'] = base_url
+    if api_key:
+        kwargs['api_key'] = api_key
+    return ChatModel.from_name(name, **kwargs)
+
+
+def _host_concurrency() -> Dict[str, int]:
+    """Per-host concurrency limits from the Yggdrasil config ({} if unavailable)"""
+    try:
+        from config import load_config_section
+        return load_config_section('concurrency').to_dict()
+    except Exception as e:
+        logger.warning(f"Host concurrency config unavailable, using defaults: {e}")
+        return {}
+
+
+# Anthropic only caches prompt prefixes of at least ~1024 tokens; at roughly
+# four characters per token, shorter system prompts are sent unmarked
+PROMPT_CACHE_MIN_CHARS = 4096
+
+
+def _anthropic_system(system: str) -> Any:
+    """System prompt, marked with cache_control when long enough to be cached"""
+    if len(system) < PROMPT_CACHE_MIN_CHARS:
+        return system
+    return [{'type': 'text', 'text': system, 'cache_control': {'type': 'ephemeral'}}]
+
+
+# Task type detection rules, checked in order; first match wins.
+# (task_type, labels, title prefixes, title substrings)
+TASK_TYPE_RULES = (
+    # Code tasks (generation, refactoring, fixes)
+    ('code-generation', frozenset({'code-generation', 'code-refactor'}), ('code:', 'code task:'), ()),
+    # Text tasks
+    ('text-processing', frozenset({'text-processing', 'text-generation'}), (), ()),
+    # Specialized handlers
+    ('summarize', frozenset({'summarize'}), (), ('summarize',)),
+    ('reasoning', frozenset({'reasoning'}), (), ('analyze', 'explain')),
+)
+
+# Plain-LLM prompt template and LLMClient task type per detected task type
+LLM_PROMPTS = {
+    'code-generation': (prompts.CODE_PROMPT, 'code'),
+    'text-processing': (prompts.TEXT_PROMPT, 'text'),
+    'summarize': (prompts.SUMMARIZE_PROMPT, 'text'),
+    'reasoning': (prompts.REASONING_PROMPT, 'general'),
+    'general': (prompts.GENERAL_PROMPT, 'general'),
+}
+
+# Tasks with this label are non-urgent and go through the cloud batch API
+BATCH_LABEL = 'batch'
+BATCH_MAX_SIZE = 8
+BATCH_MAX_WAIT = 10.0  # seconds before a partial batch is flushed
+BATCH_POLL_INTERVAL = 30.0  # seconds between status checks of submitted batches
+
+ANTHROPIC_BATCHES_URL = 'https://api.anthropic.com/v1/messages/batches'
+
+# How long run_loop waits for in-flight tasks on shutdown before re-opening them
+SHUTDOWN_GRACE = 30.0
+
+# Beads directory found by the first BeadsClient, reused by later instances
+_discovered_beads_dir: Optional[Path] = None
+
 # BeeAI agents removed - using LLM router with host-based task routing instead
 
 
@@ -60,22 +181,77 @@ class LLMClient:
         self.anthropic_key = self._load_anthropic_key()
         self.cloud_model = 'claude-sonnet-4-20250514'
         
+        # Pooled keep-alive connections, reused across all LLM calls
+        self._session = self._create_session()
+        
+        # Recent per-host latencies (seconds) drive request hedging
+        self._latencies: Dict[str, deque] = defaultdict(lambda: deque(maxlen=50))
+        self._hedge_executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=4, thread_name_prefix='llm-hedge'
+        )
+        
+        # Opt-in response caches: exact match first, then semantic match
+        self.exact_cache = ExactCache() if exact_cache_enabled() else None
+        self.semantic_cache = None
+        if semantic_cache_enabled():
+            self.semantic_cache = SemanticCache()
+        
+    def close(self):
+        """Shut down the hedge pool and the pooled session"""
+        self._hedge_executor.shutdown(wait=False, cancel_futures=True)
+        if self._session is not None:
+            self._session.close()
+    
+    @staticmethod
+    def _create_session():
+        """Create a pooled HTTP session (None if requests is unavailable)"""
+        if requests is None:
+            return None
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=16,
+            max_retries=Retry(total=2, backoff_factor=0.3),
+        )
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+    
+    def _post_json(self, url: str, payload: Dict[str, Any], headers: Dict[str, str], timeout: int) -> Dict[str, Any]:
+        """POST a JSON payload and return the decoded response"""
+        if self._session is not None:
+            resp = self._session.post(url, json=payload, headers=headers, timeout=(10, timeout))
+            resp.raise_for_status()
+            return resp.json()
+        
+        data = json.dumps(payload).encode('utf-8')
+        req = urllib.request.Request(url, data=data, headers={'Content-Type': 'application/json', **headers})
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            return json.loads(resp.read().decode())
+    
+    def _get(self, url: str, headers: Dict[str, str], timeout: int) -> bytes:
+        """GET a URL and return the raw response body"""
+        if self._session is not None:
+            resp = self._session.get(url, headers=headers, timeout=(10, timeout))
+            resp.raise_for_status()
+            return resp.content
+        
+        req = urllib.request.Request(url, headers=headers)
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            return resp.read()
+    
     def _load_anthropic_key(self) -> Optional[str]:
         """Load Anthropic API key from environment or crush config"""
         key = os.environ.get('ANTHROPIC_API_KEY')
         if key:
             return key
             
-        # Try crush config
-        config_path = Path.home() / '.local/share/crush/crush.json'
-        if config_path.exists():
-            try:
-                with open(config_path) as f:
-                    config = json.load(f)
-                    return config.get('providers', {}).get('anthropic', {}).get('api_key')
-            except Exception as e:
-                logger.warning(f"Failed to read crush config: {e}")
-        return None
+        # Try crush config (re-read only when the file changes)
+        try:
+            mtime_ns = CRUSH_CONFIG_PATH.stat().st_mtime_ns
+        except OSError:
+            return None
+        return _read_crush_key(mtime_ns)
     
     def _call_local_llm(self, prompt: str, api_base: str, model: str, system: str = None) -> Optional[str]:
         """Call local LLM via OpenAI-compatible API (ramalama/llama.cpp)"""
@@ -92,26 +268,23 @@ class LLMClient:
         }
             
         try:
-            data = json.dumps(payload).encode('utf-8')
-            req = urllib.request.Request(url, data=data, headers={'Content-Type': 'application/json'})
-            with urllib.request.urlopen(req, timeout=120) as resp:
-                result = json.loads(resp.read().decode())
-                choices = result.get('choices', [])
-                if choices:
-                    return choices[0].get('text', '')
-                return None
+            result = self._post_json(url, payload, {}, timeout=120)
+            choices = result.get('choices', [])
+            if choices:
+                return choices[0].get('text', '')
+            return None
         except Exception as e:
             logger.warning(f"Local LLM call failed: {e}")
             return None
     
-    def _call_anthropic(self, prompt: str, system: str = None) -> Optional[str]:
-        """Call Anthropic Claude API"""
-        if not self.anthropic_key:
-            logger.warning("No Anthropic API key available")
-            return None
-            
-        url = 'https://api.anthropic.com/v1/messages'
-        
+    def _anthropic_headers(self) -> Dict[str, str]:
+        return {
+            'x-api-key': self.anthropic_key,
+            'anthropic-version': '2023-06-01'
+        }
+    
+    def _anthropic_params(self, prompt: str, system: str = None) -> Dict[str, Any]:
+        """Messages API parameters for a single prompt"""
         messages = [{'role': 'user', 'content': prompt}]
         payload = {
             'model': self.cloud_model,
@@ -119,41 +292,132 @@ class LLMClient:
             'messages': messages,
         }
         if system:
-            payload['system'] = system
+            payload['system'] = _anthropic_system(system)
+        return payload
+    
+    def _call_anthropic(self, prompt: str, system: str = None) -> Optional[str]:
+        """Call Anthropic Claude API"""
+        if not self.anthropic_key:
+            logger.warning("No Anthropic API key available")
+            return None
+            
+        url = 'https://api.anthropic.com/v1/messages'
+        payload = self._anthropic_params(prompt, system)
             
         try:
-            data = json.dumps(payload).encode('utf-8')
-            req = urllib.request.Request(url, data=data, headers={
-                'Content-Type': 'application/json',
-                'x-api-key': self.anthropic_key,
-                'anthropic-version': '2023-06-01'
-            })
-            with urllib.request.urlopen(req, timeout=60) as resp:
-                result = json.loads(resp.read().decode())
-                return result.get('content', [{}])[0].get('text', '')
+            result = self._post_json(url, payload, self._anthropic_headers(), timeout=60)
+            return result.get('content', [{}])[0].get('text', '')
         except Exception as e:
             logger.warning(f"Anthropic call failed: {e}")
             return None
     
+    def submit_batch(self, batch: List[tuple], system: str = None) -> Optional[str]:
+        """
+        Submit non-urgent prompts to the Message Batches API without waiting.
+        
+        Batches are billed at half price and amortize request overhead, at
+        the cost of latency (results can take minutes to hours); collect the
+        results with poll_batch().
+        
+        Args:
+            batch: (prompt, task_type) pairs
+            system: Optional system prompt shared by all requests
+        
+        Returns:
+            The batch id, or None without an Anthropic key
+        
+        Raises:
+            Exception: If the submission fails
+        """
+        if not self.anthropic_key:
+            return None
+        
+        payload = {
+            'requests': [
+                {'custom_id': f'req-{i}', 'params': self._anthropic_params(prompt, system)}
+                for i, (prompt, _) in enumerate(batch)
+            ]
+        }
+        job = self._post_json(ANTHROPIC_BATCHES_URL, payload, self._anthropic_headers(), timeout=60)
+        logger.info(f"Submitted Anthropic batch {job['id']} ({len(batch)} prompts)")
+        return job['id']
+    
+    def poll_batch(self, batch_id: str, size: int) -> Optional[List[Optional[str]]]:
+        """
+        Check a submitted batch once, without waiting.
+        
+        Args:
+            batch_id: Id returned by submit_batch()
+            size: Number of prompts in the batch
+        
+        Returns:
+            None while the batch is still processing. Once it has ended, one
+            entry per prompt in order: the response, "ERROR: ..." if the
+            request failed, or None if it never ran (expired or canceled).
+        
+        Raises:
+            Exception: If the status or results request fails
+        """
+        headers = self._anthropic_headers()
+        job = json.loads(self._get(f'{ANTHROPIC_BATCHES_URL}/{batch_id}', headers, timeout=60))
+        if job.get('processing_status') != 'ended':
+            return None
+        
+        responses = {}
+        for line in self._get(job['results_url'], headers, timeout=300).splitlines():
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            outcome = entry.get('result', {})
+            kind = outcome.get('type')
+            if kind == 'succeeded':
+                responses[entry['custom_id']] = outcome['message'].get('content', [{}])[0].get('text', '')
+            elif kind in ('expired', 'canceled'):
+                responses[entry['custom_id']] = None
+            else:
+                responses[entry['custom_id']] = f"ERROR: batch request {kind or 'failed'}"
+        return [responses.get(f'req-{i}', 'ERROR: missing batch result') for i in range(size)]
+    
     def generate(self, prompt: str, task_type: str = 'general', system: str = None) -> str:
+        """Generate response, serving repeated or similar prompts from cache"""
+        if self.exact_cache:
+            cached = self.exact_cache.get(task_type, prompt, system)
+            if cached is not None:
+                logger.info("Exact cache hit")
+                return cached
+        
+        if self.semantic_cache:
+            cached = self.semantic_cache.lookup(task_type, prompt, system)
+            if cached is not None:
+                logger.info("Semantic cache hit")
+                return cached
+        
+        result = self._generate_uncached(prompt, task_type, system)
+        
+        if not result.startswith('ERROR:'):
+            if self.exact_cache:
+                self.exact_cache.set(task_type, prompt, system, result)
+            if self.semantic_cache:
+                self.semantic_cache.add(task_type, prompt, system, result)
+        return result
+    
+    def _generate_uncached(self, prompt: str, task_type: str = 'general', system: str = None) -> str:
         """Generate response with router-based host selection and cloud fallback"""
         
-        # Get best host for this task type
-        host = self.router.get_host_for_task(task_type)
+        # Best host for this task type, plus the runner-up for hedging
+        hosts = self.router.get_hosts_for_task(task_type)
         
-        if host:
-            logger.info(f"Trying {host.name} ({host.model})...")
-            result = self._call_local_llm(prompt, host.api_base, host.model, system)
+        if hosts:
+            backup = hosts[1] if len(hosts) > 1 else None
+            result = self._call_with_hedge(hosts[0], backup, prompt, system)
             if result:
-                logger.info(f"Local LLM ({host.name}) succeeded")
                 return result
             
-            # Mark host as unhealthy and try to find another
-            host.healthy = False
+            # Failed hosts are marked unhealthy; try whatever is left
             host = self.router.get_host_for_task(task_type)
             if host:
                 logger.info(f"Trying backup: {host.name} ({host.model})...")
-                result = self._call_local_llm(prompt, host.api_base, host.model, system)
+                result = self._timed_call(host, prompt, system)
                 if result:
                     logger.info(f"Backup LLM ({host.name}) succeeded")
                     return result
@@ -166,14 +430,78 @@ class LLMClient:
             return result
         
         return "ERROR: All LLM hosts and cloud fallback failed"
+    
+    def _timed_call(self, host, prompt: str, system: str = None) -> Optional[str]:
+        """Call a local host and record its latency on success"""
+        start = time.monotonic()
+        result = self._call_local_llm(prompt, host.api_base, host.model, system)
+        if result:
+            self._latencies[host.name].append(time.monotonic() - start)
+        return result
+    
+    def _hedge_delay(self, host) -> Optional[float]:
+        """1.5x the host's recent p95 latency, or None without enough samples"""
+        samples = self._latencies[host.name]
+        if len(samples) < 5:
+            return None
+        ordered = sorted(samples)
+        return ordered[int(0.95 * (len(ordered) - 1))] * 1.5
+    
+    def _call_with_hedge(self, primary, backup, prompt: str, system: str = None) -> Optional[str]:
+        """
+        Call the primary host, racing the backup if the primary runs slow.
+        
+        The backup is only started once the primary has been running for
+        longer than its hedge delay. The first non-empty result wins; the loser is left to finish
+        in the background since a blocking HTTP call cannot be cancelled.
+        Hosts that fail are marked unhealthy.
+        """
+        delay = self._hedge_delay(primary) if backup else None
+        if delay is None:
+            logger.info(f"Trying {primary.name} ({primary.model})...")
+            result = self._timed_call(primary, prompt, system)
+            if result:
+                logger.info(f"Local LLM ({primary.name}) succeeded")
+                return result
+            primary.healthy = False
+            return None
+        
+        logger.info(f"Trying {primary.name} ({primary.model}), hedging after {delay:.1f}s...")
+        started = threading.Event()
+        
+        def run_primary():
+            started.set()
+            return self._timed_call(primary, prompt, system)
+        
+        future = self._hedge_executor.submit(run_primary)
+        future.add_done_callback(lambda _: started.set())  # cancelled on close()
+        futures = {future: primary}
+        # Time queued behind other calls doesn't count against the delay
+        started.wait()
+        done, _ = concurrent.futures.wait(futures, timeout=delay)
+        if not done:
+            logger.info(f"{primary.name} is slow, racing {backup.name} ({backup.model})")
+            futures[self._hedge_executor.submit(self._timed_call, backup, prompt, system)] = backup
+        
+        for future in concurrent.futures.as_completed(futures):
+            host = futures[future]
+            result = future.result()
+            if result:
+                logger.info(f"Local LLM ({host.name}) succeeded")
+                return result
+            host.healthy = False
+        return None
 
 
 class BeadsClient:
     """Read and update Beads tasks"""
     
     def __init__(self, beads_dir: str = None):
+        global _discovered_beads_dir
         if beads_dir:
             self.beads_dir = Path(beads_dir)
+        elif _discovered_beads_dir and (_discovered_beads_dir / '.beads/issues.jsonl').exists():
+            self.beads_dir = _discovered_beads_dir
         else:
             # Try common locations (container, then local)
             for path in [
@@ -184,100 +512,339 @@ class BeadsClient:
             ]:
                 if (path / '.beads/issues.jsonl').exists():
                     self.beads_dir = path
+                    _discovered_beads_dir = path
                     break
             else:
                 raise FileNotFoundError("Could not find Beads directory")
         
         self.issues_file = self.beads_dir / '.beads/issues.jsonl'
         self.lock_file = self.beads_dir / '.beads/issues.jsonl.lock'
+        self._lock_fd = open(self.lock_file, 'a')
+        self._write_lock = threading.Lock()
         logger.info(f"Using Beads at: {self.beads_dir}")
+        
+        # task_id -> byte offset of its line, filled by iter_ready_tasks
+        self._id_offsets: Dict[str, int] = {}
+        # End of the leading run of lines known not to be ready
+        self._ready_cursor = 0
+        self._ready_file_id = None
+        # Bytes just before the cursor and (mtime, size) when it was saved,
+        # to detect the file being rewritten under the cursor
+        self._ready_tail = b''
+        self._ready_mtime_size = None
+        # get_ready_tasks result and the file stat it was computed from
+        self._ready_stat = None
+        self._cached_ready: List[Dict[str, Any]] = []
+        self._scan_failed = False
+        self.compact()
     
     def get_ready_tasks(self) -> List[Dict[str, Any]]:
-        """Get tasks that are open and ready to work"""
+        """
+        Get tasks that are open and ready to work.
+        
+        The result is cached against the file's (inode, mtime, size); an
+        idle poll on an unchanged file costs a single stat().
+        """
+        try:
+            st = os.stat(self.issues_file)
+        except OSError as e:
+            logger.warning(f"Error reading Beads: {e}")
+            return []
+        key = (st.st_ino, st.st_mtime_ns, st.st_size)
+        if key == self._ready_stat:
+            return list(self._cached_ready)
+        
+        self._scan_failed = False
+        tasks = list(self.iter_ready_tasks())
+        if not self._scan_failed:
+            # Only a complete scan is safe to reuse
+            self._ready_stat = key
+            self._cached_ready = tasks
+        return list(tasks)
+    
+    def iter_ready_tasks(self) -> Iterator[Dict[str, Any]]:
+        """
+        Yield tasks that are open and ready to work, in file order.
+        
+        Scanning resumes from _ready_cursor, the end of the leading run of
+        complete lines already known not to be ready, so idle polls only
+        look at the tail of the file. The cursor resets when the file is
+        replaced, shrinks, or changes without growing, and when the bytes
+        just before it differ from the last scan (a replacement can reuse
+        the old inode number).
+        """
+        try:
+            st = os.stat(self.issues_file)
+        except OSError as e:
+            logger.warning(f"Error reading Beads: {e}")
+            return
+        file_id = (st.st_dev, st.st_ino)
+        if (file_id != self._ready_file_id
+                or st.st_size < self._ready_cursor
+                or (self._ready_mtime_size is not None
+                    and st.st_size == self._ready_mtime_size[1]
+                    and st.st_mtime_ns != self._ready_mtime_size[0])):
+            self._ready_file_id = file_id
+            self._ready_cursor = 0
+        
+        try:
+            with open(self.issues_file, 'rb') as f:
+                if self._ready_cursor:
+                    f.seek(self._ready_cursor - len(self._ready_tail))
+                    if f.read(len(self._ready_tail)) != self._ready_tail:
+                        self._ready_cursor = 0
+                try:
+                    yield from self._scan_ready(f)
+                finally:
+                    # Remember where the cursor ended up for the next resume
+                    start = max(0, self._ready_cursor - 64)
+                    f.seek(start)
+                    self._ready_tail = f.read(self._ready_cursor - start)
+                    self._ready_mtime_size = (st.st_mtime_ns, st.st_size)
+        except Exception as e:
+            self._scan_failed = True
+            logger.warning(f"Error reading Beads: {e}")
+    
+    def _scan_ready(self, f) -> Iterator[Dict[str, Any]]:
+        """iter_ready_tasks' scan from _ready_cursor, advancing it past non-ready lines"""
+        offset = self._ready_cursor
+        f.seek(offset)
+        advancing = True
+        for line in f:
+            line_offset = offset
+            offset += len(line)
+            if not line.endswith(b'\n'):
+                advancing = False  # partial write in progress
+            # Cheap screen: most lines are closed tasks and never
+            # mention "open" at all, so skip parsing them. The
+            # substring can false-positive, hence the exact checks.
+            if b'"open"' in line:
+                try:
+                    task = _loads(line)
+                except json.JSONDecodeError:
+                    task = None
+                if task and task.get('status') == 'open' and task.get('issue_type') != 'epic':
+                    advancing = False
+                    self._id_offsets[task['id']] = line_offset
+                    yield task
+                    continue
+            if advancing:
+                self._ready_cursor = offset
+    
+    def get_completed_tasks(self) -> List[Dict[str, Any]]:
+        """Get closed tasks that have a stored result"""
         tasks = []
         try:
-            with open(self.issues_file) as f:
+            with open(self.issues_file, 'rb') as f:
                 for line in f:
-                    line = line.strip()
-                    if not line:
+                    if b'"closed"' not in line or b'"result"' not in line:
                         continue
                     try:
-                        task = json.loads(line)
-                        if task.get('status') == 'open' and task.get('issue_type') != 'epic':
-                            tasks.append(task)
+                        task = _loads(line)
                     except json.JSONDecodeError:
                         continue
+                    if task.get('status') == 'closed' and task.get('result'):
+                        tasks.append(task)
         except Exception as e:
             logger.warning(f"Error reading Beads: {e}")
         return tasks
     
+    @contextmanager
+    def _issues_lock(self, purpose: str):
+        """
+        Hold the issues.jsonl lock.
+        
+        Waits in a blocking flock so the kernel queues writers, on a lock
+        file that stays open and is never unlinked (unlinking lets a new
+        writer lock a fresh inode while the old one is still held). The
+        thread lock serialises workers sharing this client, since flock on
+        one open file does not exclude other threads.
+        """
+        with self._write_lock:
+            try:
+                fcntl.flock(self._lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                logger.debug(f"Waiting for Beads lock ({purpose})")
+                fcntl.flock(self._lock_fd, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+    
     def update_task(self, task_id: str, status: str, result: str = None):
         """Update task status in Beads (with locking)"""
-        import fcntl
-        import time
+        # Loop invariants, computed once rather than per line
+        now = datetime.now(timezone.utc).isoformat()
+        closing = status == 'closed'
+        stored_result = result[:32000] if result else None  # Allow up to 32KB for detailed outputs
         
-        # Try to acquire lock with timeout
-        lock_acquired = False
-        for attempt in range(10):
-            try:
-                lock_fd = open(self.lock_file, 'w')
-                fcntl.flock(lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
-                lock_acquired = True
-                break
-            except (IOError, OSError):
-                if attempt == 9:
-                    logger.warning(f"Could not acquire lock for {task_id}, proceeding anyway")
-                    lock_fd = None
-                    break
-                time.sleep(0.1)
+        def apply(task: Dict[str, Any]) -> None:
+            task['status'] = status
+            task['updated_at'] = now
+            if closing:
+                task['closed_at'] = now
+            if stored_result:
+                task['result'] = stored_result
+        
+        with self._issues_lock(task_id):
+            # Same-size in-place writes can land within one mtime tick
+            self._ready_stat = None
+            if self._update_in_place(task_id, apply) or self._rewrite_with_update(task_id, apply):
+                logger.info(f"Updated task {task_id} to {status}")
+                update_in_progress_index(self.issues_file, task_id, status, self._id_offsets.get(task_id))
+            if status == 'open':
+                # A re-opened task may sit before the scan cursor
+                self._ready_cursor = 0
+    
+    def _update_in_place(self, task_id: str, apply) -> bool:
+        """
+        Update one record using the byte offset recorded by get_ready_tasks.
+        
+        If the new record fits in the old line it is overwritten and padded
+        with spaces. Otherwise the new record is appended and the old line
+        blanked out (a tombstone that readers skip as an empty line).
+        Returns False when the offset is unknown or stale.
+        """
+        offset = self._id_offsets.get(task_id)
+        if offset is None:
+            return False
         
         try:
-            # Read existing data
-            lines = []
-            try:
-                with open(self.issues_file) as f:
-                    for line in f:
-                        line = line.strip()
-                        if not line:
-                            continue
+            with open(self.issues_file, 'r+b') as f:
+                f.seek(offset)
+                old = f.readline()
+                try:
+                    task = _loads(old)
+                except json.JSONDecodeError:
+                    return False
+                if task.get('id') != task_id:
+                    return False
+                
+                apply(task)
+                record = _dumps(task)
+                old_len = len(old.rstrip(b'\n'))
+                
+                if len(record) <= old_len:
+                    f.seek(offset)
+                    f.write(record.ljust(old_len))
+                    return True
+                
+                # Append the new record first so a crash leaves a duplicate
+                # rather than losing the task, then tombstone the old line
+                end = f.seek(0, os.SEEK_END)
+                f.seek(end - 1)
+                prefix = b'' if f.read(1) == b'\n' else b'\n'
+                f.write(prefix + record + b'\n')
+                f.seek(offset)
+                f.write(b' ' * old_len)
+                self._id_offsets[task_id] = end + len(prefix)
+                return True
+        except Exception as e:
+            logger.warning(f"In-place update of {task_id} failed, rewriting file: {e}")
+            return False
+    
+    def _rewrite_with_update(self, task_id: str, apply) -> bool:
+        """
+        Rewrite the whole file with one task updated (drops tombstones).
+        
+        Lines are streamed straight into a temp file in the same directory
+        and swapped in with os.replace, so memory stays flat regardless of
+        backlog size.
+        """
+        id_marker = _dumps(task_id)
+        temp = None
+        try:
+            with open(self.issues_file, 'rb') as src, tempfile.NamedTemporaryFile(
+                'wb', dir=self.issues_file.parent, prefix='.issues.', suffix='.tmp', delete=False
+            ) as temp:
+                for line in src:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    # Lines that cannot be the target are copied verbatim
+                    if id_marker in line:
                         try:
-                            task = json.loads(line)
+                            task = _loads(line)
                             if task['id'] == task_id:
-                                task['status'] = status
-                                task['updated_at'] = datetime.now(timezone.utc).isoformat()
-                                if status == 'closed':
-                                    task['closed_at'] = datetime.now(timezone.utc).isoformat()
-                                if result:
-                                    task['result'] = result[:32000]  # Allow up to 32KB for detailed outputs
-                            lines.append(json.dumps(task))
-                        except json.JSONDecodeError:
-                            lines.append(line)
-            except Exception as e:
-                logger.error(f"Error reading Beads for update: {e}")
-                return
-            
-            # Write atomically (write to temp file first, then rename)
-            temp_file = self.issues_file.with_suffix('.jsonl.tmp')
+                                apply(task)
+                                line = _dumps(task)
+                        except (json.JSONDecodeError, KeyError):
+                            pass
+                    temp.write(line + b'\n')
+            # NamedTemporaryFile is created 0600; keep the original mode
+            os.chmod(temp.name, os.stat(self.issues_file).st_mode & 0o777)
+            os.replace(temp.name, self.issues_file)
+        except Exception as e:
+            logger.error(f"Error rewriting Beads: {e}")
+            if temp is not None and os.path.exists(temp.name):
+                os.unlink(temp.name)
+            return False
+        
+        # Offsets no longer line up once the file is rewritten
+        self._id_offsets = {}
+        self._ready_cursor = 0
+        return True
+    
+    def _write_lines(self, lines: List[bytes]) -> bool:
+        """Write atomically (write to temp file first, then rename)"""
+        temp_file = self.issues_file.with_suffix('.jsonl.tmp')
+        try:
+            with open(temp_file, 'wb') as f:
+                for line in lines:
+                    f.write(line + b'\n')
+            os.chmod(temp_file, os.stat(self.issues_file).st_mode & 0o777)
+            # Atomic rename
+            temp_file.replace(self.issues_file)
+            self._ready_cursor = 0
+            return True
+        except Exception as e:
+            logger.error(f"Error writing Beads: {e}")
+            if temp_file.exists():
+                temp_file.unlink()
+            return False
+    
+    def compact(self, min_tombstone_ratio: float = 0.2) -> bool:
+        """
+        Drop tombstoned lines and superseded duplicates from issues.jsonl.
+        
+        Only rewrites when blank lines exceed min_tombstone_ratio of the file.
+        If a record appears twice (crash between append and tombstone), the
+        later one wins.
+        """
+        with self._issues_lock('compaction'):
             try:
-                with open(temp_file, 'w') as f:
-                    for line in lines:
-                        f.write(line + '\n')
-                # Atomic rename
-                temp_file.replace(self.issues_file)
+                with open(self.issues_file, 'rb') as f:
+                    lines = [line.strip() for line in f]
             except Exception as e:
-                logger.error(f"Error writing Beads: {e}")
-                if temp_file.exists():
-                    temp_file.unlink()
+                logger.warning(f"Error reading Beads for compaction: {e}")
+                return False
             
-            logger.info(f"Updated task {task_id} to {status}")
-        finally:
-            if lock_acquired and lock_fd:
+            tombstones = sum(1 for line in lines if not line)
+            if not lines or tombstones <= min_tombstone_ratio * len(lines):
+                return False
+            
+            latest = {}
+            kept = []
+            for line in lines:
+                if not line:
+                    continue
                 try:
-                    fcntl.flock(lock_fd, fcntl.LOCK_UN)
-                    lock_fd.close()
-                    self.lock_file.unlink() if self.lock_file.exists() else None
-                except Exception:
-                    pass
+                    task_id = _loads(line).get('id')
+                except json.JSONDecodeError:
+                    task_id = None
+                if task_id is not None:
+                    latest[task_id] = len(kept)
+                kept.append((task_id, line))
+            compacted = [
+                line for i, (task_id, line) in enumerate(kept)
+                if task_id is None or latest[task_id] == i
+            ]
+            
+            self._id_offsets = {}
+            if self._write_lines(compacted):
+                logger.info(f"Compacted Beads: dropped {len(lines) - len(compacted)} stale lines")
+                return True
+            return False
 
 
 class YggdrasilAgent:
@@ -295,6 +862,15 @@ class YggdrasilAgent:
         # Track which agents are busy (agent_name -> Future)
         self.busy_agents = {}
         
+        # Cloud batches awaiting results (batch id -> claimed tasks), kept
+        # on disk so a restarted dispatcher resumes polling them
+        self._batch_lock = threading.Lock()
+        self.cloud_batches = self._load_cloud_batches()
+        
+        # Set when a task finishes or issues.jsonl changes; run_loop waits
+        # on it instead of sleeping out the poll interval
+        self.ready_event = threading.Event()
+        
         # Task type handlers (use LLM router for host-based routing)
         self.handlers = {
             'code-generation': self._handle_code_generation,
@@ -312,29 +888,61 @@ class YggdrasilAgent:
             'summarize': 'text',
             'general': 'reasoning',  # general tasks use reasoning agent
         }
+        
+        # One long-lived event loop for async agent/artifact calls. Handlers
+        # run on worker threads, so the loop lives on its own thread and
+        # coroutines are submitted with run_coroutine_threadsafe.
+        self._loop = asyncio.new_event_loop()
+        self._loop_thread = threading.Thread(
+            target=self._loop.run_forever, name='agent-event-loop', daemon=True
+        )
+        self._loop_thread.start()
+        atexit.register(self.close)
+        
+        self._warm_semantic_cache()
+    
+    def _run_async(self, coro):
+        """Run a coroutine on the shared event loop and wait for its result"""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+    
+    def close(self):
+        """Stop the shared event loop and release the LLM client"""
+        if self._loop.is_closed():
+            return
+        self.llm.close()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._loop_thread.join(timeout=5)
+        if not self._loop.is_running():
+            self._loop.close()
     
     def _init_beeai_agents(self):
         """Initialize BeeAI agents with task-specific LLM routing"""
         try:
-            from beeai_framework.backend import ChatModel
-            import os
+            from beeai_agents import CodeGenerationAgent, ReasoningAgent, TextProcessingAgent
             
             # Cloud fallback: Anthropic (requires API key)
             self.cloud_llm = None
             if self.llm.anthropic_key:
                 try:
-                    os.environ['ANTHROPIC_API_KEY'] = self.llm.anthropic_key
-                    self.cloud_llm = ChatModel.from_name('anthropic:claude-sonnet-4-20250514')
+                    self.cloud_llm = _beeai_chat_model(
+                        'anthropic:claude-sonnet-4-20250514',
+                        api_key=self.llm.anthropic_key,
+                    )
                 except Exception as e:
                     logger.warning(f"Failed to initialize Anthropic: {e}")
             
+            # Per-host limits bound each agent's process_batch fan-out
+            limits = _host_concurrency()
+            
             # Create task-specific agents with appropriate LLM hosts
             # Code agent -> surtr-code (granite-code)
             code_host = self.llm.router.get_host_for_task('code-generation')
             if code_host:
-                os.environ['OLLAMA_API_BASE'] = code_host.api_base
-                code_llm = ChatModel.from_name(f'ollama:{code_host.model}')
-                self.code_agent = CodeGenerationAgent(code_llm, self.cloud_llm)
+                code_llm = _beeai_chat_model(f'ollama:{code_host.model}', code_host.api_base)
+                self.code_agent = CodeGenerationAgent(
+                    code_llm, self.cloud_llm, self.llm.exact_cache, self.llm.semantic_cache,
+                    max_concurrency=limits.get(code_host.name),
+                )
                 logger.info(f"Code agent using {code_host.name} ({code_host.model})")
             else:
                 self.code_agent = None
@@ -342,9 +950,11 @@ class YggdrasilAgent:
             # Reasoning agent -> surtr-reasoning (gpt-oss) 
             reasoning_host = self.llm.router.get_host_for_task('reasoning')
             if reasoning_host:
-                os.environ['OLLAMA_API_BASE'] = reasoning_host.api_base
-                reasoning_llm = ChatModel.from_name(f'ollama:{reasoning_host.model}')
-                self.reasoning_agent = ReasoningAgent(reasoning_llm, self.cloud_llm)
+                reasoning_llm = _beeai_chat_model(f'ollama:{reasoning_host.model}', reasoning_host.api_base)
+                self.reasoning_agent = ReasoningAgent(
+                    reasoning_llm, self.cloud_llm, self.llm.exact_cache, self.llm.semantic_cache,
+                    max_concurrency=limits.get(reasoning_host.name),
+                )
                 logger.info(f"Reasoning agent using {reasoning_host.name} ({reasoning_host.model})")
             else:
                 self.reasoning_agent = None
@@ -352,9 +962,11 @@ class YggdrasilAgent:
             # Text agent -> fenrir-chat (qwen)
             text_host = self.llm.router.get_host_for_task('text-processing')
             if text_host:
-                os.environ['OLLAMA_API_BASE'] = text_host.api_base
-                text_llm = ChatModel.from_name(f'ollama:{text_host.model}')
-                self.text_agent = TextProcessingAgent(text_llm, self.cloud_llm)
+                text_llm = _beeai_chat_model(f'ollama:{text_host.model}', text_host.api_base)
+                self.text_agent = TextProcessingAgent(
+                    text_llm, self.cloud_llm, self.llm.exact_cache, self.llm.semantic_cache,
+                    max_concurrency=limits.get(text_host.name),
+                )
                 logger.info(f"Text agent using {text_host.name} ({text_host.model})")
             else:
                 self.text_agent = None
@@ -370,44 +982,59 @@ class YggdrasilAgent:
     
     def _detect_task_type(self, task: Dict[str, Any]) -> str:
         """Detect task type from labels or title"""
-        labels = task.get('labels', [])
+        labels = frozenset(task.get('labels') or ())
         title = task.get('title', '').lower()
         
-        # Code tasks (generation, refactoring, fixes)
-        if 'code-generation' in labels or 'code-refactor' in labels or title.startswith('code:') or title.startswith('code task:'):
-            return 'code-generation'
-        # Text tasks
-        if 'text-processing' in labels or 'text-generation' in labels:
-            return 'text-processing'
-        # Specialized handlers
-        if 'summarize' in labels or 'summarize' in title:
-            return 'summarize'
-        if 'reasoning' in labels or 'analyze' in title or 'explain' in title:
-            return 'reasoning'
+        for task_type, rule_labels, title_prefixes, title_words in TASK_TYPE_RULES:
+            if (not labels.isdisjoint(rule_labels)
+                    or (title_prefixes and title.startswith(title_prefixes))
+                    or any(word in title for word in title_words)):
+                return task_type
         
         return 'general'
     
+    def _llm_prompt(self, task: Dict[str, Any], task_type: str) -> tuple:
+        """
+        Build the plain-LLM prompt for a task.
+        
+        Returns:
+            (prompt, llm_task_type) as passed to LLMClient.generate
+        """
+        template, llm_task_type = LLM_PROMPTS.get(task_type, (prompts.GENERAL_PROMPT, 'general'))
+        return prompts.render_prompt(template, task), llm_task_type
+    
+    def _warm_semantic_cache(self) -> None:
+        """Seed an empty semantic cache from closed tasks that have results"""
+        cache = self.llm.semantic_cache
+        if not cache or not cache.available or len(cache):
+            return
+        
+        entries = []
+        for task in self.beads.get_completed_tasks():
+            result = task.get('result')
+            if not result or result.startswith('ERROR:'):
+                continue
+            prompt, llm_task_type = self._llm_prompt(task, self._detect_task_type(task))
+            entries.append((llm_task_type, prompt, None, result))
+        
+        if entries:
+            cache.add_many(entries)
+            logger.info(f"Warmed semantic cache with {len(entries)} completed tasks")
+    
     def _handle_code_generation(self, task: Dict[str, Any]) -> str:
         """Generate code based on task description"""
         task_id = task.get('id')
-        description = task.get('description', '')
-        title = task.get('title', '')
         
         # Use BeeAI if available
         if self.use_beeai and self.code_agent:
             try:
-                prompt = f"""Generate code for the following task:
-
-Title: {title}
-Description: {description}
-
-Provide complete, working code with comments. Include any necessary imports."""
+                prompt = prompts.render_prompt(prompts.CODE_PROMPT, task)
                 
-                result = asyncio.run(self.code_agent.process(prompt))
+                result = self._run_async(self.code_agent.process(prompt))
                 
                 # Auto-save artifact if output path specified
                 try:
-                    asyncio.run(self.artifact_handler.handle_agent_output(
+                    self._run_async(self.artifact_handler.handle_agent_output(
                         task, result, artifact_type='code'
                     ))
                 except Exception as e:
@@ -418,18 +1045,12 @@ Provide complete, working code with comments. Include any necessary imports."""
                 logger.warning(f"BeeAI code generation failed: {e}, falling back to simple LLM")
         
         # Fallback to simple LLM
-        prompt = f"""Generate code for the following task:
-
-Title: {title}
-Description: {description}
-
-Provide complete, working code with comments. Include any necessary imports."""
-        
-        result = self.llm.generate(prompt, task_type='code')
+        prompt, llm_task_type = self._llm_prompt(task, 'code-generation')
+        result = self.llm.generate(prompt, task_type=llm_task_type)
         
         # Auto-save with simple LLM result too
         try:
-            asyncio.run(self.artifact_handler.handle_agent_output(
+            self._run_async(self.artifact_handler.handle_agent_output(
                 task, result, artifact_type='code'
             ))
         except Exception as e:
@@ -439,99 +1060,66 @@ Provide complete, working code with comments. Include any necessary imports."""
     
     def _handle_text_processing(self, task: Dict[str, Any]) -> str:
         """Process text (summarize, extract, rewrite, etc.)"""
-        description = task.get('description', '')
-        title = task.get('title', '')
-        
         # Use BeeAI if available
         if self.use_beeai and self.text_agent:
             try:
-                prompt = f"""Task: {title}
-
-{description}
-
-Use tools as needed to read input files or write results."""
+                prompt = prompts.render_prompt(prompts.TEXT_TOOLS_PROMPT, task)
                 
-                result = asyncio.run(self.text_agent.process(prompt))
+                result = self._run_async(self.text_agent.process(prompt))
                 return result
             except Exception as e:
                 logger.warning(f"BeeAI text processing failed: {e}, falling back to simple LLM")
         
         # Fallback to simple LLM
-        prompt = description
-        return self.llm.generate(prompt, task_type='text')
+        prompt, llm_task_type = self._llm_prompt(task, 'text-processing')
+        return self.llm.generate(prompt, task_type=llm_task_type)
     
     def _handle_summarize(self, task: Dict[str, Any]) -> str:
         """Summarize content"""
-        description = task.get('description', '')
-        
         # Use BeeAI if available
         if self.use_beeai and self.reasoning_agent:
             try:
-                prompt = f"Please summarize the following:\n\n{description}"
-                result = asyncio.run(self.reasoning_agent.process(prompt))
+                prompt = prompts.render_prompt(prompts.SUMMARIZE_PROMPT, task)
+                result = self._run_async(self.reasoning_agent.process(prompt))
                 return result
             except Exception as e:
                 logger.warning(f"BeeAI summarization failed: {e}, falling back to simple LLM")
         
         # Fallback to simple LLM
-        prompt = f"Please summarize the following:\n\n{description}"
-        return self.llm.generate(prompt, task_type='text')
+        prompt, llm_task_type = self._llm_prompt(task, 'summarize')
+        return self.llm.generate(prompt, task_type=llm_task_type)
     
     def _handle_reasoning(self, task: Dict[str, Any]) -> str:
         """Handle complex reasoning tasks"""
-        description = task.get('description', '')
-        title = task.get('title', '')
-        
         # Use BeeAI if available
         if self.use_beeai and self.reasoning_agent:
             try:
-                prompt = f"""Task: {title}
-
-{description}
-
-Provide thorough analysis and reasoning."""
+                prompt = prompts.render_prompt(prompts.REASONING_AGENT_PROMPT, task)
                 
-                result = asyncio.run(self.reasoning_agent.process(prompt))
+                result = self._run_async(self.reasoning_agent.process(prompt))
                 return result
             except Exception as e:
                 logger.warning(f"BeeAI reasoning failed: {e}, falling back to simple LLM")
         
         # Fallback to simple LLM
-        prompt = f"""Task: {title}
-
-{description}
-
-Please analyze this thoroughly and provide clear reasoning."""
-        
-        return self.llm.generate(prompt, task_type='general')
+        prompt, llm_task_type = self._llm_prompt(task, 'reasoning')
+        return self.llm.generate(prompt, task_type=llm_task_type)
     
     def _handle_general(self, task: Dict[str, Any]) -> str:
         """Handle general tasks"""
-        description = task.get('description', '')
-        title = task.get('title', '')
-        
         # Use BeeAI if available and has agents
         if self.use_beeai and self.reasoning_agent:
             try:
-                prompt = f"""Task: {title}
-
-{description}
-
-Please complete this task and provide a clear response."""
+                prompt = prompts.render_prompt(prompts.GENERAL_PROMPT, task)
                 
-                result = asyncio.run(self.reasoning_agent.process(prompt))
+                result = self._run_async(self.reasoning_agent.process(prompt))
                 return result
             except Exception as e:
                 logger.warning(f"BeeAI general handling failed: {e}, falling back to simple LLM")
         
         # Fallback to simple LLM
-        prompt = f"""Task: {title}
-
-{description}
-
-Please complete this task and provide a clear response."""
-
-        return self.llm.generate(prompt, task_type='general')
+        prompt, llm_task_type = self._llm_prompt(task, 'general')
+        return self.llm.generate(prompt, task_type=llm_task_type)
     
     def process_task(self, task: Dict[str, Any]) -> str:
         """Process a single task"""
@@ -564,24 +1152,157 @@ Please complete this task and provide a clear response."""
     
     def run_once(self) -> bool:
         """Process one ready task. Returns True if a task was processed."""
-        tasks = self.beads.get_ready_tasks()
+        task = next(self.beads.iter_ready_tasks(), None)
         
-        if not tasks:
+        if task is None:
             logger.info("No ready tasks")
             return False
         
-        task = tasks[0]
         self.process_task(task)
         return True
     
+    def _batches_file(self) -> Path:
+        return self.beads.beads_dir / '.beads/anthropic_batches.json'
+    
+    def _load_cloud_batches(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Submitted, uncollected cloud batches (batch id -> claimed tasks)"""
+        try:
+            with open(self._batches_file()) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable batch state: {e}")
+            return {}
+    
+    def _save_cloud_batches(self) -> None:
+        """Persist cloud_batches (temp file + os.replace); caller holds _batch_lock"""
+        path = self._batches_file()
+        temp = path.with_suffix('.json.tmp')
+        try:
+            with open(temp, 'w') as f:
+                json.dump(self.cloud_batches, f)
+            os.replace(temp, path)
+        except OSError as e:
+            logger.warning(f"Failed to save batch state: {e}")
+    
+    def _release_tasks(self, task_ids) -> None:
+        """Put claimed tasks back to open so a later run picks them up"""
+        for task_id in task_ids:
+            try:
+                self.beads.update_task(task_id, 'open')
+            except Exception as e:
+                logger.error(f"Failed to re-open {task_id}: {e}")
+    
+    def _submit_batch(self, tasks: List[Dict[str, Any]]) -> None:
+        """
+        Submit already-claimed non-urgent tasks as one cloud batch.
+        
+        The batch id is recorded in .beads/anthropic_batches.json and the
+        results are collected by _poll_batches, after a restart if need be.
+        Without an Anthropic key the tasks are generated one by one instead;
+        if the submission fails they are re-opened.
+        """
+        batch = [self._llm_prompt(task, self._detect_task_type(task)) for task in tasks]
+        try:
+            batch_id = self.llm.submit_batch(batch)
+        except Exception as e:
+            logger.warning(f"Anthropic batch submission failed, re-opening tasks: {e}")
+            self._release_tasks(task['id'] for task in tasks)
+            return
+        
+        if batch_id is None:
+            results = [self.llm.generate(prompt, task_type) for prompt, task_type in batch]
+            self._finish_batch_tasks(tasks, results)
+            return
+        
+        with self._batch_lock:
+            self.cloud_batches[batch_id] = tasks
+            self._save_cloud_batches()
+    
+    def _poll_batches(self) -> None:
+        """Check each submitted batch once and close out the ones that ended"""
+        with self._batch_lock:
+            batches = list(self.cloud_batches.items())
+        
+        for batch_id, tasks in batches:
+            try:
+                results = self.llm.poll_batch(batch_id, len(tasks))
+            except Exception as e:
+                logger.warning(f"Polling Anthropic batch {batch_id} failed: {e}")
+                continue
+            if results is None:
+                continue
+            
+            self._finish_batch_tasks(tasks, results)
+            with self._batch_lock:
+                self.cloud_batches.pop(batch_id, None)
+                self._save_cloud_batches()
+    
+    def _finish_batch_tasks(self, tasks: List[Dict[str, Any]], results: List[Optional[str]]) -> None:
+        """Close or block each batched task with its own result"""
+        for task, result in zip(tasks, results):
+            task_id = task['id']
+            if result is None:
+                # Expired or canceled before it ran; back into the queue
+                self.beads.update_task(task_id, 'open')
+                continue
+            if result.startswith('ERROR:'):
+                self.beads.update_task(task_id, 'blocked', result)
+                continue
+            if self._detect_task_type(task) == 'code-generation':
+                try:
+                    self._run_async(self.artifact_handler.handle_agent_output(
+                        task, result, artifact_type='code'
+                    ))
+                except Exception as e:
+                    logger.warning(f"[{task_id}] Failed to save artifact: {e}")
+            self.beads.update_task(task_id, 'closed', result)
+    
+    def _shutdown_workers(
+        self, executor: concurrent.futures.ThreadPoolExecutor, claimed: Dict[str, List[str]]
+    ) -> None:
+        """
+        Stop the worker pool without waiting out long LLM calls.
+        
+        Queued work is cancelled and running work gets SHUTDOWN_GRACE seconds
+        in total; tasks claimed by anything that did not finish are re-opened.
+        Submitted cloud batches stay recorded on disk and are collected when
+        the dispatcher next starts.
+        """
+        executor.shutdown(wait=False, cancel_futures=True)
+        futures = [future for future, _ in self.busy_agents.values()]
+        if futures:
+            logger.info(f"Waiting up to {SHUTDOWN_GRACE:.0f}s for {len(futures)} running jobs...")
+            concurrent.futures.wait(futures, timeout=SHUTDOWN_GRACE)
+        
+        for agent_name, (future, label) in self.busy_agents.items():
+            if future.done() and not future.cancelled():
+                continue
+            logger.warning(f"{agent_name} did not finish {label}; re-opening its tasks")
+            self._release_tasks(claimed.get(agent_name, ()))
+        self.busy_agents.clear()
+    
     def run_loop(self, poll_interval: int = 30, num_workers: int = 1):
         """Continuously poll for and dispatch tasks to available agents"""
-        import concurrent.futures
-        
         logger.info("Starting dispatcher loop...")
         
-        # One thread per agent type
-        executor = concurrent.futures.ThreadPoolExecutor(max_workers=3)
+        # One thread per agent type, plus batch submission and batch polling
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=5)
+        
+        # Task ids claimed by each busy agent, re-opened if it is cut short
+        claimed: Dict[str, List[str]] = {}
+        
+        # Non-urgent tasks waiting to be sent as one cloud batch
+        pending_batch: Dict[str, Dict[str, Any]] = {}
+        batch_started = 0.0
+        next_batch_poll = 0.0
+        
+        watcher = BeadsFileWatcher(self.beads.issues_file, self.ready_event.set)
+        watcher.start()
+        
+        def wake(_future):
+            self.ready_event.set()
         
         try:
             while True:
@@ -598,6 +1319,7 @@ Please complete this task and provide a clear response."""
                 
                 for agent_name in done_agents:
                     del self.busy_agents[agent_name]
+                    claimed.pop(agent_name, None)
                 
                 # Get open tasks
                 tasks = self.beads.get_ready_tasks()
@@ -608,6 +1330,13 @@ Please complete this task and provide a clear response."""
                 if tasks:
                     # Try to assign each task to an idle agent
                     for task in tasks:
+                        # Non-urgent tasks are held back for a batch
+                        if BATCH_LABEL in (task.get('labels') or ()):
+                            if not pending_batch:
+                                batch_started = time.monotonic()
+                            pending_batch.setdefault(task['id'], task)
+                            continue
+                        
                         task_type = self._detect_task_type(task)
                         agent_name = self.task_to_agent.get(task_type, 'reasoning')
                         
@@ -630,29 +1359,55 @@ Please complete this task and provide a clear response."""
                         logger.info(f"Dispatching {task_id} to {agent_name} agent")
                         
                         future = executor.submit(self.process_task, task)
+                        future.add_done_callback(wake)
                         self.busy_agents[agent_name] = (future, task_id)
+                        claimed[agent_name] = [task_id]
                         assigned_this_round += 1
                 
+                # Flush the batch when full or when the oldest task has waited long enough
+                if pending_batch and 'batch' not in self.busy_agents and (
+                    len(pending_batch) >= BATCH_MAX_SIZE
+                    or time.monotonic() - batch_started >= BATCH_MAX_WAIT
+                ):
+                    batch = [pending_batch.pop(task_id) for task_id in list(pending_batch)[:BATCH_MAX_SIZE]]
+                    batch_started = time.monotonic()
+                    # Claim the tasks now so the next poll doesn't pick them up again
+                    for task in batch:
+                        self.beads.update_task(task['id'], 'in_progress')
+                    batch_ids = ','.join(task['id'] for task in batch)
+                    logger.info(f"Submitting batch of {len(batch)}: {batch_ids}")
+                    future = executor.submit(self._submit_batch, batch)
+                    future.add_done_callback(wake)
+                    self.busy_agents['batch'] = (future, batch_ids)
+                    claimed['batch'] = [task['id'] for task in batch]
+                
+                # Check submitted batches; each poll is one short request per batch
+                now = time.monotonic()
+                if self.cloud_batches and 'batch-poll' not in self.busy_agents and now >= next_batch_poll:
+                    next_batch_poll = now + BATCH_POLL_INTERVAL
+                    future = executor.submit(self._poll_batches)
+                    future.add_done_callback(wake)
+                    self.busy_agents['batch-poll'] = (future, f"{len(self.cloud_batches)} cloud batches")
+                
                 # Log status
                 busy_count = len(self.busy_agents)
-                if busy_count > 0:
+                if busy_count > 0 or pending_batch:
                     busy_list = ', '.join([f"{name}:{tid}" for name, (_, tid) in self.busy_agents.items()])
                     logger.info(f"Busy agents ({busy_count}): {busy_list}")
-                    time.sleep(2)  # Check frequently when work is happening
+                    self.ready_event.wait(2)  # Check frequently when work is happening
                 else:
-                    logger.info(f"No agents busy, waiting {poll_interval}s...")
-                    time.sleep(poll_interval)
+                    wait = poll_interval
+                    if self.cloud_batches:
+                        wait = min(wait, max(next_batch_poll - time.monotonic(), 0))
+                    logger.info(f"No agents busy, waiting up to {wait:.0f}s...")
+                    self.ready_event.wait(wait)
+                self.ready_event.clear()
                     
         except KeyboardInterrupt:
             logger.info("Dispatcher stopping...")
-            # Wait for in-flight tasks
-            for agent_name, (future, task_id) in self.busy_agents.items():
-                logger.info(f"Waiting for {agent_name} to finish {task_id}...")
-                try:
-                    future.result(timeout=60)
-                except Exception as e:
-                    logger.error(f"Task {task_id} failed: {e}")
-            executor.shutdown(wait=True)
+        finally:
+            watcher.stop()
+            self._shutdown_workers(executor, claimed)
             logger.info("Dispatcher stopped")
 
 
@@ -8,6 +8,7 @@ Handles:
 4. Integration with Beads task tracking
 """
 
+import os
 import re
 import logging
 import asyncio
@@ -16,6 +17,13 @@ from typing import Dict, Any, Optional
 
 logger = logging.getLogger(__name__)
 
+# Artifacts larger than this are written in chunks of this size
+WRITE_CHUNK_SIZE = 1024 * 1024
+
+_OUTPUT_PATH_RE = re.compile(r'Output path:\s*([^\n]+)')
+_CODEFENCE_RE = re.compile(r'```(?:python|javascript|js)?\n(.*?)\n```', re.DOTALL)
+_ANY_CODEFENCE_RE = re.compile(r'```\n(.*?)\n```', re.DOTALL)
+
 
 class ArtifactHandler:
     """Handle artifact events and save outputs to disk"""
@@ -34,7 +42,7 @@ class ArtifactHandler:
         description = task.get('description', '')
         
         # Look for "Output path: /path/to/file" pattern
-        match = re.search(r'Output path:\s*([^\n]+)', description)
+        match = _OUTPUT_PATH_RE.search(description)
         if match:
             path_str = match.group(1).strip()
             path = Path(path_str).expanduser().resolve()
@@ -48,11 +56,14 @@ class ArtifactHandler:
         self, 
         task: Dict[str, Any], 
         output: str,
-        artifact_type: str = 'code'
+        artifact_type: str = 'code',
+        durable: bool = False,
     ) -> Optional[Path]:
         """
         Handle agent output and save to disk if output path specified.
         
+        Set durable=True to fsync the artifact before returning.
+        
         Supports:
         - Python code (.py)
         - JavaScript (.js)
@@ -67,9 +78,6 @@ class ArtifactHandler:
             logger.debug(f"[{task_id}] No output path specified, result stored in Beads only")
             return None
         
-        # Ensure parent directories exist
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        
         try:
             # Detect file type from output path extension or artifact type
             extension = output_path.suffix.lower()
@@ -77,10 +85,10 @@ class ArtifactHandler:
             # Extract code block if it's Python/JS and contains code fences
             if extension in ['.py', '.js'] and '```' in output:
                 # Try to match code blocks with language specifier first
-                code_match = re.search(rf'```(?:python|javascript|js)?\n(.*?)\n```', output, re.DOTALL)
+                code_match = _CODEFENCE_RE.search(output)
                 if not code_match:
                     # Try to match any code block
-                    code_match = re.search(r'```\n(.*?)\n```', output, re.DOTALL)
+                    code_match = _ANY_CODEFENCE_RE.search(output)
                 
                 if code_match:
                     content = code_match.group(1).strip()
@@ -90,15 +98,49 @@ class ArtifactHandler:
             else:
                 content = output.strip()
             
-            # Write file
-            output_path.write_text(content)
-            logger.info(f"[{task_id}] Saved artifact to {output_path} ({len(content)} bytes)")
+            # Write file off the event loop; mkdir and write both block
+            loop = asyncio.get_running_loop()
+            size = await loop.run_in_executor(
+                None, self._save_artifact, output_path, content, durable
+            )
+            logger.info(f"[{task_id}] Saved artifact to {output_path} ({size} bytes)")
             return output_path
             
         except Exception as e:
             logger.error(f"[{task_id}] Failed to save artifact: {e}")
             return None
     
+    @classmethod
+    def _save_artifact(cls, path: Path, content: str, durable: bool = False) -> int:
+        """Create parent directories and write the artifact (runs in executor)"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        return cls._write_artifact(path, content, durable=durable)
+    
+    @staticmethod
+    def _write_artifact(path: Path, content: str, durable: bool = False) -> int:
+        """
+        Write artifact content with raw os.write calls.
+
+        Encodes once as UTF-8 (never the locale default) and bypasses the
+        TextIOWrapper layer; small artifacts go out in a single write, large
+        ones in WRITE_CHUNK_SIZE chunks. fsync only happens when durable.
+
+        Returns:
+            Number of bytes written
+        """
+        data = content.encode('utf-8')
+        view = memoryview(data)
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            offset = 0
+            while offset < len(data):
+                offset += os.write(fd, view[offset:offset + WRITE_CHUNK_SIZE])
+            if durable:
+                os.fsync(fd)
+        finally:
+            os.close(fd)
+        return len(data)
+
     def get_suggested_path(self, task: Dict[str, Any], default_ext: str = '.py') -> Path:
         """Get a suggested output path if none specified"""
         task_id = task.get('id')
@@ -10,38 +10,81 @@ Key improvements over thread-based dispatcher:
 """
 
 import asyncio
+import fcntl
 import json
 import logging
+import os
+import threading
 import time
 import traceback
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Iterator, BinaryIO, Tuple, Set, NamedTuple
 from datetime import datetime, timezone
-from dataclasses import dataclass, field
 from heapq import heappush, heappop
+from itertools import count, islice
+from operator import itemgetter
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import orjson
+    _loads = orjson.loads
+    _dumps = orjson.dumps
+except ImportError:
+    _loads = json.loads
+
+    def _dumps(obj: Any) -> bytes:
+        return json.dumps(obj).encode('utf-8')
+
+import prompts
+from beads_watch import BeadsFileWatcher
+from beads_sync import update_in_progress_index
 
 logger = logging.getLogger(__name__)
 
+# issues.jsonl is read in chunks of this size
+READ_CHUNK_SIZE = 1 << 20
+
+# Compact issues.jsonl once it is this large and over half superseded records
+COMPACT_MIN_BYTES = 1 << 20
+
+# Task labels that map directly to a task type, checked in this order
+_TYPE_LABEL_MAP = {
+    'code-generation': 'code-generation',
+    'code': 'code-generation',
+    'code-refactor': 'code-refactor',
+    'code-review': 'code-review',
+    'text-processing': 'text-processing',
+    'text-generation': 'text-processing',
+    'summarize': 'summarize',
+    'reasoning': 'reasoning',
+}
+
+# Keys prefixed with this are in-memory caches and never written to Beads
+CACHE_KEY_PREFIX = '_yg_'
+
+# (priority, created_at) of an indexed task, with Beads defaults applied
+_SORT_KEY = itemgetter('_yg_priority', '_yg_created')
+
+# Polls between reconciling active_tasks against running supervisors
+RECONCILE_EVERY = 30
+
 # Import observability (will be lazy-loaded)
 observability = None
 
 
-@dataclass
-class PrioritizedTask:
-    """Task with priority for queue ordering (for heapq)"""
+class PrioritizedTask(NamedTuple):
+    """
+    Heap entry for a queued task (for heapq).
+    
+    Being a tuple, entries compare field by field in C: lower priority
+    number first, then FIFO by created_at, then by insertion sequence so
+    the task dicts themselves are never compared.
+    """
     priority: int  # 0=highest, 3=lowest (from Beads)
-    created_at: float  # Tiebreaker: FIFO for same priority
+    created_at: str  # Tiebreaker: FIFO for same priority
+    seq: int  # Tiebreaker: insertion order
     task: Dict[str, Any]
-    
-    def __lt__(self, other):
-        """Min-heap ordering: lower priority number = higher urgency"""
-        if self.priority != other.priority:
-            return self.priority < other.priority
-        return self.created_at < other.created_at
-    
-    def __eq__(self, other):
-        return (self.priority == other.priority and 
-                self.created_at == other.created_at)
 
 
 class HostConcurrencyManager:
@@ -56,34 +99,41 @@ class HostConcurrencyManager:
                          {'surtr-reasoning': 2, 'fenrir-chat': 3, 'skadi-code': 2}
         """
         self.semaphores = {
-            host: asyncio.Semaphore(limit)
+            host: asyncio.BoundedSemaphore(limit)
             for host, limit in host_configs.items()
         }
-        self.active_tasks = {host: [] for host in host_configs}
+        self.active_tasks = {host: set() for host in host_configs}
     
-    async def acquire(self, host: str) -> None:
-        """Acquire a slot for this host (blocks if at limit)"""
+    def get_semaphore(self, host: str) -> asyncio.BoundedSemaphore:
+        """Get the slot semaphore for this host, for use with `async with`"""
         if host not in self.semaphores:
             logger.warning(f"Unknown host: {host}, creating unlimited semaphore")
-            self.semaphores[host] = asyncio.Semaphore(1)
-            self.active_tasks[host] = []
-        
-        await self.semaphores[host].acquire()
+            self.semaphores[host] = asyncio.BoundedSemaphore(1)
+            self.active_tasks[host] = set()
+        return self.semaphores[host]
+    
+    async def acquire(self, host: str) -> None:
+        """Acquire a slot for this host (blocks if at limit)"""
+        await self.get_semaphore(host).acquire()
     
     def release(self, host: str) -> None:
         """Release a slot for this host"""
         if host in self.semaphores:
             self.semaphores[host].release()
     
+    def available_hosts(self) -> Set[str]:
+        """Hosts with at least one free slot"""
+        return {host for host, sem in self.semaphores.items() if sem._value > 0}
+    
     def register_task(self, host: str, task_id: str) -> None:
         """Register a task as active"""
         if host in self.active_tasks:
-            self.active_tasks[host].append(task_id)
+            self.active_tasks[host].add(task_id)
     
     def unregister_task(self, host: str, task_id: str) -> None:
         """Unregister a task"""
-        if host in self.active_tasks and task_id in self.active_tasks[host]:
-            self.active_tasks[host].remove(task_id)
+        if host in self.active_tasks:
+            self.active_tasks[host].discard(task_id)
     
     def get_status(self) -> Dict[str, Dict[str, Any]]:
         """Get current status of all hosts"""
@@ -92,7 +142,7 @@ class HostConcurrencyManager:
             status[host] = {
                 'active': len(self.active_tasks[host]),
                 'available_slots': semaphore._value,
-                'tasks': self.active_tasks[host][:3],  # Show first 3
+                'tasks': list(islice(self.active_tasks[host], 3)),  # Show first 3
             }
         return status
 
@@ -119,6 +169,26 @@ class AsyncBeadsClient:
         
         self.issues_file = self.beads_dir / '.beads/issues.jsonl'
         self.lock_file = self.beads_dir / '.beads/issues.jsonl.lock'
+        self._lock_fd = open(self.lock_file, 'a')
+        self._write_lock = threading.Lock()
+        
+        # Incremental index: only bytes appended since the last poll are parsed
+        self._offset = 0
+        self._stat = None
+        self._tail = b''
+        self._tasks_by_id: Dict[str, Dict[str, Any]] = {}
+        self._spans: Dict[str, Tuple[int, int]] = {}  # id -> (offset, length)
+        self._live_bytes = 0
+        self._changed: Set[str] = set()  # ids (re)indexed since the last drain
+        
+        # get_ready_tasks_sorted result and the file it was computed from
+        self._last_file_key = None
+        self._last_sorted_tasks: List[Dict[str, Any]] = []
+        self._index_lock = threading.Lock()
+        
+        # Dedicated pool so Beads I/O neither grows nor competes with the
+        # event loop's default executor
+        self._io_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='beads-io')
         logger.info(f"AsyncBeadsClient using: {self.beads_dir}")
     
     async def get_ready_tasks_sorted(self) -> List[Dict[str, Any]]:
@@ -129,48 +199,183 @@ class AsyncBeadsClient:
         - priority=0 (critical) first
         - priority=3 (low) last
         - FIFO within same priority
+        
+        While issues.jsonl is unchanged, the previous result is returned
+        after a single stat() call.
         """
-        tasks = []
         try:
+            st = os.stat(self.issues_file)
+            file_key = (st.st_ino, st.st_mtime_ns, st.st_size)
+            if file_key == self._last_file_key:
+                return list(self._last_sorted_tasks)
+            
             # Run blocking I/O in executor
             loop = asyncio.get_event_loop()
-            lines = await loop.run_in_executor(None, self._read_all_lines)
-            
-            for line in lines:
-                if not line.strip():
-                    continue
-                try:
-                    task = json.loads(line)
-                    if task.get('status') == 'open' and task.get('issue_type') != 'epic':
-                        tasks.append(task)
-                except json.JSONDecodeError:
-                    continue
+            tasks = await loop.run_in_executor(self._io_executor, self._ready_snapshot)
             
             # Sort by priority (lower number = higher priority)
             # Then by created_at (FIFO for same priority)
-            tasks.sort(
-                key=lambda t: (t.get('priority', 2), t.get('created_at', ''))
-            )
+            tasks.sort(key=_SORT_KEY)
             
-            return tasks
+            self._last_file_key = file_key
+            self._last_sorted_tasks = tasks
+            return list(tasks)
         
         except Exception as e:
             logger.warning(f"Error reading Beads: {e}")
             return []
     
-    def _read_all_lines(self) -> List[str]:
-        """Helper to read file in executor"""
+    async def get_ready_task_updates(self) -> List[Dict[str, Any]]:
+        """
+        Get open tasks whose records changed since the previous call.
+        
+        The first call returns every open task. Callers keep their own
+        queue and use is_current() to drop entries that were superseded.
+        """
         try:
-            with open(self.issues_file) as f:
-                return f.readlines()
-        except Exception:
+            loop = asyncio.get_event_loop()
+            return await loop.run_in_executor(self._io_executor, self._drain_ready_updates)
+        except Exception as e:
+            logger.warning(f"Error reading Beads: {e}")
             return []
     
+    def is_current(self, task: Dict[str, Any]) -> bool:
+        """Whether task is still the latest indexed record for its id"""
+        return self._tasks_by_id.get(task.get('id')) is task
+    
+    def _drain_ready_updates(self) -> List[Dict[str, Any]]:
+        with self._index_lock:
+            self._refresh_index()
+            changed, self._changed = self._changed, set()
+            tasks = []
+            for task_id in changed:
+                task = self._tasks_by_id.get(task_id)
+                if task and task.get('status') == 'open' and task.get('issue_type') != 'epic':
+                    tasks.append(task)
+            return tasks
+    
+    def _ready_snapshot(self) -> List[Dict[str, Any]]:
+        """Refresh the index and return its open tasks (runs in executor)"""
+        with self._index_lock:
+            self._refresh_index()
+            return [
+                task for task in self._tasks_by_id.values()
+                if task.get('status') == 'open' and task.get('issue_type') != 'epic'
+            ]
+    
+    def _refresh_index(self) -> None:
+        """Parse lines appended since the last poll into _tasks_by_id"""
+        for offset, line in self._iter_new_lines():
+            if not line.strip():
+                continue
+            try:
+                task = _loads(line)
+            except json.JSONDecodeError:
+                continue
+            task_id = task.get('id')
+            if task_id:
+                # Later records supersede earlier ones for the same id
+                self._index_record(task_id, task, offset, len(line))
+    
+    def _index_record(self, task_id: str, task: Dict[str, Any], offset: int, length: int) -> None:
+        # Derived fields read on every poll, computed once per record
+        task['_yg_priority'] = task.get('priority', 2)
+        task['_yg_created'] = task.get('created_at', '')
+        task['_yg_title'] = task.get('title', '').lower()
+        task['_yg_labels'] = frozenset(task.get('labels') or ())
+        
+        old = self._spans.get(task_id)
+        if old:
+            self._live_bytes -= old[1]
+        self._tasks_by_id[task_id] = task
+        self._spans[task_id] = (offset, length)
+        self._live_bytes += length
+        self._changed.add(task_id)
+    
+    def _reset_index(self) -> None:
+        self._offset = 0
+        self._tail = b''
+        self._tasks_by_id.clear()
+        self._spans.clear()
+        self._live_bytes = 0
+    
+    def _iter_new_lines(self) -> Iterator[Tuple[int, bytes]]:
+        """
+        Yield (offset, line) for complete lines appended since the last call.
+        
+        Falls back to a full reload when the file was replaced (inode
+        changed), truncated, or rewritten in place (same size, new mtime),
+        or when the bytes just before the saved offset no longer match.
+        """
+        try:
+            st = os.stat(self.issues_file)
+        except OSError:
+            return
+        
+        prev = self._stat
+        if prev is None or st.st_ino != prev.st_ino or st.st_size < self._offset:
+            self._reset_index()
+        elif st.st_size == prev.st_size:
+            if st.st_mtime_ns == prev.st_mtime_ns:
+                return
+            self._reset_index()
+        
+        try:
+            with open(self.issues_file, 'rb') as f:
+                if self._offset:
+                    f.seek(self._offset - len(self._tail))
+                    if f.read(len(self._tail)) != self._tail:
+                        self._reset_index()
+                        f.seek(0)
+                
+                yield from self._iter_lines(f)
+                
+                self._remember_tail(f)
+        except OSError:
+            return
+        self._stat = st
+    
+    def _remember_tail(self, f: BinaryIO) -> None:
+        """Keep the last bytes consumed to detect in-place rewrites"""
+        start = max(0, self._offset - 64)
+        f.seek(start)
+        self._tail = f.read(self._offset - start)
+    
+    def _iter_lines(self, f: BinaryIO) -> Iterator[Tuple[int, bytes]]:
+        """Split f into (offset, line) from READ_CHUNK_SIZE reads, advancing _offset"""
+        pending = b''
+        while True:
+            chunk = f.read(READ_CHUNK_SIZE)
+            if not chunk:
+                break
+            parts = (pending + chunk).split(b'\n')
+            pending = parts.pop()
+            for part in parts:
+                offset = self._offset
+                self._offset += len(part) + 1
+                yield offset, part
+        
+        # An unterminated last line is only taken once it is a complete
+        # record; otherwise a writer is mid-append and it waits for next poll
+        if pending.strip():
+            try:
+                _loads(pending)
+            except json.JSONDecodeError:
+                return
+            offset = self._offset
+            self._offset += len(pending)
+            yield offset, pending
+    
+    def close(self) -> None:
+        """Shut down the Beads I/O pool and release the lock file"""
+        self._io_executor.shutdown(wait=True)
+        self._lock_fd.close()
+    
     async def update_task(self, task_id: str, status: str, result: str = None) -> bool:
         """Update task status (async-safe)"""
         loop = asyncio.get_event_loop()
         return await loop.run_in_executor(
-            None,
+            self._io_executor,
             self._update_task_sync,
             task_id,
             status,
@@ -179,75 +384,159 @@ class AsyncBeadsClient:
     
     def _update_task_sync(self, task_id: str, status: str, result: str = None) -> bool:
         """Synchronous task update (runs in executor)"""
-        import fcntl
+        try:
+            with self._issues_lock(task_id):
+                with self._index_lock:
+                    updated = self._append_update(task_id, status, result)
+                    if updated:
+                        self._maybe_compact()
+        except Exception as e:
+            logger.error(f"Error writing Beads: {e}")
+            return False
         
-        lock_acquired = False
-        lock_fd = None
+        if updated:
+            logger.info(f"Updated task {task_id} to {status}")
+        else:
+            logger.warning(f"Task {task_id} not found in Beads")
+        return updated
+    
+    @contextmanager
+    def _issues_lock(self, purpose: str) -> Iterator[None]:
+        """
+        Hold the issues.jsonl lock shared with BeadsClient and bd.
         
-        try:
-            # Try to acquire lock with retries
-            for attempt in range(10):
-                try:
-                    lock_fd = open(self.lock_file, 'w')
-                    fcntl.flock(lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
-                    lock_acquired = True
-                    break
-                except (IOError, OSError):
-                    if attempt == 9:
-                        logger.warning(f"Could not acquire lock for {task_id}")
-                        lock_fd = None
-                        break
-                    time.sleep(0.1)
-            
-            # Read existing data
-            lines = []
+        Blocks in flock rather than polling, on a lock file that stays open
+        and is never unlinked. The thread lock covers executor threads,
+        which would otherwise share this process's flock.
+        """
+        with self._write_lock:
             try:
-                with open(self.issues_file) as f:
-                    for line in f:
-                        line = line.strip()
-                        if not line:
-                            continue
-                        try:
-                            task = json.loads(line)
-                            if task['id'] == task_id:
-                                task['status'] = status
-                                task['updated_at'] = datetime.now(timezone.utc).isoformat()
-                                if status == 'closed':
-                                    task['closed_at'] = datetime.now(timezone.utc).isoformat()
-                                if result:
-                                    task['result'] = result[:32000]
-                            lines.append(json.dumps(task))
-                        except json.JSONDecodeError:
-                            lines.append(line)
-            except Exception as e:
-                logger.error(f"Error reading Beads: {e}")
+                fcntl.flock(self._lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                logger.debug(f"Waiting for Beads lock ({purpose})")
+                fcntl.flock(self._lock_fd, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+    
+    def _indexed_record(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Return the indexed record for task_id (without cache keys) if the
+        bytes at its span still hold it, else None.
+        """
+        span = self._spans.get(task_id)
+        if span is None:
+            return None
+        task = {
+            k: v for k, v in self._tasks_by_id[task_id].items()
+            if not k.startswith(CACHE_KEY_PREFIX)
+        }
+        try:
+            with open(self.issues_file, 'rb') as f:
+                f.seek(span[0])
+                on_disk = _loads(f.read(span[1]))
+        except (OSError, json.JSONDecodeError):
+            return None
+        return task if on_disk == task else None
+    
+    def _append_update(self, task_id: str, status: str, result: Optional[str]) -> bool:
+        """
+        Append the updated record and blank out the one it supersedes.
+        
+        Other readers of issues.jsonl (the threaded BeadsClient, bd) expect
+        one record per id, so the old line is overwritten with spaces the
+        same way BeadsClient does, rather than left as a duplicate.
+        """
+        self._refresh_index()
+        task = self._indexed_record(task_id)
+        if task is None:
+            # An in-place rewrite that also grew the file slips past the
+            # tail check; reload everything rather than copy a stale record
+            self._reset_index()
+            self._stat = None
+            self._refresh_index()
+            task = self._indexed_record(task_id)
+            if task is None:
                 return False
+        
+        now = datetime.now(timezone.utc).isoformat()
+        task['status'] = status
+        task['updated_at'] = now
+        if status == 'closed':
+            task['closed_at'] = now
+        if result:
+            task['result'] = result[:32000]
+        record = _dumps(task)
+        old_offset, old_length = self._spans[task_id]
+        
+        with open(self.issues_file, 'r+b') as f:
+            end = f.seek(0, os.SEEK_END)
+            lead = b''
+            if end:
+                f.seek(end - 1)
+                if f.read(1) != b'\n':
+                    lead = b'\n'
+            f.write(lead + record + b'\n')
+            f.flush()
             
-            # Write atomically
-            temp_file = self.issues_file.with_suffix('.jsonl.tmp')
+            # Only tombstone the old line if it is still what we indexed
+            f.seek(old_offset)
             try:
-                with open(temp_file, 'w') as f:
-                    for line in lines:
-                        f.write(line + '\n')
-                temp_file.replace(self.issues_file)
-                logger.info(f"Updated task {task_id} to {status}")
-                return True
-            except Exception as e:
-                logger.error(f"Error writing Beads: {e}")
-                if temp_file.exists():
-                    temp_file.unlink()
-                return False
+                still_there = _loads(f.read(old_length)).get('id') == task_id
+            except json.JSONDecodeError:
+                still_there = False
+            if still_there:
+                f.seek(old_offset)
+                f.write(b' ' * old_length)
+                f.flush()
+            
+            # Index our own write when nothing else was appended in between
+            if end == self._offset:
+                self._index_record(task_id, task, end + len(lead), len(record))
+                self._offset = end + len(lead) + len(record) + 1
+                self._remember_tail(f)
+                self._stat = os.fstat(f.fileno())
+        
+        update_in_progress_index(self.issues_file, task_id, status, end + len(lead))
+        return True
+    
+    def _maybe_compact(self) -> None:
+        """Rewrite issues.jsonl without superseded records once they dominate it"""
+        try:
+            size = os.stat(self.issues_file).st_size
+        except OSError:
+            return
+        if size < COMPACT_MIN_BYTES or size <= 2 * self._live_bytes:
+            return
         
+        live = {offset for offset, _ in self._spans.values()}
+        temp_file = self.issues_file.with_suffix('.jsonl.tmp')
+        try:
+            with open(self.issues_file, 'rb') as src, open(temp_file, 'wb') as dst:
+                self._offset = 0
+                for offset, line in self._iter_lines(src):
+                    if not line.strip():
+                        continue
+                    if offset not in live:
+                        # Drop superseded records; keep anything unparseable
+                        try:
+                            if _loads(line).get('id') in self._spans:
+                                continue
+                        except (json.JSONDecodeError, AttributeError):
+                            pass
+                    dst.write(line + b'\n')
+            os.chmod(temp_file, os.stat(self.issues_file).st_mode & 0o7777)
+            temp_file.replace(self.issues_file)
+            logger.info(f"Compacted {self.issues_file}: {size} -> {os.stat(self.issues_file).st_size} bytes")
+        except Exception as e:
+            logger.error(f"Error compacting Beads: {e}")
+            if temp_file.exists():
+                temp_file.unlink()
         finally:
-            if lock_acquired and lock_fd:
-                try:
-                    fcntl.flock(lock_fd, fcntl.LOCK_UN)
-                    lock_fd.close()
-                    if self.lock_file.exists():
-                        self.lock_file.unlink()
-                except Exception:
-                    pass
-
+            # Force a full reload against the new file
+            self._reset_index()
+            self._stat = None
 
 class AsyncYggdrasilAgent:
     """
@@ -261,8 +550,6 @@ class AsyncYggdrasilAgent:
         from llm_client_unified import UnifiedLLMClient
         from artifact_handler import ArtifactHandler
         
-        # Use unified LLM client (includes retry and circuit breaker logic)
-        self.llm = UnifiedLLMClient()
         self.beads = AsyncBeadsClient(beads_dir)
         self.artifact_handler = ArtifactHandler()
         
@@ -286,6 +573,29 @@ class AsyncYggdrasilAgent:
         
         self.concurrency_mgr = HostConcurrencyManager(self.host_config)
         
+        # Blocking LLM calls (used when httpx is missing) get one thread per
+        # host slot, so the pool is never what limits concurrency
+        self._llm_executor = ThreadPoolExecutor(
+            max_workers=sum(self.host_config.values()),
+            thread_name_prefix='llm',
+        )
+        
+        # Use unified LLM client (includes retry and circuit breaker logic)
+        self.llm = UnifiedLLMClient(executor=self._llm_executor)
+        
+        # Ready tasks waiting for a slot, one priority heap per host
+        self._host_queues: Dict[str, List[PrioritizedTask]] = {
+            host: [] for host in self.host_config
+        }
+        self._queue_seq = count()
+        
+        # Set whenever a host slot frees up or issues.jsonl changes, to wake
+        # the dispatch loop early
+        self._wakeup = asyncio.Event()
+        
+        # Running dispatch supervisors and the task ids each one owns
+        self._batches: Dict[asyncio.Task, List[str]] = {}
+        
         # Task type handlers
         self.handlers = {
             'code-generation': self._handle_code_generation,
@@ -310,23 +620,28 @@ class AsyncYggdrasilAgent:
     
     def _detect_task_type(self, task: Dict[str, Any]) -> str:
         """Detect task type from labels or title"""
-        labels = task.get('labels', [])
-        title = task.get('title', '').lower()
-        description = task.get('description', '').lower()
+        cached = task.get('_yg_type')
+        if cached:
+            return cached
+        task_type = self._classify_task(task)
+        task['_yg_type'] = task_type
+        return task_type
+    
+    def _classify_task(self, task: Dict[str, Any]) -> str:
+        """Uncached task type detection"""
+        labels = task.get('_yg_labels')
+        if labels is None:
+            labels = frozenset(task.get('labels') or ())
         
         # Check labels first (most reliable)
-        if 'code-generation' in labels or 'code' in labels:
-            return 'code-generation'
-        if 'code-refactor' in labels:
-            return 'code-refactor'
-        if 'code-review' in labels:
-            return 'code-review'
-        if 'text-processing' in labels or 'text-generation' in labels:
-            return 'text-processing'
-        if 'summarize' in labels:
-            return 'summarize'
-        if 'reasoning' in labels:
-            return 'reasoning'
+        for label, task_type in _TYPE_LABEL_MAP.items():
+            if label in labels:
+                return task_type
+        
+        title = task.get('_yg_title')
+        if title is None:
+            title = task.get('title', '').lower()
+        description = task.get('description', '').lower()
         
         # Check title/description for keywords
         if any(keyword in title for keyword in ['code', 'generate', 'implement', 'write']):
@@ -354,28 +669,14 @@ class AsyncYggdrasilAgent:
     
     async def _handle_code_generation(self, task: Dict[str, Any]) -> str:
         """Generate code"""
-        description = task.get('description', '')
-        title = task.get('title', '')
-        
-        prompt = f"""Generate code for the following task:
-
-Title: {title}
-Description: {description}
-
-Provide complete, working code with comments. Include any necessary imports."""
+        prompt = prompts.render_prompt(prompts.CODE_PROMPT, task)
         
-        result = self.llm.generate(prompt, task_type='code-generation')
+        result = await self.llm.agenerate(prompt, task_type='code-generation')
         
-        # Auto-save artifact (run in executor since it's async)
+        # Auto-save artifact (file I/O is offloaded inside the handler)
         try:
-            loop = asyncio.get_event_loop()
-            await loop.run_in_executor(
-                None,
-                lambda: asyncio.run(
-                    self.artifact_handler.handle_agent_output(
-                        task, result, artifact_type='code'
-                    )
-                )
+            await self.artifact_handler.handle_agent_output(
+                task, result, artifact_type='code'
             )
         except Exception as e:
             logger.warning(f"Failed to save artifact: {e}")
@@ -384,42 +685,23 @@ Provide complete, working code with comments. Include any necessary imports."""
     
     async def _handle_text_processing(self, task: Dict[str, Any]) -> str:
         """Process text"""
-        description = task.get('description', '')
-        
-        prompt = description
-        return self.llm.generate(prompt, task_type='text-processing')
+        prompt = prompts.render_prompt(prompts.TEXT_PROMPT, task)
+        return await self.llm.agenerate(prompt, task_type='text-processing')
     
     async def _handle_summarize(self, task: Dict[str, Any]) -> str:
         """Summarize content"""
-        description = task.get('description', '')
-        prompt = f"Please summarize the following:\n\n{description}"
-        return self.llm.generate(prompt, task_type='text-processing')
+        prompt = prompts.render_prompt(prompts.SUMMARIZE_PROMPT, task)
+        return await self.llm.agenerate(prompt, task_type='text-processing')
     
     async def _handle_reasoning(self, task: Dict[str, Any]) -> str:
         """Handle reasoning tasks"""
-        description = task.get('description', '')
-        title = task.get('title', '')
-        
-        prompt = f"""Task: {title}
-
-{description}
-
-Please analyze this thoroughly and provide clear reasoning."""
-        
-        return self.llm.generate(prompt, task_type='reasoning')
+        prompt = prompts.render_prompt(prompts.REASONING_PROMPT, task)
+        return await self.llm.agenerate(prompt, task_type='reasoning')
     
     async def _handle_general(self, task: Dict[str, Any]) -> str:
         """Handle general tasks"""
-        description = task.get('description', '')
-        title = task.get('title', '')
-        
-        prompt = f"""Task: {title}
-
-{description}
-
-Please complete this task and provide a clear response."""
-        
-        return self.llm.generate(prompt, task_type='general')
+        prompt = prompts.render_prompt(prompts.GENERAL_PROMPT, task)
+        return await self.llm.agenerate(prompt, task_type='general')
     
     async def _process_task_with_limit(
         self,
@@ -430,8 +712,9 @@ Please complete this task and provide a clear response."""
         """
         Process a single task with host concurrency limit and error handling.
         
-        Acquires host semaphore, processes task with retry logic, releases semaphore.
-        Stores full error tracebacks in Beads for post-mortem analysis.
+        Each attempt holds a host slot while it runs; failed attempts are
+        retried in a loop with backoff. Stores full error tracebacks in
+        Beads for post-mortem analysis.
         """
         from observability import (
             get_structured_logger, get_metrics, get_error_tracker,
@@ -440,17 +723,25 @@ Please complete this task and provide a clear response."""
         
         task_id = task.get('id')
         task_type = self._detect_task_type(task)
-        start_time = time.time()
         
         # Initialize observability
         obs_logger = get_structured_logger()
         metrics_collector = get_metrics()
         error_tracker = get_error_tracker()
         
-        try:
-            # Acquire slot on host
-            await self.concurrency_mgr.acquire(host)
-            self.concurrency_mgr.register_task(host, task_id)
+        # Retry policy: exponential backoff for transient errors
+        retry_policy = RetryPolicy(
+            max_attempts=3,
+            initial_delay_ms=100,
+            max_delay_ms=5000,
+        )
+        handler = self.handlers.get(task_type, self._handle_general)
+        
+        # Mark as in-progress
+        await self.beads.update_task(task_id, 'in_progress')
+        
+        for attempt in range(attempt, retry_policy.max_attempts + 1):
+            start_time = time.time()
             
             # Log task start with structured context
             obs_logger.log_task_event(
@@ -462,29 +753,27 @@ Please complete this task and provide a clear response."""
                 attempt=attempt,
             )
             
-            # Mark as in-progress
-            await self.beads.update_task(task_id, 'in_progress')
+            # Hold a host slot only while the handler runs, so backoff
+            # sleeps leave it free for other tasks
+            error = None
+            async with self.concurrency_mgr.get_semaphore(host):
+                self.concurrency_mgr.register_task(host, task_id)
+                try:
+                    # Execute with retry wrapper
+                    result = await with_retry(
+                        handler,
+                        task,
+                        policy=retry_policy,
+                        logger=obs_logger,
+                        task_id=task_id,
+                    )
+                except Exception as e:
+                    error = e
+                finally:
+                    self.concurrency_mgr.unregister_task(host, task_id)
+            self._wakeup.set()
             
-            try:
-                # Get handler and process with retry
-                handler = self.handlers.get(task_type, self._handle_general)
-                
-                # Retry policy: exponential backoff for transient errors
-                retry_policy = RetryPolicy(
-                    max_attempts=3,
-                    initial_delay_ms=100,
-                    max_delay_ms=5000,
-                )
-                
-                # Execute with retry wrapper
-                result = await with_retry(
-                    handler,
-                    task,
-                    policy=retry_policy,
-                    logger=obs_logger,
-                    task_id=task_id,
-                )
-                
+            if error is None:
                 result_str = str(result) if not isinstance(result, str) else result
                 duration_ms = (time.time() - start_time) * 1000
                 
@@ -504,80 +793,162 @@ Please complete this task and provide a clear response."""
                 
                 # Mark as completed
                 await self.beads.update_task(task_id, 'closed', result_str)
+                return
+            
+            duration_ms = (time.time() - start_time) * 1000
+            
+            # Track error with full context
+            error_context = {
+                'task_type': task_type,
+                'host': host,
+                'attempt': attempt,
+                'description': task.get('description', '')[:200],  # First 200 chars
+            }
+            error_record = error_tracker.track_error(task_id, error, error_context)
+            
+            # Determine if we should retry
+            should_retry = (
+                attempt < retry_policy.max_attempts and
+                retry_policy.should_retry(attempt - 1, error)
+            )
+            
+            # Record failure metrics
+            status = TaskStatus.RETRY if should_retry else TaskStatus.FAILED
+            metrics_data = TaskMetrics(
+                task_id=task_id,
+                task_type=task_type,
+                host=host,
+                status=status,
+                start_time=start_time,
+                end_time=time.time(),
+                duration_ms=duration_ms,
+                attempt=attempt,
+                error_message=str(error),
+                error_traceback=error_record['traceback'],
+            )
+            metrics_collector.record_task_completion(metrics_data)
+            obs_logger.log_metrics(metrics_data)
+            
+            if not should_retry:
+                break
+            
+            # Retry with exponential backoff
+            delay_ms = retry_policy.get_delay_ms(attempt - 1)
+            obs_logger.log_task_event(
+                'warning',
+                task_id,
+                'task_retry_scheduled',
+                attempt=attempt + 1,
+                delay_ms=delay_ms,
+                error=str(error),
+            )
+            await asyncio.sleep(delay_ms / 1000.0)
+        
+        # Final failure: store full error in Beads
+        error_str = error_tracker.format_for_beads(error_record)
+        await self.beads.update_task(task_id, 'blocked', error_str)
+        
+        obs_logger.log_task_event(
+            'error',
+            task_id,
+            'task_failed_final',
+            attempt=attempt,
+            error=str(error),
+            reason=(
+                'max_retries' if attempt >= retry_policy.max_attempts
+                else 'non_retryable'
+            ),
+        )
+    
+    def _enqueue(self, task: Dict[str, Any]) -> None:
+        """Push a ready task onto its host's priority heap"""
+        host = self._get_host_for_task(self._detect_task_type(task))
+        heappush(
+            self._host_queues.setdefault(host, []),
+            PrioritizedTask(
+                *_SORT_KEY(task),
+                next(self._queue_seq),
+                task,
+            ),
+        )
+    
+    def _dispatch_queued(self, active_tasks: set, available_hosts: Set[str]) -> int:
+        """
+        Launch queued tasks on hosts with free slots, highest priority first.
+        
+        Only hosts with capacity are touched, and each pops at most as many
+        entries as it has free slots (plus any stale entries it skips).
+        Everything picked in one pass runs under a single supervisor task.
+        
+        Returns:
+            Number of tasks dispatched
+        """
+        batch = []
+        for host in available_hosts:
+            queue = self._host_queues.get(host)
+            free = self.concurrency_mgr.semaphores[host]._value
+            while queue and free > 0:
+                task = heappop(queue).task
+                task_id = task.get('id')
                 
-            except Exception as e:
-                duration_ms = (time.time() - start_time) * 1000
-                
-                # Track error with full context
-                error_context = {
-                    'task_type': task_type,
-                    'host': host,
-                    'attempt': attempt,
-                    'description': task.get('description', '')[:200],  # First 200 chars
-                }
-                error_record = error_tracker.track_error(task_id, e, error_context)
-                
-                # Determine if we should retry
-                should_retry = (
-                    attempt < 3 and
-                    retry_policy.should_retry(attempt - 1, e)
-                )
-                
-                # Record failure metrics
-                status = TaskStatus.RETRY if should_retry else TaskStatus.FAILED
-                metrics_data = TaskMetrics(
-                    task_id=task_id,
-                    task_type=task_type,
-                    host=host,
-                    status=status,
-                    start_time=start_time,
-                    end_time=time.time(),
-                    duration_ms=duration_ms,
-                    attempt=attempt,
-                    error_message=str(e),
-                    error_traceback=error_record['traceback'],
-                )
-                metrics_collector.record_task_completion(metrics_data)
-                obs_logger.log_metrics(metrics_data)
+                # Skip if already dispatched or superseded by a newer record
+                if task_id in active_tasks or not self.beads.is_current(task):
+                    continue
                 
-                if should_retry:
-                    # Schedule retry with exponential backoff
-                    delay_ms = retry_policy.get_delay_ms(attempt - 1)
-                    obs_logger.log_task_event(
-                        'warning',
-                        task_id,
-                        'task_retry_scheduled',
-                        attempt=attempt + 1,
-                        delay_ms=delay_ms,
-                        error=str(e),
-                    )
-                    
-                    # Release semaphore before sleeping
-                    self.concurrency_mgr.unregister_task(host, task_id)
-                    self.concurrency_mgr.release(host)
-                    
-                    # Sleep and retry
-                    await asyncio.sleep(delay_ms / 1000.0)
-                    await self._process_task_with_limit(task, host, attempt + 1)
-                else:
-                    # Final failure: store full error in Beads
-                    error_str = error_tracker.format_for_beads(error_record)
-                    await self.beads.update_task(task_id, 'blocked', error_str)
-                    
-                    obs_logger.log_task_event(
-                        'error',
-                        task_id,
-                        'task_failed_final',
-                        attempt=attempt,
-                        error=str(e),
-                        reason='non_retryable' if not should_retry else 'max_retries',
-                    )
+                batch.append((task, host))
+                logger.info(f"Dispatched {task_id} to {host}")
+                free -= 1
         
+        if batch:
+            ids = [task.get('id') for task, _ in batch]
+            active_tasks.update(ids)
+            supervisor = asyncio.create_task(self._launch_batch(batch, active_tasks))
+            self._batches[supervisor] = ids
+        return len(batch)
+    
+    async def _launch_batch(self, batch: List[Tuple[Dict[str, Any], str]], active_tasks: set) -> None:
+        """Run one dispatch pass's tasks concurrently and log any that crash"""
+        try:
+            results = await asyncio.gather(
+                *(self._run_dispatched(task, host, active_tasks) for task, host in batch),
+                return_exceptions=True,
+            )
+            for (task, _), result in zip(batch, results):
+                if isinstance(result, BaseException):
+                    logger.error(f"Task {task.get('id')} crashed: {result!r}")
+        finally:
+            self._batches.pop(asyncio.current_task(), None)
+    
+    async def _run_dispatched(self, task: Dict[str, Any], host: str, active_tasks: set) -> None:
+        """Process one dispatched task, freeing its id as soon as it ends"""
+        try:
+            await self._process_task_with_limit(task, host)
         finally:
-            # Release host slot (if not already released by retry)
-            if attempt == 1 or not should_retry:
-                self.concurrency_mgr.unregister_task(host, task_id)
-                self.concurrency_mgr.release(host)
+            active_tasks.discard(task.get('id'))
+            self._wakeup.set()
+    
+    @property
+    def ready_event(self) -> asyncio.Event:
+        """Set this (from the loop thread) to make run_loop look for tasks now"""
+        return self._wakeup
+    
+    async def _wait_for_wakeup(self, timeout: float) -> None:
+        """Sleep until a host slot frees up or timeout elapses"""
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+        self._wakeup.clear()
+    
+    def _reconcile_active(self, active_tasks: set) -> None:
+        """Drop ids whose supervisor is gone (e.g. cancelled before it ran)"""
+        for supervisor in [t for t in self._batches if t.done()]:
+            del self._batches[supervisor]
+        live = {task_id for ids in self._batches.values() for task_id in ids}
+        stale = active_tasks - live
+        if stale:
+            logger.warning(f"Dropping {len(stale)} stale active task ids")
+            active_tasks &= live
     
     async def run_loop(self, poll_interval: int = 30) -> None:
         """
@@ -591,13 +962,32 @@ Please complete this task and provide a clear response."""
         logger.info(f"Host concurrency config: {self.host_config}")
         
         active_tasks = set()
+        polls = 0
+        
+        # New Beads wake the loop immediately; poll_interval is only a fallback
+        loop = asyncio.get_running_loop()
+        watcher = BeadsFileWatcher(
+            self.beads.issues_file, lambda: loop.call_soon_threadsafe(self._wakeup.set)
+        )
+        watcher.start()
         
         try:
             while True:
-                # Get ready tasks (priority-sorted)
-                tasks = await self.beads.get_ready_tasks_sorted()
+                polls += 1
+                if polls % RECONCILE_EVERY == 0:
+                    self._reconcile_active(active_tasks)
                 
-                if not tasks:
+                # While every host is saturated nothing could be launched, so
+                # leave new Beads records unread until a slot frees up
+                available_hosts = self.concurrency_mgr.available_hosts()
+                if available_hosts:
+                    # Queue tasks that became ready since the last poll
+                    for task in await self.beads.get_ready_task_updates():
+                        self._enqueue(task)
+                
+                dispatched = self._dispatch_queued(active_tasks, available_hosts)
+                
+                if not dispatched and not any(self._host_queues.values()):
                     # Log status and wait
                     status = self.concurrency_mgr.get_status()
                     busy_count = sum(s['active'] for s in status.values())
@@ -605,50 +995,20 @@ Please complete this task and provide a clear response."""
                     if busy_count > 0:
                         logger.info(f"No new tasks, waiting for {busy_count} to complete...")
                         # Check frequently while work is happening
-                        await asyncio.sleep(2)
+                        await self._wait_for_wakeup(2)
                     else:
                         logger.info(f"No ready tasks, waiting {poll_interval}s...")
-                        await asyncio.sleep(poll_interval)
+                        await self._wait_for_wakeup(poll_interval)
                     continue
                 
-                # Try to dispatch ready tasks
-                for task in tasks:
-                    task_id = task.get('id')
-                    
-                    # Skip if already dispatched
-                    if task_id in active_tasks:
-                        continue
-                    
-                    # Get host for this task
-                    task_type = self._detect_task_type(task)
-                    host = self._get_host_for_task(task_type)
-                    
-                    # Check if host has available slots
-                    # (don't block, just check)
-                    sem = self.concurrency_mgr.semaphores.get(host)
-                    if sem and sem._value > 0:
-                        # Create task and track it
-                        task_coro = self._process_task_with_limit(task, host)
-                        task_obj = asyncio.create_task(task_coro)
-                        active_tasks.add(task_id)
-                        
-                        # Clean up completed tasks
-                        def task_done_callback(task_id_capture):
-                            def callback(future):
-                                active_tasks.discard(task_id_capture)
-                            return callback
-                        
-                        task_obj.add_done_callback(task_done_callback(task_id))
-                        logger.info(f"Dispatched {task_id} to {host}")
-                
                 # Log status
                 status = self.concurrency_mgr.get_status()
                 busy_count = sum(s['active'] for s in status.values())
                 if busy_count > 0:
                     logger.info(f"Active tasks: {busy_count} ({json.dumps(status, indent=2)})")
                 
-                # Wait before next poll
-                await asyncio.sleep(2)
+                # Wait for a free slot, polling Beads at least every 2s
+                await self._wait_for_wakeup(2)
         
         except KeyboardInterrupt:
             logger.info("Dispatcher stopping...")
@@ -661,13 +1021,34 @@ Please complete this task and provide a clear response."""
                     await asyncio.wait(pending, timeout=60)
             
             logger.info("Dispatcher stopped")
+        finally:
+            watcher.stop()
+            await self.llm.aclose()
+            self._llm_executor.shutdown(wait=False)
+            self.beads.close()
 
 
 class MetricsExporter:
     """Export dispatcher metrics via HTTP endpoint"""
     
-    def __init__(self, port: int = 8888):
+    def __init__(self, port: int = 8888, cache_ttl: float = 1.0):
+        """
+        Args:
+            port: HTTP port for the metrics endpoints
+            cache_ttl: Seconds a rendered Prometheus payload is reused for
+        """
         self.port = port
+        self.cache_ttl = cache_ttl
+        self._prom_cache: Optional[bytes] = None
+        self._prom_cache_ts = 0.0
+    
+    def _prometheus_body(self, metrics) -> bytes:
+        """Rendered Prometheus payload, rebuilt at most once per cache_ttl"""
+        now = time.monotonic()
+        if self._prom_cache is None or now - self._prom_cache_ts > self.cache_ttl:
+            self._prom_cache = metrics.export_prometheus().encode('utf-8')
+            self._prom_cache_ts = now
+        return self._prom_cache
     
     async def start_server(self) -> None:
         """Start metrics HTTP server"""
@@ -676,9 +1057,8 @@ class MetricsExporter:
         
         async def metrics_handler(request):
             """Prometheus format metrics endpoint"""
-            metrics = get_metrics()
-            prometheus_text = metrics.export_prometheus()
-            return web.Response(text=prometheus_text, content_type='text/plain')
+            body = self._prometheus_body(get_metrics())
+            return web.Response(body=body, content_type='text/plain', charset='utf-8')
         
         async def metrics_json_handler(request):
             """JSON format metrics endpoint"""
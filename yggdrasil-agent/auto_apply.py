@@ -7,18 +7,42 @@ generated code changes to a git repository with proper testing and validation.
 """
 
 import os
+import re
 import sys
 import subprocess
 import json
 import hashlib
+import fnmatch
+import functools
+import mmap
+import shelve
+import signal
 import time
+import threading
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple, Union
+from typing import Callable, Dict, List, Optional, Set, Tuple, Union
 import logging
 from dataclasses import dataclass
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 
+try:
+    from flake8.api import legacy as flake8_legacy
+except ImportError:
+    flake8_legacy = None
+
+try:
+    import inotify_simple
+except ImportError:
+    inotify_simple = None
+
+try:
+    import pathspec
+except ImportError:
+    pathspec = None
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -26,7 +50,7 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class TaskInfo:
     """Information about a Beads task."""
     task_id: str
@@ -34,183 +58,676 @@ class TaskInfo:
     description: str = ""
     status: str = "pending"
 
+# Per-file task info and syntax results, keyed by path and validated by stat.
+# The version suffix changes whenever the pickled TaskInfo layout does.
+META_CACHE_PATH = Path.home() / '.cache' / 'yggdrasil' / 'auto_apply.v2.db'
+
+# Task-ID/Title markers are only looked for in this much of a file
+TASK_HEADER_BYTES = 4096
+
+# Quiet period before a batch of file events is processed
+DEBOUNCE_MS = 300
+
+# Longest a batch waits after its first event under continuous changes (s)
+MAX_BATCH_DELAY = 5.0
+
+# Files modified this close to a status snapshot may postdate it
+RACY_WINDOW_NS = 1_000_000_000
+
+# Added to every pytest run: stop at the first failure, skip cache I/O
+PYTEST_ARGS = ['-x', '-q', '--no-header', '-p', 'no:cacheprovider', '-p', 'no:randomly']
+
+# Resident pytest runner: imports pytest once, then forks a child per run
+# so the code under test is always imported fresh
+_PYTEST_SERVER_SRC = r"""
+import json, os, signal, sys, tempfile
+import pytest
+
+for line in sys.stdin:
+    request = json.loads(line)
+    fd, out_path = tempfile.mkstemp(prefix='yg-pytest-')
+    pid = os.fork()
+    if pid == 0:
+        # On timeout, kill the run along with anything the tests spawned
+        os.setsid()
+        signal.signal(signal.SIGALRM, lambda *_: os.killpg(0, signal.SIGKILL))
+        signal.alarm(request['timeout'])
+        os.dup2(fd, 1)
+        os.dup2(fd, 2)
+        try:
+            code = int(pytest.main(request['args']))
+        except BaseException:
+            code = 1
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os._exit(code)
+    os.close(fd)
+    _, status = os.waitpid(pid, 0)
+    with open(out_path, 'rb') as f:
+        output = f.read().decode('utf-8', 'replace')
+    os.unlink(out_path)
+    sys.stdout.write(json.dumps({'returncode': os.waitstatus_to_exitcode(status), 'output': output}) + '\n')
+    sys.stdout.flush()
+"""
+
+# Wall-clock budget for all commands run while processing one batch (s)
+BATCH_TIMEOUT = 120.0
+
+# How long a timed-out command gets between SIGTERM and SIGKILL (s)
+KILL_GRACE = 5.0
+
+# How often the inotify watcher wakes to check for a stop signal (ms)
+INOTIFY_READ_TIMEOUT_MS = 1000
+
+# Read size when draining output from git queries
+GIT_READ_SIZE = 64 * 1024
+
+# Paths never auto-applied: hidden files/dirs, bytecode caches, virtualenvs
+BUILTIN_IGNORE = ['.*', '__pycache__/', '*venv*']
+
+# "task_id: ..." / "title: ..." markers on comment or docstring lines
+_TASK_MARKER_RE = re.compile(rb'(?im)^[ \t]*(?:#|"""|\'\'\')[^\n]*?(task_id|title):([^\n]*)')
+
+# Regex equivalent of BUILTIN_IGNORE for when pathspec is unavailable
+_IGNORE_RE = re.compile(r'(?:^|/)(?:\.|__pycache__(?:/|$))|venv')
+
+def _run_git_quick(args: List[str], cwd: Path) -> Tuple[int, bytes]:
+    """
+    Run git via posix_spawn and return (returncode, stdout).
+    
+    For git's read-only queries: stdin and stderr go to /dev/null, so
+    stdout is drained with plain os.read calls and no Popen reader threads.
+    """
+    read_fd, write_fd = os.pipe()
+    try:
+        pid = os.posix_spawnp(
+            'git',
+            ['git', '-C', os.fspath(cwd)] + args,
+            os.environ,
+            file_actions=[
+                (os.POSIX_SPAWN_OPEN, 0, os.devnull, os.O_RDONLY, 0),
+                (os.POSIX_SPAWN_DUP2, write_fd, 1),
+                (os.POSIX_SPAWN_OPEN, 2, os.devnull, os.O_WRONLY, 0),
+            ],
+        )
+    except OSError:
+        os.close(read_fd)
+        raise
+    finally:
+        os.close(write_fd)
+    
+    chunks = []
+    try:
+        while True:
+            chunk = os.read(read_fd, GIT_READ_SIZE)
+            if not chunk:
+                break
+            chunks.append(chunk)
+    finally:
+        os.close(read_fd)
+        _, status = os.waitpid(pid, 0)
+    return os.waitstatus_to_exitcode(status), b''.join(chunks)
+
+
+def _git_output(args: List[str], cwd: Path) -> bytes:
+    """stdout of a git query; raises CalledProcessError if it fails"""
+    returncode, out = _run_git_quick(args, cwd)
+    if returncode != 0:
+        raise subprocess.CalledProcessError(returncode, ['git'] + args)
+    return out
+
+
+class _GitSession:
+    """
+    Resident git state for one repository, so file events don't fork git.
+    
+    Tracked-file checks are set lookups against one `git ls-files -z`
+    listing, reloaded only when the index file's stat changes. Working tree
+    status comes from a single `git status --porcelain=v2 -z` snapshot,
+    which is reused for any file not modified since it was taken and
+    dropped by invalidate() after a commit. The snapshot runs through the
+    caller's `run(cmd, cwd) -> (returncode, stdout, stderr)`, so it shares
+    the batch deadline with the other git commands.
+    """
+    
+    def __init__(self, repo_root: Path, run: Callable[[List[str], Path], Tuple[int, bytes, bytes]]):
+        self.repo_root = repo_root
+        self._run = run
+        self._lock = threading.Lock()
+        self._index_path: Optional[Path] = None
+        self._tracked: frozenset = frozenset()
+        self._tracked_key: Optional[Tuple[int, int, int]] = None
+        self._status: Optional[Dict[str, str]] = None  # rel path -> XY code
+        self._status_taken_ns = 0
+    
+    def _tracked_set(self) -> frozenset:
+        """Tracked paths, reloaded when .git/index is rewritten"""
+        if self._index_path is None:
+            # Resolved via git so worktrees and submodules (.git file) work
+            out = _git_output(['rev-parse', '--git-path', 'index'], self.repo_root)
+            self._index_path = self.repo_root / out.decode('utf-8', 'surrogateescape').strip()
+        
+        try:
+            st = self._index_path.stat()
+            key = (st.st_mtime_ns, st.st_size, st.st_ino)
+        except FileNotFoundError:
+            key = None  # no index yet: nothing is tracked
+        if key == self._tracked_key:
+            return self._tracked
+        
+        tracked = frozenset()
+        if key is not None:
+            out = _git_output(['ls-files', '-z'], self.repo_root)
+            tracked = frozenset(out.decode('utf-8', 'surrogateescape').split('\0'))
+        self._tracked, self._tracked_key = tracked, key
+        return tracked
+    
+    def is_tracked(self, rel_path: str) -> Optional[bool]:
+        """Whether rel_path is in the index (None if git could not be asked)"""
+        with self._lock:
+            try:
+                return rel_path in self._tracked_set()
+            except (OSError, subprocess.SubprocessError) as e:
+                logger.debug(f"git ls-files failed: {e}")
+                return None
+    
+    def status(self, rel_path: str, mtime_ns: int) -> Optional[str]:
+        """
+        Porcelain XY status of rel_path, or None if it is clean.
+        
+        The snapshot is retaken when the file may have changed after it was
+        taken (filesystem timestamps are coarse, hence the racy window).
+        """
+        with self._lock:
+            if self._status is None or mtime_ns + RACY_WINDOW_NS >= self._status_taken_ns:
+                self._refresh_status()
+            return self._status.get(rel_path)
+    
+    def _refresh_status(self) -> None:
+        taken_ns = time.time_ns()
+        returncode, stdout, stderr = self._run(['git', 'status', '--porcelain=v2', '-z'], self.repo_root)
+        if returncode != 0:
+            raise RuntimeError(stderr.decode('utf-8', 'replace').strip())
+        
+        status = {}
+        entries = iter(stdout.decode('utf-8', 'surrogateescape').split('\0'))
+        for entry in entries:
+            kind = entry[:1]
+            if kind == '1':
+                fields = entry.split(' ', 8)
+                status[fields[8]] = fields[1]
+            elif kind == '2':
+                fields = entry.split(' ', 9)
+                status[fields[9]] = fields[1]
+                next(entries, None)  # original path of the rename
+            elif kind == 'u':
+                fields = entry.split(' ', 10)
+                status[fields[10]] = fields[1]
+            elif kind in ('?', '!'):
+                status[entry[2:]] = kind * 2
+        self._status = status
+        self._status_taken_ns = taken_ns
+    
+    def snapshot(self) -> Dict[str, str]:
+        """Take a fresh status snapshot and return it"""
+        with self._lock:
+            self._refresh_status()
+            return self._status
+    
+    def invalidate(self) -> None:
+        """Drop the status snapshot (after commits)"""
+        with self._lock:
+            self._status = None
+
+@functools.lru_cache(maxsize=None)
+def _find_git_root(start: str) -> Optional[str]:
+    """Nearest directory at or above start holding .git (a dir, or a file for worktrees)"""
+    current = start
+    while True:
+        if os.path.exists(os.path.join(current, '.git')):
+            return current
+        parent = os.path.dirname(current)
+        if parent == current:
+            return None
+        current = parent
+
+
+class _PytestServer:
+    """
+    Resident pytest process, so test runs skip interpreter and pytest startup.
+    
+    Each run forks from a parent that has only pytest imported; conftest
+    files and the code under test are imported in the child, never cached.
+    """
+    
+    def __init__(self, cwd: Path):
+        self.cwd = cwd
+        self._lock = threading.Lock()
+        self._proc: Optional[subprocess.Popen] = None
+    
+    def start(self) -> None:
+        if self._proc is None or self._proc.poll() is not None:
+            self._proc = subprocess.Popen(
+                [sys.executable, '-c', _PYTEST_SERVER_SRC],
+                cwd=self.cwd,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+            )
+    
+    def run(self, args: List[str], timeout: float) -> Optional[Tuple[int, str]]:
+        """Run pytest with args; (returncode, output), or None if the server is unusable"""
+        request = json.dumps({'args': args, 'timeout': max(1, int(timeout))})
+        with self._lock:
+            for _ in range(2):
+                self.start()
+                try:
+                    self._proc.stdin.write(request.encode('utf-8') + b'\n')
+                    self._proc.stdin.flush()
+                    line = self._proc.stdout.readline()
+                except (BrokenPipeError, OSError):
+                    line = b''
+                if line:
+                    reply = json.loads(line)
+                    return reply['returncode'], reply['output']
+                # Server died; restart it once
+                self._proc = None
+        return None
+    
+    def close(self) -> None:
+        with self._lock:
+            if self._proc is not None:
+                self._proc.stdin.close()
+                self._proc.wait()
+                self._proc = None
+
+
 class CodeChangeHandler(FileSystemEventHandler):
-    """File system event handler for detecting code changes."""
+    """
+    File system event handler for detecting code changes.
+    
+    Events are coalesced per file and handed to the AutoApplier as one
+    batch after DEBOUNCE_MS of quiet, or MAX_BATCH_DELAY after the first
+    event if changes keep arriving.
+    """
     
     def __init__(self, auto_applier: 'AutoApplier'):
         self.auto_applier = auto_applier
-        self._last_processed = {}
+        self._pending: Dict[Path, bool] = {}  # file -> is new file
+        self._first_event = 0.0
+        self._timer: Optional[threading.Timer] = None
+        self._lock = threading.Lock()
+        self._process_lock = threading.Lock()  # one batch at a time
         
     def on_modified(self, event):
         """Handle file modification events."""
         if event.is_directory:
             return
             
-        file_path = Path(event.src_path)
-        if self._should_process_file(file_path):
-            # Debounce rapid file changes
-            current_time = time.time()
-            last_time = self._last_processed.get(str(file_path), 0)
-            
-            if current_time - last_time > 2:  # 2 second debounce
-                self._last_processed[str(file_path)] = current_time
-                logger.info(f"Detected change in {file_path}")
-                self.auto_applier.process_file_change(file_path)
+        self.notify(Path(event.src_path), is_new_file=False)
     
     def on_created(self, event):
         """Handle file creation events."""
         if event.is_directory:
             return
             
-        file_path = Path(event.src_path)
+        self.notify(Path(event.src_path), is_new_file=True)
+    
+    def notify(self, file_path: Path, is_new_file: bool) -> None:
+        """Queue a changed file if it is one we process."""
         if self._should_process_file(file_path):
-            logger.info(f"Detected new file {file_path}")
-            self.auto_applier.process_file_change(file_path, is_new_file=True)
+            if is_new_file:
+                logger.info(f"Detected new file {file_path}")
+            else:
+                logger.info(f"Detected change in {file_path}")
+            self._queue(file_path, is_new_file)
+    
+    def _queue(self, file_path: Path, is_new_file: bool) -> None:
+        """Add a file to the pending batch and re-arm the flush timer."""
+        with self._lock:
+            now = time.monotonic()
+            if not self._pending:
+                self._first_event = now
+            # Created then modified within one batch is still a new file
+            self._pending[file_path] = self._pending.get(file_path, False) or is_new_file
+            
+            if self._timer:
+                self._timer.cancel()
+            deadline = self._first_event + MAX_BATCH_DELAY - now
+            self._timer = threading.Timer(max(0.0, min(DEBOUNCE_MS / 1000, deadline)), self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+    
+    def flush(self) -> None:
+        """Process all pending files as one batch."""
+        with self._process_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+                if self._timer:
+                    self._timer.cancel()
+                    self._timer = None
+            if batch:
+                self.auto_applier.process_file_changes(batch)
     
     def _should_process_file(self, file_path: Path) -> bool:
         """Check if file should be processed."""
-        # Only process Python files for now
-        if not file_path.suffix == '.py':
-            return False
-            
-        # Skip temporary files, __pycache__, etc.
-        if any(part.startswith('.') or part == '__pycache__' for part in file_path.parts):
-            return False
-            
-        # Skip files in virtual environments
-        if 'venv' in str(file_path) or '.env' in str(file_path):
-            return False
-            
-        return True
+        return self.auto_applier.should_process_file(file_path)
 
 class AutoApplier:
     """Main class for auto-applying generated code changes."""
     
-    def __init__(self, project_root: str, beads_config_path: Optional[str] = None):
+    def __init__(
+        self,
+        project_root: str,
+        beads_config_path: Optional[str] = None,
+        generated_paths: Optional[List[str]] = None,
+        batch_timeout: float = BATCH_TIMEOUT,
+    ):
         self.project_root = Path(project_root).resolve()
         self.beads_config_path = beads_config_path
+        self.batch_timeout = batch_timeout
+        self._deadline: Optional[float] = None  # monotonic, while a batch runs
         self._git_repo_root = self._find_git_root()
         
         if not self._git_repo_root:
             raise ValueError(f"No git repository found in {self.project_root}")
+        self._git = _GitSession(self._git_repo_root, self._run_command_bytes)
+        self._meta_cache = self._open_meta_cache()
+        self._meta_lock = threading.Lock()  # shelve is not thread-safe
+        self._committed_digest: Dict[Path, bytes] = {}  # content at our last commit
+        self._validate_pool = ThreadPoolExecutor(
+            max_workers=os.cpu_count() or 4, thread_name_prefix='validate'
+        )
+        
+        # Tooling is probed once; syntax checks and linting run in-process
+        self._pytest_available = importlib.util.find_spec('pytest') is not None
+        self._pytest: Optional[_PytestServer] = None
+        if self._pytest_available and hasattr(os, 'fork'):
+            self._pytest = _PytestServer(self.project_root)
+            self._pytest.start()  # warm it before the first event
+        self._style_guide = self._load_style_guide()
+        self._root_prefix = str(self._git_repo_root).rstrip(os.sep) + os.sep
+        self._ignore_match = self._build_ignore_matcher()
+        self._generated_match = self._build_generated_matcher(generated_paths or [])
             
         logger.info(f"Initialized AutoApplier for {self.project_root}")
         logger.info(f"Git repository root: {self._git_repo_root}")
     
     def _find_git_root(self) -> Optional[Path]:
         """Find the root of the git repository."""
-        current = self.project_root
-        while current != current.parent:
-            if (current / '.git').exists():
-                return current
-            current = current.parent
-        return None
+        root = _find_git_root(os.fspath(self.project_root))
+        return Path(root) if root else None
     
     def _run_command(self, cmd: List[str], cwd: Optional[Path] = None) -> Tuple[int, str, str]:
         """Run a command and return (returncode, stdout, stderr)."""
+        returncode, stdout, stderr = self._run_command_bytes(cmd, cwd)
+        return returncode, stdout.decode('utf-8', 'replace'), stderr.decode('utf-8', 'replace')
+    
+    def _run_command_bytes(self, cmd: List[str], cwd: Optional[Path] = None) -> Tuple[int, bytes, bytes]:
+        """_run_command with undecoded output, bound by the batch deadline."""
         try:
-            result = subprocess.run(
+            # Own session, so a timeout takes down everything the command spawned
+            proc = subprocess.Popen(
                 cmd,
                 cwd=cwd or self.project_root,
-                capture_output=True,
-                text=True,
-                timeout=300  # 5 minute timeout
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                start_new_session=True,
             )
-            return result.returncode, result.stdout, result.stderr
-        except subprocess.TimeoutExpired:
-            logger.error(f"Command timed out: {' '.join(cmd)}")
-            return 1, "", "Command timed out"
+            try:
+                stdout, stderr = proc.communicate(timeout=self._time_left())
+            except subprocess.TimeoutExpired:
+                self._kill_group(proc)
+                logger.error(f"Command timed out: {' '.join(cmd)}")
+                return 1, b"", b"Command timed out"
+            return proc.returncode, stdout, stderr
         except Exception as e:
             logger.error(f"Error running command {' '.join(cmd)}: {e}")
-            return 1, "", str(e)
+            return 1, b"", str(e).encode()
+    
+    def _time_left(self) -> float:
+        """Seconds a command may run: what is left of the batch deadline, at least 1."""
+        if self._deadline is None:
+            return self.batch_timeout
+        return max(1.0, self._deadline - time.monotonic())
+    
+    @staticmethod
+    def _kill_group(proc: subprocess.Popen) -> None:
+        """SIGTERM a command's process group, then SIGKILL it if it lingers."""
+        for sig, grace in ((signal.SIGTERM, KILL_GRACE), (signal.SIGKILL, None)):
+            try:
+                os.killpg(proc.pid, sig)
+            except ProcessLookupError:
+                break
+            try:
+                proc.communicate(timeout=grace)
+                break
+            except subprocess.TimeoutExpired:
+                continue
+    
+    def close(self) -> None:
+        """Stop the resident pytest process and flush the metadata cache."""
+        self._validate_pool.shutdown(wait=True)
+        if self._pytest is not None:
+            self._pytest.close()
+        if isinstance(self._meta_cache, shelve.Shelf):
+            self._meta_cache.close()
+    
+    @staticmethod
+    def _open_meta_cache() -> Union[shelve.Shelf, Dict]:
+        """Open the persistent metadata cache, or an in-memory one if that fails."""
+        try:
+            META_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+            return shelve.open(str(META_CACHE_PATH))
+        except Exception as e:
+            logger.warning(f"Metadata cache unavailable, using memory only: {e}")
+            return {}
+    
+    def _file_metadata(self, file_path: Path, st: os.stat_result) -> Tuple[TaskInfo, bool]:
+        """
+        Task info and syntax check result for a file.
+        
+        Reused while the file's mtime and size are unchanged, so a file
+        saved twice without edits is neither re-read nor re-compiled.
+        """
+        key = str(file_path)
+        with self._meta_lock:
+            cached = self._meta_cache.get(key)
+        if cached and cached[:2] == (st.st_mtime_ns, st.st_size):
+            return cached[2], cached[3]
+        
+        task_info = self._extract_task_info(file_path)
+        syntax_ok = file_path.suffix != '.py' or self._check_python_syntax(file_path)
+        with self._meta_lock:
+            self._meta_cache[key] = (st.st_mtime_ns, st.st_size, task_info, syntax_ok)
+        return task_info, syntax_ok
     
     def _is_git_tracked(self, file_path: Path) -> bool:
         """Check if file is tracked by git."""
-        rel_path = file_path.relative_to(self._git_repo_root)
-        returncode, _, _ = self._run_command(
-            ['git', 'ls-files', '--error-unmatch', str(rel_path)],
-            cwd=self._git_repo_root
-        )
+        rel_path = self._rel(file_path)
+        tracked = self._git.is_tracked(rel_path)
+        if tracked is not None:
+            return tracked
+        try:
+            returncode, _ = _run_git_quick(['ls-files', '--error-unmatch', rel_path], self._git_repo_root)
+        except OSError as e:
+            logger.error(f"Error running git ls-files: {e}")
+            return False
         return returncode == 0
     
-    def _has_uncommitted_changes(self, file_path: Path) -> bool:
-        """Check if file has uncommitted changes."""
-        rel_path = file_path.relative_to(self._git_repo_root)
-        returncode, stdout, _ = self._run_command(
-            ['git', 'status', '--porcelain', str(rel_path)],
-            cwd=self._git_repo_root
-        )
-        return returncode == 0 and stdout.strip() != ""
+    def _has_uncommitted_changes(
+        self,
+        file_path: Path,
+        mtime_ns: Optional[int] = None,
+        status: Optional[Dict[str, str]] = None,
+    ) -> bool:
+        """Check if file has uncommitted changes (in status, if given)."""
+        rel_path = self._rel(file_path)
+        if status is not None:
+            return rel_path in status
+        try:
+            if mtime_ns is None:
+                mtime_ns = os.stat(file_path).st_mtime_ns
+            return self._git.status(rel_path, mtime_ns) is not None
+        except Exception as e:
+            logger.error(f"Error reading git status: {e}")
+            return False
     
-    def _run_python_tests(self, file_path: Path) -> bool:
-        """Run Python tests for the given file."""
-        logger.info(f"Running tests for {file_path}")
+    def _run_python_tests(self, file_paths: List[Path]) -> bool:
+        """Run Python tests for the given files in one run."""
+        logger.info(f"Running tests for {', '.join(str(f) for f in file_paths)}")
         
         # Try pytest first
         if self._has_pytest():
-            return self._run_pytest(file_path)
+            return self._run_pytest(file_paths)
         
         # Fall back to basic syntax check
-        return self._check_python_syntax(file_path)
+        return all(self._check_python_syntax(f) for f in file_paths)
     
     def _has_pytest(self) -> bool:
-        """Check if pytest is available."""
-        returncode, _, _ = self._run_command(['python', '-m', 'pytest', '--version'])
-        return returncode == 0
+        """Check if pytest is available (probed once at init)."""
+        return self._pytest_available
     
-    def _run_pytest(self, file_path: Path) -> bool:
-        """Run pytest for the file or related tests."""
-        # Look for corresponding test file
-        test_patterns = [
-            file_path.parent / f"test_{file_path.name}",
-            file_path.parent / "tests" / f"test_{file_path.name}",
-            self.project_root / "tests" / f"test_{file_path.name}",
-        ]
-        
-        test_files = [t for t in test_patterns if t.exists()]
+    def _run_pytest(self, file_paths: List[Path]) -> bool:
+        """Run pytest once for the files' related tests."""
+        test_files = []
+        run_all = False
+        for file_path in file_paths:
+            # Look for corresponding test file
+            test_patterns = [
+                file_path.parent / f"test_{file_path.name}",
+                file_path.parent / "tests" / f"test_{file_path.name}",
+                self.project_root / "tests" / f"test_{file_path.name}",
+            ]
+            found = [t for t in test_patterns if t.exists()]
+            if not found:
+                run_all = True
+                break
+            test_files.extend(t for t in found if t not in test_files)
         
-        if test_files:
-            # Run specific test files
-            cmd = ['python', '-m', 'pytest'] + [str(t) for t in test_files]
-        else:
+        if run_all:
             # Run all tests in the project
-            cmd = ['python', '-m', 'pytest', str(self.project_root)]
+            args = PYTEST_ARGS + [str(self.project_root)]
+        else:
+            # Run specific test files
+            args = PYTEST_ARGS + [str(t) for t in test_files]
         
-        returncode, stdout, stderr = self._run_command(cmd)
+        result = self._pytest.run(args, self._time_left()) if self._pytest is not None else None
+        if result is None:
+            returncode, stdout, stderr = self._run_command([sys.executable, '-m', 'pytest'] + args)
+            result = (returncode, stdout + stderr)
+        returncode, output = result
         
         if returncode == 0:
             logger.info("Tests passed")
             return True
         else:
-            logger.warning(f"Tests failed: {stderr}")
+            logger.warning(f"Tests failed: {output}")
             return False
     
     def _check_python_syntax(self, file_path: Path) -> bool:
         """Check Python syntax of the file."""
         logger.info(f"Checking syntax for {file_path}")
         
-        returncode, stdout, stderr = self._run_command([
-            'python', '-m', 'py_compile', str(file_path)
-        ])
+        # Compile in memory: same check as py_compile, without a subprocess
+        # or a .pyc landing in the watched tree
+        try:
+            compile(file_path.read_bytes(), str(file_path), 'exec', dont_inherit=True)
+        except (SyntaxError, ValueError) as e:
+            logger.warning(f"Syntax check failed: {e}")
+            return False
+        except OSError as e:
+            logger.warning(f"Syntax check failed, could not read file: {e}")
+            return False
         
-        if returncode == 0:
-            logger.info("Syntax check passed")
-            return True
-        else:
-            logger.warning(f"Syntax check failed: {stderr}")
+        logger.info("Syntax check passed")
+        return True
+    
+    def _build_ignore_matcher(self):
+        """
+        Compile the ignore rules into a single matcher over repo-relative paths.
+        
+        With pathspec installed the repo's .gitignore is honoured on top of
+        BUILTIN_IGNORE; otherwise only the built-in rules apply.
+        """
+        if pathspec is None:
+            return _IGNORE_RE.search
+        
+        lines = list(BUILTIN_IGNORE)
+        try:
+            with open(self._git_repo_root / '.gitignore', 'r', encoding='utf-8') as f:
+                lines.extend(f.read().splitlines())
+        except OSError:
+            pass
+        return pathspec.PathSpec.from_lines('gitwildmatch', lines).match_file
+    
+    @staticmethod
+    def _build_generated_matcher(patterns: List[str]) -> Optional[Callable[[str], object]]:
+        """
+        Compile the generated-path globs (gitignore-style with pathspec).
+        
+        Files matching them are committed after a syntax check alone,
+        without tests or linting.
+        """
+        if not patterns:
+            return None
+        if pathspec is not None:
+            return pathspec.PathSpec.from_lines('gitwildmatch', patterns).match_file
+        return re.compile('|'.join(fnmatch.translate(p) for p in patterns)).match
+    
+    def _is_generated(self, file_path: Path) -> bool:
+        """Check if a file is under one of the configured generated paths."""
+        return self._generated_match is not None and bool(self._generated_match(self._rel(file_path)))
+    
+    def _rel(self, file_path: Path) -> str:
+        """Repo-relative path string, by prefix slicing rather than relative_to()."""
+        path = os.fspath(file_path)
+        if path.startswith(self._root_prefix):
+            return path[len(self._root_prefix):]
+        return os.path.relpath(path, self._git_repo_root)
+    
+    def should_process_file(self, file_path: Path) -> bool:
+        """Check if a changed file should be validated and committed."""
+        # Only process Python files for now
+        if file_path.suffix != '.py':
+            return False
+        
+        path = str(file_path)
+        if not path.startswith(self._root_prefix):
             return False
+        return not self._ignore_match(path[len(self._root_prefix):])
     
-    def _run_linting(self, file_path: Path) -> bool:
-        """Run linting checks on the file."""
-        # Try flake8 if available
-        returncode, _, _ = self._run_command(['python', '-m', 'flake8', '--version'])
-        if returncode == 0:
-            returncode, stdout, stderr = self._run_command([
-                'python', '-m', 'flake8', '--max-line-length=88', str(file_path)
-            ])
-            if returncode != 0:
-                logger.warning(f"Linting warnings: {stdout}{stderr}")
+    def should_watch_dir(self, dir_path: str) -> bool:
+        """Check if a directory needs a watch (it is not ignored as a whole)."""
+        if not dir_path.startswith(self._root_prefix):
+            return False
+        return not self._ignore_match(dir_path[len(self._root_prefix):] + '/')
+    
+    @staticmethod
+    def _load_style_guide():
+        """Build the flake8 style guide once, or None if flake8 is unavailable."""
+        if flake8_legacy is None:
+            return None
+        try:
+            return flake8_legacy.get_style_guide(max_line_length=88)
+        except Exception as e:
+            logger.warning(f"flake8 unavailable: {e}")
+            return None
+    
+    def _run_linting(self, file_paths: List[Path]) -> bool:
+        """Run linting checks on the files (flake8 spreads them over its jobs)."""
+        if self._style_guide is None:
+            return True
+        
+        names = ', '.join(str(f) for f in file_paths)
+        try:
+            report = self._style_guide.check_files([str(f) for f in file_paths])
+            if report.total_errors:
                 # Don't fail on linting warnings, just log them
+                logger.warning(f"Linting warnings: {report.total_errors} in {names}")
+        except Exception as e:
+            logger.warning(f"Linting failed for {names}: {e}")
         
         return True
     
@@ -218,21 +735,20 @@ class AutoApplier:
         """Extract task information from file comments or beads config."""
         # Try to read task info from file comments
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-                
-            # Look for task info in comments
-            lines = content.split('\n')
-            task_id = None
-            title = None
+            # The markers live in the header; never read past TASK_HEADER_BYTES
+            with open(file_path, 'rb') as f:
+                header = f.read(TASK_HEADER_BYTES)
             
-            for line in lines[:20]:  # Check first 20 lines
-                line = line.strip()
-                if line.startswith('#') or line.startswith('"""') or line.startswith("'''"):
-                    if 'task_id:' in line.lower():
-                        task_id = line.split('task_id:', 1)[1].strip().strip('"\'')
-                    elif 'title:' in line.lower():
-                        title = line.split('title:', 1)[1].strip().strip('"\'')
+            # Look for task info in comments within the first 20 lines
+            lines = header.split(b'\n', 20)[:20]
+            if len(lines) < 20 and len(header) == TASK_HEADER_BYTES:
+                lines.pop()  # cut off mid-line
+            fields = {}
+            for match in _TASK_MARKER_RE.finditer(b'\n'.join(lines)):
+                value = match.group(2).decode('utf-8', 'replace').strip().strip('"\'')
+                fields[match.group(1).lower()] = value
+            task_id = fields.get(b'task_id')
+            title = fields.get(b'title')
             
             if task_id and title:
                 return TaskInfo(task_id=task_id, title=title)
@@ -242,7 +758,7 @@ class AutoApplier:
         
         # Fall back to generic info
         return TaskInfo(
-            task_id=hashlib.md5(str(file_path).encode()).hexdigest()[:8],
+            task_id=hashlib.blake2b(str(file_path).encode(), digest_size=4).hexdigest(),
             title=f"Code changes in {file_path.name}"
         )
     
@@ -250,20 +766,16 @@ class AutoApplier:
         """Create a git commit for the changes."""
         try:
             # Add the file to git
-            rel_path = file_path.relative_to(self._git_repo_root)
+            rel_path = self._rel(file_path)
             returncode, _, stderr = self._run_command([
-                'git', 'add', str(rel_path)
+                'git', 'add', rel_path
             ], cwd=self._git_repo_root)
             
             if returncode != 0:
                 logger.error(f"Failed to add file to git: {stderr}")
                 return False
             
-            # Create commit message
-            if is_new_file:
-                commit_msg = f"Add new file: {task_info.task_id} - {task_info.title}"
-            else:
-                commit_msg = f"Apply generated code improvement: {task_info.task_id} - {task_info.title}"
+            commit_msg = self._commit_message(task_info, [(rel_path, is_new_file)])
             
             # Commit the changes
             returncode, _, stderr = self._run_command([
@@ -274,6 +786,7 @@ class AutoApplier:
                 logger.error(f"Failed to create commit: {stderr}")
                 return False
             
+            self._git.invalidate()
             logger.info(f"Created commit: {commit_msg}")
             return True
             
@@ -281,6 +794,61 @@ class AutoApplier:
             logger.error(f"Error creating commit: {e}")
             return False
     
+    @staticmethod
+    def _commit_message(task_info: TaskInfo, files: List[Tuple[str, bool]]) -> str:
+        """Build the commit message for one task's files ((rel path, is new) pairs)."""
+        if len(files) == 1:
+            if files[0][1]:
+                return f"Add new file: {task_info.task_id} - {task_info.title}"
+            return f"Apply generated code improvement: {task_info.task_id} - {task_info.title}"
+        
+        lines = [f"Apply generated code: {task_info.task_id} - {task_info.title}", ""]
+        lines.extend(f"{'Add' if is_new else 'Update'} {rel_path}" for rel_path, is_new in files)
+        return '\n'.join(lines)
+    
+    def _commit_batch(self, entries: List[Tuple[Path, TaskInfo, bool]]) -> Set[Path]:
+        """
+        Stage a batch with one git add and commit it with one commit per task.
+        
+        Args:
+            entries: (file path, task info, is new file) for each validated file
+            
+        Returns:
+            The file paths that ended up committed
+        """
+        rel_paths = {file_path: self._rel(file_path) for file_path, _, _ in entries}
+        returncode, _, stderr = self._run_command(
+            ['git', 'add', '--'] + list(rel_paths.values()),
+            cwd=self._git_repo_root,
+        )
+        if returncode != 0:
+            logger.error(f"Failed to add files to git: {stderr}")
+            return set()
+        
+        groups: Dict[str, List[Tuple[Path, TaskInfo, bool]]] = {}
+        for entry in entries:
+            groups.setdefault(entry[1].task_id, []).append(entry)
+        
+        committed: Set[Path] = set()
+        for group in groups.values():
+            task_info = group[0][1]
+            commit_msg = self._commit_message(
+                task_info, [(rel_paths[file_path], is_new) for file_path, _, is_new in group]
+            )
+            # Pathspec limits each commit to its own group's files
+            returncode, _, stderr = self._run_command(
+                ['git', 'commit', '-m', commit_msg, '--'] + [rel_paths[f] for f, _, _ in group],
+                cwd=self._git_repo_root,
+            )
+            if returncode != 0:
+                logger.error(f"Failed to create commit: {stderr}")
+                continue
+            committed.update(file_path for file_path, _, _ in group)
+            logger.info(f"Created commit: {commit_msg.splitlines()[0]}")
+        
+        self._git.invalidate()
+        return committed
+    
     def _update_beads_task_status(self, task_info: TaskInfo, status: str) -> None:
         """Update the task status in Beads configuration."""
         if not self.beads_config_path:
@@ -302,70 +870,267 @@ class AutoApplier:
     
     def process_file_change(self, file_path: Path, is_new_file: bool = False) -> None:
         """Process a detected file change."""
+        self.process_file_changes({file_path: is_new_file})
+    
+    @staticmethod
+    def _content_digest(file_path: Path) -> Optional[bytes]:
+        """BLAKE2b digest of the file's bytes, or None if it cannot be read."""
+        try:
+            with open(file_path, 'rb') as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    return hashlib.blake2b(b'', digest_size=16).digest()
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    return hashlib.blake2b(data, digest_size=16).digest()
+        except (OSError, ValueError):
+            return None
+    
+    def _screen_file(
+        self, file_path: Path, is_new_file: bool, status: Optional[Dict[str, str]]
+    ) -> Optional[Tuple[Path, TaskInfo, bool]]:
+        """Pre-test checks for one file; the commit entry, or None if it is skipped."""
         try:
             logger.info(f"Processing {'new' if is_new_file else 'modified'} file: {file_path}")
             
             # Skip if file doesn't exist (might have been deleted)
-            if not file_path.exists():
+            try:
+                st = os.stat(file_path, follow_symlinks=False)
+            except FileNotFoundError:
                 logger.debug(f"File no longer exists: {file_path}")
-                return
+                return None
             
             # For existing files, check if there are actually uncommitted changes
-            if not is_new_file and self._is_git_tracked(file_path):
-                if not self._has_uncommitted_changes(file_path):
+            if status is not None and not is_new_file and self._is_git_tracked(file_path):
+                if not self._has_uncommitted_changes(file_path, status=status):
                     logger.debug(f"No uncommitted changes in {file_path}")
-                    return
+                    return None
             
-            # Extract task information
-            task_info = self._extract_task_info(file_path)
+            # Extract task information (and syntax result, cached by stat)
+            task_info, syntax_ok = self._file_metadata(file_path, st)
             if not task_info:
                 logger.warning(f"Could not extract task info from {file_path}")
-                return
-            
-            # Run validation
-            validation_passed = True
-            
-            # Check Python syntax and run tests
-            if file_path.suffix == '.py':
-                if not self._check_python_syntax(file_path):
-                    validation_passed = False
-                elif not self._run_python_tests(file_path):
-                    validation_passed = False
-                else:
-                    self._run_linting(file_path)  # Non-blocking
+                return None
             
-            if not validation_passed:
+            # Check Python syntax
+            if file_path.suffix == '.py' and not syntax_ok:
                 logger.warning(f"Validation failed for {file_path}, skipping commit")
                 self._update_beads_task_status(task_info, "validation_failed")
-                return
+                return None
             
-            # Create git commit
-            if self._create_commit(file_path, task_info, is_new_file):
+            return file_path, task_info, is_new_file
+        except Exception as e:
+            logger.error(f"Error processing file change {file_path}: {e}")
+            return None
+    
+    def process_file_changes(self, changes: Dict[Path, bool]) -> None:
+        """
+        Validate and commit a batch of changed files.
+        
+        Each file is screened on its own (uncommitted changes, syntax), then
+        all surviving Python files share one pytest run before the files are
+        committed, one commit per task. Commands share one batch_timeout
+        deadline, so a hung test run cannot stall the watcher for long.
+        
+        Args:
+            changes: Changed files mapped to whether each one is new
+        """
+        self._deadline = time.monotonic() + self.batch_timeout
+        try:
+            self._process_batch(changes)
+        finally:
+            self._deadline = None
+    
+    def _process_batch(self, changes: Dict[Path, bool]) -> None:
+        # Files whose bytes match what we last committed need no git call at all
+        digests = {f: self._content_digest(f) for f in changes}
+        unchanged = [
+            f for f, digest in digests.items()
+            if digest is not None and self._committed_digest.get(f) == digest
+        ]
+        if unchanged:
+            logger.debug(f"Unchanged since last commit: {', '.join(str(f) for f in unchanged)}")
+            changes = {f: is_new for f, is_new in changes.items() if f not in unchanged}
+        
+        # One git status snapshot for the whole batch, taken before fanning out
+        status = None
+        try:
+            if any(not is_new and self._is_git_tracked(f) for f, is_new in changes.items()):
+                status = self._git.snapshot()
+        except Exception as e:
+            # Without a snapshot no tracked file counts as changed, so they are
+            # all skipped this batch (as a failed per-file check did)
+            logger.error(f"Error reading git status, skipping tracked files: {e}")
+            status = {}
+        
+        # Screening reads and compiles each file; overlap them across the batch
+        items = list(changes.items())
+        if len(items) > 1:
+            screened = self._validate_pool.map(lambda item: self._screen_file(*item, status), items)
+        else:
+            screened = [self._screen_file(*item, status) for item in items]
+        ready: List[Tuple[Path, TaskInfo, bool]] = [entry for entry in screened if entry]
+        
+        # Run tests once for every Python file in the batch
+        # (generated files only need the syntax check they already passed)
+        tested = {
+            file_path for file_path, _, _ in ready
+            if file_path.suffix == '.py' and not self._is_generated(file_path)
+        }
+        if tested and not self._run_python_tests(sorted(tested)):
+            for file_path, task_info, _ in ready:
+                if file_path in tested:
+                    logger.warning(f"Validation failed for {file_path}, skipping commit")
+                    self._update_beads_task_status(task_info, "validation_failed")
+            ready = [entry for entry in ready if entry[0] not in tested]
+            tested = set()
+        
+        python_files = sorted(tested)
+        if python_files:
+            self._run_linting(python_files)  # Non-blocking
+        
+        # Create git commits, one per task
+        committed: Set[Path] = set()
+        try:
+            if len(ready) == 1:
+                file_path, task_info, is_new_file = ready[0]
+                if self._create_commit(file_path, task_info, is_new_file):
+                    committed.add(file_path)
+            elif ready:
+                committed = self._commit_batch(ready)
+        except Exception as e:
+            logger.error(f"Error creating commits: {e}")
+        
+        for file_path, task_info, _ in ready:
+            if file_path in committed:
+                if digests[file_path] is not None:
+                    self._committed_digest[file_path] = digests[file_path]
+                with self._meta_lock:
+                    self._meta_cache.pop(str(file_path), None)
                 logger.info(f"Successfully applied changes for {file_path}")
                 self._update_beads_task_status(task_info, "deployed")
             else:
                 logger.error(f"Failed to commit changes for {file_path}")
                 self._update_beads_task_status(task_info, "commit_failed")
-                
-        except Exception as e:
-            logger.error(f"Error processing file change {file_path}: {e}")
     
     def start_watching(self, recursive: bool = True) -> None:
         """Start watching for file changes."""
         event_handler = CodeChangeHandler(self)
+        if inotify_simple is not None and sys.platform.startswith('linux'):
+            self._watch_inotify(event_handler, recursive)
+            return
+        
+        # One recursive schedule: watchdog gives every schedule its own
+        # emitter thread (and inotify instance on Linux), so per-directory
+        # watches would exhaust fs.inotify.max_user_instances on large trees.
+        # Ignored paths are filtered per event by should_process_file.
         observer = Observer()
         observer.schedule(event_handler, str(self.project_root), recursive=recursive)
         
         logger.info(f"Starting file watcher on {self.project_root}")
         observer.start()
         
+        # Block until SIGINT/SIGTERM instead of waking up to poll
+        stop = threading.Event()
+        previous = {
+            sig: signal.signal(sig, lambda *_: stop.set())
+            for sig in (signal.SIGINT, signal.SIGTERM)
+        }
         try:
-            while True:
-                time.sleep(1)
-        except KeyboardInterrupt:
-            logger.info("Stopping file watcher...")
-            observer.stop()
+            stop.wait()
+        finally:
+            for sig, handler in previous.items():
+                signal.signal(sig, handler)
+        
+        logger.info("Stopping file watcher...")
+        observer.stop()
         observer.join()
+        event_handler.flush()
+    
+    def _add_watch_tree(
+        self,
+        top: str,
+        recursive: bool,
+        add_watch: Callable[[str], object],
+        event_handler: Optional[CodeChangeHandler] = None,
+    ) -> int:
+        """
+        Watch top and, if recursive, every non-ignored directory below it.
+        
+        When event_handler is given (a directory that appeared while
+        watching), files already inside are queued as new, since they may
+        have been written before the watch existed.
+        
+        Returns:
+            Number of directories watched
+        """
+        if event_handler is not None and not self.should_watch_dir(top):
+            return 0
+        
+        count = 0
+        for dirpath, dirnames, filenames in os.walk(top):
+            add_watch(dirpath)
+            count += 1
+            if event_handler is not None:
+                for name in filenames:
+                    event_handler.notify(Path(dirpath, name), is_new_file=True)
+            if not recursive:
+                break
+            dirnames[:] = [d for d in dirnames if self.should_watch_dir(os.path.join(dirpath, d))]
+        return count
+    
+    def _watch_inotify(self, event_handler: CodeChangeHandler, recursive: bool) -> None:
+        """
+        Watch with raw inotify, draining every queued event per read().
+        
+        Saves land as CLOSE_WRITE rather than a stream of MODIFY events, and
+        editors that save via rename show up as MOVED_TO.
+        """
+        flags = inotify_simple.flags
+        file_mask = flags.CREATE | flags.CLOSE_WRITE | flags.MOVED_TO
+        inotify = inotify_simple.INotify()
+        wd_paths: Dict[int, Path] = {}
+        
+        def add_watch(dirpath: str) -> None:
+            try:
+                wd_paths[inotify.add_watch(dirpath, file_mask)] = Path(dirpath)
+            except OSError as e:
+                logger.warning(f"Cannot watch {dirpath}: {e}")
+        
+        self._add_watch_tree(os.fspath(self.project_root), recursive, add_watch)
+        logger.info(f"Starting inotify watcher on {self.project_root} ({len(wd_paths)} directories)")
+        
+        # SIGINT/SIGTERM set stop; reads time out so the loop notices it
+        stop = threading.Event()
+        previous = {
+            sig: signal.signal(sig, lambda *_: stop.set())
+            for sig in (signal.SIGINT, signal.SIGTERM)
+        }
+        try:
+            while not stop.is_set():
+                for event in inotify.read(timeout=INOTIFY_READ_TIMEOUT_MS):
+                    if event.mask & flags.Q_OVERFLOW:
+                        logger.warning("inotify queue overflowed, some changes were missed")
+                        continue
+                    if event.mask & flags.IGNORED:
+                        wd_paths.pop(event.wd, None)
+                        continue
+                    
+                    parent = wd_paths.get(event.wd)
+                    if parent is None:
+                        continue
+                    path = parent / event.name
+                    
+                    if event.mask & flags.ISDIR:
+                        if recursive and event.mask & (flags.CREATE | flags.MOVED_TO):
+                            self._add_watch_tree(os.fspath(path), True, add_watch, event_handler)
+                        continue
+                    
+                    event_handler.notify(path, is_new_file=bool(event.mask & flags.CREATE))
+            logger.info("Stopping file watcher...")
+        finally:
+            for sig, handler in previous.items():
+                signal.signal(sig, handler)
+            inotify.close()
+            event_handler.flush()
     
     def process_single_file(self, file_path: Union[str, Path]) -> None:
         """Process a single file immediately."""
@@ -389,4 +1154,40 @@ def main():
     )
     parser.add_argument(
         "--beads-config",
-        help="Path to Beads
\ No newline at end of file
+        help="Path to Beads configuration file"
+    )
+    parser.add_argument(
+        "--file",
+        help="Process a single file and exit instead of watching"
+    )
+    parser.add_argument(
+        "--generated",
+        action="append",
+        default=[],
+        metavar="GLOB",
+        help="Path glob (repo-relative) for generated files that skip tests and linting; repeatable"
+    )
+    parser.add_argument(
+        "--no-recursive",
+        action="store_true",
+        help="Only watch the top level of project_root"
+    )
+    args = parser.parse_args()
+    
+    try:
+        auto_applier = AutoApplier(args.project_root, args.beads_config, args.generated)
+    except ValueError as e:
+        logger.error(str(e))
+        sys.exit(1)
+    
+    try:
+        if args.file:
+            auto_applier.process_single_file(args.file)
+        else:
+            auto_applier.start_watching(recursive=not args.no_recursive)
+    finally:
+        auto_applier.close()
+
+
+if __name__ == "__main__":
+    main()
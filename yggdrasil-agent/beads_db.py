@@ -10,17 +10,209 @@ Improvements over JSONL file approach:
 5. Audit trail - Optional full history of all changes
 """
 
+import os
 import sqlite3
 import json
 import logging
+import queue
+import threading
 import time
 from pathlib import Path
-from typing import Optional, Dict, Any, List
-from datetime import datetime, timezone
+from typing import Optional, Dict, Any, Iterable, List, Set
 from contextlib import contextmanager
 
+try:
+    import orjson
+    _dumps = orjson.dumps
+except ImportError:
+    def _dumps(obj: Any) -> bytes:
+        return json.dumps(obj).encode('utf-8')
+
 logger = logging.getLogger(__name__)
 
+# Applied once to every pooled connection when it is opened. page_size only
+# takes effect on a new database, so it must come before journal_mode=WAL.
+# synchronous=NORMAL under WAL can lose the last commits on power loss but
+# never corrupts the database. The busy timeout comes from connect(timeout=).
+CONNECTION_PRAGMAS = (
+    'PRAGMA page_size=8192',
+    'PRAGMA journal_mode=WAL',
+    'PRAGMA synchronous=NORMAL',
+    'PRAGMA wal_autocheckpoint=1000',  # pages
+    'PRAGMA temp_store=MEMORY',
+    'PRAGMA mmap_size=268435456',  # 256 MiB
+    'PRAGMA cache_size=-65536',  # 64 MiB
+)
+
+
+# Per-connection prepared statement cache; pooled connections live long
+# enough that every hot statement stays compiled
+CACHED_STATEMENTS = 256
+
+def _has_json1() -> bool:
+    conn = sqlite3.connect(':memory:')
+    try:
+        conn.execute("SELECT json_valid('[]')")
+        return True
+    except sqlite3.OperationalError:
+        return False
+    finally:
+        conn.close()
+
+
+# The task_labels table is maintained by triggers built on json_each
+HAS_JSON1 = _has_json1()
+
+# Separator for labels flattened by GROUP_CONCAT; never appears in a tag
+LABEL_SEP = '\x1f'
+
+# Audit entries are flushed in batches of up to AUDIT_BATCH_SIZE, at most
+# AUDIT_FLUSH_INTERVAL seconds after they were queued
+AUDIT_BATCH_SIZE = 256
+AUDIT_FLUSH_INTERVAL = 0.1
+
+_AUDIT_INSERT_SQL = '''
+    INSERT INTO audit_log
+    (task_id, timestamp, operation, old_status, new_status, error_message)
+    VALUES (?, ?, ?, ?, ?, ?)
+'''
+
+# Optional SET clauses of update_task, in the bit order of its field mask
+_UPDATE_OPTIONAL_FIELDS = ('result = ?', 'last_error = ?', 'closed_at = ?', 'attempt_count = ?')
+
+# update_task's UPDATE statement for every field mask, built once
+_UPDATE_TASK_SQL = tuple(
+    'UPDATE tasks SET ' + ', '.join(
+        ['status = ?', 'updated_at = ?']
+        + [field for bit, field in enumerate(_UPDATE_OPTIONAL_FIELDS) if mask >> bit & 1]
+    ) + ' WHERE id = ?'
+    for mask in range(1 << len(_UPDATE_OPTIONAL_FIELDS))
+)
+
+# Bound parameters per IN (...) query; SQLite's historical limit is 999
+MAX_SQL_PARAMS = 900
+
+# Column list shared by single and bulk task inserts
+_TASK_INSERT_COLUMNS = (
+    '(id, title, description, status, priority, issue_type, labels, created_at, updated_at) '
+    'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)'
+)
+_INSERT_OR_IGNORE_TASK_SQL = f'INSERT OR IGNORE INTO tasks {_TASK_INSERT_COLUMNS}'
+
+# Columns get_ready_tasks returns: everything the dispatcher routes on, but
+# not the up-to-32KB result of an earlier attempt or closed_at
+_READY_TASK_COLUMNS = (
+    'id, title, description, status, priority, issue_type, '
+    'created_at, updated_at, attempt_count, last_error'
+)
+
+# get_ready_tasks always binds its LIMIT (-1 means none) so one statement is reused.
+# With JSON1, labels come from task_labels already split, so rows skip json.loads.
+_READY_TASKS_SQL = '''
+    SELECT {}, {}
+    FROM tasks
+    WHERE status = 'open'
+    ORDER BY priority ASC, created_at ASC
+    LIMIT ?
+'''.format(
+    _READY_TASK_COLUMNS,
+    "(SELECT GROUP_CONCAT(label, char(31)) FROM task_labels"
+    " WHERE task_labels.task_id = tasks.id) AS label_list"
+    if HAS_JSON1 else 'labels',
+)
+
+# Statuses counted by get_stats, aggregated in one row with no GROUP BY
+_STAT_STATUSES = ('open', 'in_progress', 'closed', 'blocked')
+_STATS_SQL = 'SELECT {} FROM tasks'.format(', '.join(
+    f"COALESCE(SUM(status = '{status}'), 0)" for status in _STAT_STATUSES
+))
+
+
+def _now_iso() -> str:
+    """Current UTC time as ISO-8601 with microseconds, without building a datetime"""
+    seconds, ns = divmod(time.time_ns(), 1_000_000_000)
+    return f"{time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(seconds))}.{ns // 1000:06d}+00:00"
+
+
+class _ConnectionPool:
+    """
+    Long-lived SQLite connections: one writer and up to max_readers readers.
+    
+    Pragmas and row_factory are set once per connection, and connections go
+    back to the pool instead of being closed. The single writer matches
+    SQLite's one-writer model; readers run concurrently under WAL.
+    """
+    
+    def __init__(self, db_path: Path, timeout: float, max_readers: int = 4):
+        self.db_path = db_path
+        self.timeout = timeout
+        self.max_readers = max_readers
+        self._readers: queue.Queue = queue.Queue()
+        self._reader_count = 0
+        self._all: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self._writer: Optional[sqlite3.Connection] = None
+        # Reentrant so a write helper can run inside another's transaction
+        self._writer_lock = threading.RLock()
+        self._writer_depth = 0
+    
+    def _connect(self, read_only: bool = False) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            str(self.db_path), timeout=self.timeout, check_same_thread=False,
+            cached_statements=CACHED_STATEMENTS,
+        )
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        if read_only:
+            conn.execute('PRAGMA query_only=ON')
+        conn.row_factory = sqlite3.Row
+        with self._lock:
+            self._all.append(conn)
+        return conn
+    
+    @contextmanager
+    def get_rw(self):
+        """The writer connection, held exclusively for the block"""
+        with self._writer_lock:
+            if self._writer is None:
+                self._writer = self._connect()
+            conn = self._writer
+            self._writer_depth += 1
+            try:
+                yield conn
+            finally:
+                self._writer_depth -= 1
+                # Never hand the writer on with a transaction left open
+                if self._writer_depth == 0 and conn.in_transaction:
+                    conn.rollback()
+    
+    @contextmanager
+    def get_ro(self):
+        """A reader connection, returned to the pool after the block"""
+        try:
+            conn = self._readers.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                can_open = self._reader_count < self.max_readers
+                if can_open:
+                    self._reader_count += 1
+            conn = self._connect(read_only=True) if can_open else self._readers.get()
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            self._readers.put(conn)
+    
+    def close(self) -> None:
+        with self._lock:
+            for conn in self._all:
+                conn.close()
+            self._all.clear()
+            self._reader_count = 0
+        self._readers = queue.Queue()
+        self._writer = None
+
 
 class BeadsDatabase:
     """SQLite-based Beads task database with transactions"""
@@ -57,14 +249,27 @@ class BeadsDatabase:
         # Create database directory if needed
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
         
+        # Connections (and their pragmas) are opened once and reused
+        self._pool = _ConnectionPool(self.db_path, timeout)
+        
         # Initialize database
         self._init_db()
         
+        # Audit rows are queued by update_task and written off the hot path
+        self._audit_queue: queue.Queue = queue.Queue()
+        # Guards _audit_closed so nothing is queued behind close()'s sentinel
+        self._audit_lock = threading.Lock()
+        self._audit_closed = False
+        self._audit_thread = threading.Thread(
+            target=self._audit_writer, name='beads-audit', daemon=True
+        )
+        self._audit_thread.start()
+        
         logger.info(f"Initialized Beads database at {self.db_path}")
     
     def _init_db(self) -> None:
         """Initialize database schema"""
-        with self._get_connection() as conn:
+        with self._pool.get_rw() as conn:
             cursor = conn.cursor()
             
             # Create tasks table
@@ -86,15 +291,21 @@ class BeadsDatabase:
                 )
             ''')
             
-            # Create index for common queries
-            cursor.execute('''
-                CREATE INDEX IF NOT EXISTS idx_status 
-                ON tasks(status)
-            ''')
+            # Create index for common queries. idx_status is superseded by
+            # idx_open_ready and only steered the planner into a sort.
+            cursor.execute('DROP INDEX IF EXISTS idx_status')
             cursor.execute('''
                 CREATE INDEX IF NOT EXISTS idx_priority
                 ON tasks(priority, created_at)
             ''')
+            # Partial index for get_ready_tasks: filter and order in one walk, no sort
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_open_ready
+                ON tasks(priority, created_at) WHERE status = 'open'
+            ''')
+            
+            if HAS_JSON1:
+                self._init_label_table(cursor)
             
             # Create audit log table (optional, tracks all changes)
             cursor.execute('''
@@ -110,26 +321,75 @@ class BeadsDatabase:
             ''')
             
             conn.commit()
+            
+            # Gather planner statistics once, the first time the schema is created
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'")
+            if cursor.fetchone() is None:
+                cursor.execute('ANALYZE')
+                conn.commit()
     
-    @contextmanager
-    def _get_connection(self):
+    @staticmethod
+    def _init_label_table(cursor: sqlite3.Cursor) -> None:
         """
-        Get database connection with WAL mode for concurrency.
+        Normalized copy of tasks.labels, one row per label.
         
-        WAL (Write-Ahead Logging) allows concurrent readers while writes
-        happen without blocking, eliminating stale lock issues.
+        Triggers keep it in step with every insert, labels update and delete,
+        so the labels JSON column stays the stored form (export_to_jsonl
+        splices it verbatim) while reads and label lookups go through this
+        table.
         """
-        conn = sqlite3.connect(str(self.db_path), timeout=self.timeout)
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'task_labels'")
+        is_new = cursor.fetchone() is None
+        # Databases from before the update trigger may hold stale label rows
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = 'task_labels_update'")
+        needs_resync = not is_new and cursor.fetchone() is None
         
-        # Enable WAL mode for better concurrency
-        conn.execute('PRAGMA journal_mode=WAL')
-        conn.execute('PRAGMA synchronous=NORMAL')
-        conn.row_factory = sqlite3.Row
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS task_labels (
+                task_id TEXT NOT NULL,
+                pos INTEGER NOT NULL,
+                label TEXT NOT NULL,
+                PRIMARY KEY (task_id, pos)
+            ) WITHOUT ROWID
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_task_labels_label
+            ON task_labels(label)
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS task_labels_insert AFTER INSERT ON tasks
+            BEGIN
+                INSERT INTO task_labels (task_id, pos, label)
+                SELECT NEW.id, key, value
+                FROM json_each(CASE WHEN json_valid(NEW.labels) THEN NEW.labels ELSE '[]' END);
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS task_labels_update AFTER UPDATE OF labels ON tasks
+            BEGIN
+                DELETE FROM task_labels WHERE task_id = OLD.id;
+                INSERT INTO task_labels (task_id, pos, label)
+                SELECT NEW.id, key, value
+                FROM json_each(CASE WHEN json_valid(NEW.labels) THEN NEW.labels ELSE '[]' END);
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS task_labels_delete AFTER DELETE ON tasks
+            BEGIN
+                DELETE FROM task_labels WHERE task_id = OLD.id;
+            END
+        ''')
         
-        try:
-            yield conn
-        finally:
-            conn.close()
+        if needs_resync:
+            cursor.execute('DELETE FROM task_labels')
+        if is_new or needs_resync:
+            # Backfill tasks written before the table (or trigger) existed
+            cursor.execute('''
+                INSERT INTO task_labels (task_id, pos, label)
+                SELECT tasks.id, j.key, j.value
+                FROM tasks, json_each(tasks.labels) AS j
+                WHERE json_valid(tasks.labels)
+            ''')
     
     def get_ready_tasks(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
         """
@@ -141,19 +401,9 @@ class BeadsDatabase:
         Returns:
             List of task dictionaries
         """
-        with self._get_connection() as conn:
+        with self._pool.get_ro() as conn:
             cursor = conn.cursor()
-            
-            query = '''
-                SELECT * FROM tasks
-                WHERE status = 'open'
-                ORDER BY priority ASC, created_at ASC
-            '''
-            
-            if limit:
-                query += f' LIMIT {limit}'
-            
-            cursor.execute(query)
+            cursor.execute(_READY_TASKS_SQL, (limit or -1,))
             rows = cursor.fetchall()
             
             return [self._row_to_dict(row) for row in rows]
@@ -182,9 +432,9 @@ class BeadsDatabase:
         Returns:
             True if successful, False if task not found
         """
-        now = datetime.now(timezone.utc).isoformat()
+        now = _now_iso()
         
-        with self._get_connection() as conn:
+        with self._pool.get_rw() as conn:
             cursor = conn.cursor()
             
             try:
@@ -201,43 +451,39 @@ class BeadsDatabase:
                 
                 old_status = row[0]
                 
-                # Update task
-                update_fields = [
-                    'status = ?',
-                    'updated_at = ?',
-                ]
+                # Update task (values in _UPDATE_OPTIONAL_FIELDS order)
                 update_values = [status, now]
+                mask = 0
                 
                 if result is not None:
-                    update_fields.append('result = ?')
+                    mask |= 1
                     update_values.append(result[:32000])  # 32KB limit
                 
                 if error is not None:
-                    update_fields.append('last_error = ?')
+                    mask |= 2
                     update_values.append(error[:1000])  # 1KB limit for error
                 
                 if status == 'closed':
-                    update_fields.append('closed_at = ?')
+                    mask |= 4
                     update_values.append(now)
                 
                 if attempt > 0:
-                    update_fields.append('attempt_count = ?')
+                    mask |= 8
                     update_values.append(attempt)
                 
                 update_values.append(task_id)
+                cursor.execute(_UPDATE_TASK_SQL[mask], update_values)
                 
-                query = f"UPDATE tasks SET {', '.join(update_fields)} WHERE id = ?"
-                cursor.execute(query, update_values)
-                
-                # Log audit entry
-                cursor.execute('''
-                    INSERT INTO audit_log 
-                    (task_id, timestamp, operation, old_status, new_status, error_message)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                ''', (task_id, now, 'status_update', old_status, status, error))
-                
-                # Commit transaction
-                conn.commit()
+                audit = (task_id, now, 'status_update', old_status, status, error)
+                with self._audit_lock:
+                    if self._audit_closed:
+                        # Writer stopped by close(); record it in this transaction
+                        cursor.execute(_AUDIT_INSERT_SQL, audit)
+                        conn.commit()
+                    else:
+                        conn.commit()
+                        # Audit entry is written by the background flusher
+                        self._audit_queue.put(audit)
                 
                 logger.info(f"Updated task {task_id}: {old_status} → {status}")
                 return True
@@ -247,6 +493,41 @@ class BeadsDatabase:
                 logger.error(f"Failed to update task {task_id}: {e}")
                 return False
     
+    def _audit_writer(self) -> None:
+        """Drain the audit queue, one executemany transaction per batch"""
+        while True:
+            entry = self._audit_queue.get()
+            batch = [entry]
+            deadline = time.monotonic() + AUDIT_FLUSH_INTERVAL
+            while entry is not None and len(batch) < AUDIT_BATCH_SIZE:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    entry = self._audit_queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                batch.append(entry)
+            
+            rows = [row for row in batch if row is not None]
+            if rows:
+                try:
+                    with self._pool.get_rw() as conn:
+                        conn.executemany(_AUDIT_INSERT_SQL, rows)
+                        conn.commit()
+                except sqlite3.Error as e:
+                    logger.error(f"Failed to write {len(rows)} audit entries: {e}")
+            
+            for _ in batch:
+                self._audit_queue.task_done()
+            if len(rows) < len(batch):
+                return  # close() sentinel
+    
+    def flush_audit(self) -> None:
+        """Block until every queued audit entry has been written"""
+        if self._audit_thread.is_alive():
+            self._audit_queue.join()
+    
     def create_task(self, task_data: Dict[str, Any]) -> bool:
         """
         Create a new task (atomic).
@@ -257,39 +538,92 @@ class BeadsDatabase:
         Returns:
             True if successful
         """
-        now = datetime.now(timezone.utc).isoformat()
+        now = _now_iso()
         
-        with self._get_connection() as conn:
+        with self._pool.get_rw() as conn:
             cursor = conn.cursor()
             
             try:
-                cursor.execute('''
-                    INSERT INTO tasks
-                    (id, title, description, status, priority, issue_type, labels, created_at, updated_at)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    task_data.get('id'),
-                    task_data.get('title'),
-                    task_data.get('description'),
-                    task_data.get('status', 'open'),
-                    task_data.get('priority', 2),
-                    task_data.get('issue_type', 'task'),
-                    json.dumps(task_data.get('labels', [])),
-                    task_data.get('created_at', now),
-                    now,
-                ))
+                # OR IGNORE reports a duplicate id as rowcount 0 instead of raising
+                cursor.execute(_INSERT_OR_IGNORE_TASK_SQL, self._task_row(task_data, now))
                 conn.commit()
+                if cursor.rowcount != 1:
+                    logger.warning(f"Task {task_data.get('id')} already exists")
+                    return False
                 return True
-            except sqlite3.IntegrityError:
-                logger.warning(f"Task {task_data.get('id')} already exists")
-                return False
             except sqlite3.Error as e:
                 logger.error(f"Failed to create task: {e}")
                 return False
     
+    @staticmethod
+    def _task_row(task_data: Dict[str, Any], now: str) -> tuple:
+        """Parameters for _TASK_INSERT_COLUMNS from a task dictionary"""
+        return (
+            task_data.get('id'),
+            task_data.get('title'),
+            task_data.get('description'),
+            task_data.get('status', 'open'),
+            task_data.get('priority', 2),
+            task_data.get('issue_type', 'task'),
+            json.dumps(task_data.get('labels', [])),
+            task_data.get('created_at', now),
+            now,
+        )
+    
+    @staticmethod
+    def _bulk_insert_tasks(conn: sqlite3.Connection, rows: List[tuple]) -> int:
+        """
+        Insert task rows in one statement, skipping ids that already exist.
+        
+        Runs in the caller's transaction on the caller's connection.
+        
+        Returns:
+            Number of rows actually inserted
+        """
+        cursor = conn.executemany(_INSERT_OR_IGNORE_TASK_SQL, rows)
+        return cursor.rowcount
+    
+    def existing_ids(self, task_ids: Iterable[str]) -> Set[str]:
+        """
+        Which of task_ids are already in the database.
+        
+        Looked up with indexed IN queries, chunked to stay under SQLite's
+        bound-parameter limit.
+        """
+        ids = list(task_ids)
+        found = set()
+        with self._pool.get_ro() as conn:
+            for start in range(0, len(ids), MAX_SQL_PARAMS):
+                chunk = ids[start:start + MAX_SQL_PARAMS]
+                placeholders = ','.join('?' * len(chunk))
+                cursor = conn.execute(f'SELECT id FROM tasks WHERE id IN ({placeholders})', chunk)
+                found.update(row[0] for row in cursor)
+        return found
+    
+    def create_tasks(self, tasks: List[Dict[str, Any]]) -> int:
+        """
+        Create many tasks in one transaction, skipping ids that already exist.
+        
+        Returns:
+            Number of tasks created
+        """
+        now = _now_iso()
+        rows = [self._task_row(task, now) for task in tasks]
+        
+        with self._pool.get_rw() as conn:
+            try:
+                conn.execute('BEGIN IMMEDIATE')
+                created = self._bulk_insert_tasks(conn, rows)
+                conn.commit()
+                return created
+            except sqlite3.Error as e:
+                conn.rollback()
+                logger.error(f"Failed to create tasks: {e}")
+                return 0
+    
     def get_task(self, task_id: str) -> Optional[Dict[str, Any]]:
         """Get single task by ID"""
-        with self._get_connection() as conn:
+        with self._pool.get_ro() as conn:
             cursor = conn.cursor()
             cursor.execute('SELECT * FROM tasks WHERE id = ?', (task_id,))
             row = cursor.fetchone()
@@ -297,21 +631,10 @@ class BeadsDatabase:
     
     def get_stats(self) -> Dict[str, int]:
         """Get task statistics"""
-        with self._get_connection() as conn:
+        with self._pool.get_ro() as conn:
             cursor = conn.cursor()
-            cursor.execute('''
-                SELECT status, COUNT(*) as count
-                FROM tasks
-                GROUP BY status
-            ''')
-            
-            stats = {'open': 0, 'in_progress': 0, 'closed': 0, 'blocked': 0}
-            for row in cursor.fetchall():
-                status = row[0]
-                if status in stats:
-                    stats[status] = row[1]
-            
-            return stats
+            cursor.execute(_STATS_SQL)
+            return dict(zip(_STAT_STATUSES, cursor.fetchone()))
     
     def export_to_jsonl(self, output_path: Optional[Path] = None) -> Path:
         """
@@ -326,21 +649,32 @@ class BeadsDatabase:
         if output_path is None:
             output_path = self.beads_dir / '.beads/issues.jsonl'
         
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute('SELECT * FROM tasks')
+        with self._pool.get_ro() as conn:
+            # Stream rows straight from the cursor; nothing is materialized
+            cursor = conn.execute('SELECT * FROM tasks')
+            columns = [column[0] for column in cursor.description]
             
             # Write atomically with temp file
             temp_path = output_path.with_suffix('.jsonl.tmp')
+            exported = 0
             try:
-                with open(temp_path, 'w') as f:
-                    for row in cursor.fetchall():
-                        task = self._row_to_dict(row)
-                        f.write(json.dumps(task) + '\n')
+                with open(temp_path, 'wb') as f:
+                    for row in cursor:
+                        task = dict(zip(columns, row))
+                        labels = task.pop('labels')
+                        if labels:
+                            # Labels are stored as JSON already; splice them in
+                            # rather than decoding and re-encoding
+                            line = _dumps(task)[:-1] + b',"labels":' + labels.encode('utf-8') + b'}'
+                        else:
+                            task['labels'] = labels
+                            line = _dumps(task)
+                        f.write(line + b'\n')
+                        exported += 1
                 
                 # Atomic rename
-                temp_path.replace(output_path)
-                logger.info(f"Exported {cursor.rowcount} tasks to {output_path}")
+                os.replace(temp_path, output_path)
+                logger.info(f"Exported {exported} tasks to {output_path}")
                 return output_path
             except Exception as e:
                 if temp_path.exists():
@@ -352,38 +686,47 @@ class BeadsDatabase:
         """
         Import tasks from JSONL file.
         
+        All rows go in with one executemany in one transaction; tasks whose
+        id already exists are left untouched.
+        
         Args:
             input_path: Path to JSONL file
         
         Returns:
             Number of tasks imported
         """
-        imported = 0
+        now = _now_iso()
+        rows = []
         
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            
+        try:
+            with open(input_path) as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    
+                    try:
+                        rows.append(self._task_row(json.loads(line), now))
+                    except json.JSONDecodeError:
+                        logger.warning(f"Skipped invalid JSON line")
+                        continue
+        except OSError as e:
+            logger.error(f"Failed to import tasks: {e}")
+            return 0
+        
+        imported = 0
+        with self._pool.get_rw() as conn:
             try:
-                cursor.execute('BEGIN IMMEDIATE')
-                
-                with open(input_path) as f:
-                    for line in f:
-                        if not line.strip():
-                            continue
-                        
-                        try:
-                            task = json.loads(line)
-                            self.create_task(task)
-                            imported += 1
-                        except json.JSONDecodeError:
-                            logger.warning(f"Skipped invalid JSON line")
-                            continue
-                
+                conn.execute('BEGIN IMMEDIATE')
+                imported = self._bulk_insert_tasks(conn, rows)
                 conn.commit()
             except Exception as e:
                 conn.rollback()
                 logger.error(f"Failed to import tasks: {e}")
+                return 0
         
+        skipped = len(rows) - imported
+        if skipped:
+            logger.info(f"Skipped {skipped} tasks that already exist")
         return imported
     
     def get_audit_log(self, task_id: Optional[str] = None, limit: int = 100) -> List[Dict[str, Any]]:
@@ -397,7 +740,8 @@ class BeadsDatabase:
         Returns:
             List of audit log entries
         """
-        with self._get_connection() as conn:
+        self.flush_audit()
+        with self._pool.get_ro() as conn:
             cursor = conn.cursor()
             
             if task_id:
@@ -421,6 +765,12 @@ class BeadsDatabase:
         """Convert SQLite row to dictionary"""
         d = dict(row)
         
+        # Labels pre-split by the task_labels join
+        if 'label_list' in d:
+            label_list = d.pop('label_list')
+            d['labels'] = label_list.split(LABEL_SEP) if label_list else []
+            return d
+        
         # Parse JSON fields
         if d.get('labels'):
             try:
@@ -431,8 +781,13 @@ class BeadsDatabase:
         return d
     
     def close(self) -> None:
-        """Close database connections"""
-        pass  # Connections are context-managed
+        """Flush pending audit entries and close database connections"""
+        with self._audit_lock:
+            self._audit_closed = True
+            if self._audit_thread.is_alive():
+                self._audit_queue.put(None)
+        self._audit_thread.join()
+        self._pool.close()
 
 
 def migrate_jsonl_to_sqlite(beads_dir: Optional[Path] = None) -> int:
@@ -3,15 +3,27 @@
 Sync Obsidian tasks to Beads
 """
 
+import os
+import re
 import json
+import mmap
 import hashlib
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Set, Tuple
 from datetime import datetime, timezone
 import logging
 
+from beads_db import BeadsDatabase
+
 logger = logging.getLogger(__name__)
 
+# An obsidian-* bead id field in a raw issues.jsonl record
+_OBSIDIAN_ID_RE = re.compile(rb'"id":\s*"(obsidian-[^"]+)"')
+
+# Sidecar next to issues.jsonl: a "#dev:inode" header, then one
+# "task_id<TAB>offset" line per in-progress task
+IN_PROGRESS_INDEX = 'in_progress.index'
+
 
 class BeadsSync:
     """Sync Obsidian tasks to Beads"""
@@ -44,13 +56,33 @@ class BeadsSync:
             return {}
     
     @staticmethod
-    def save_sync_state(beads_path: Path, state: Dict[str, str]):
-        """Save sync mapping to file"""
+    def save_sync_state(beads_path: Path, state: Dict[str, str], pretty: bool = False):
+        """
+        Save sync mapping to file.
+        
+        Written compactly (indented with pretty=True) via a temp file and
+        os.replace, so a crash never leaves a truncated state file. Skipped
+        entirely when the file already holds the same bytes.
+        """
         sync_file = beads_path / BeadsSync.SYNC_FILE
         
         try:
-            with open(sync_file, 'w') as f:
-                json.dump(state, f, indent=2)
+            if pretty:
+                data = json.dumps(state, indent=2).encode('utf-8')
+            else:
+                data = json.dumps(state, separators=(',', ':')).encode('utf-8')
+            try:
+                if sync_file.read_bytes() == data:
+                    return
+            except FileNotFoundError:
+                pass
+            
+            temp_path = sync_file.with_suffix('.json.tmp')
+            with open(temp_path, 'wb') as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, sync_file)
         except Exception as e:
             logger.error(f"Failed to save sync state: {e}")
     
@@ -83,12 +115,14 @@ class BeadsSync:
         return labels
     
     @staticmethod
-    def create_bead(task: Dict[str, Any]) -> Dict[str, Any]:
-        """Create a Beads issue from an Obsidian task"""
+    def create_bead(task: Dict[str, Any], task_hash: Optional[str] = None) -> Dict[str, Any]:
+        """Create a Beads issue from an Obsidian task (pass task_hash if already known)"""
         now = datetime.now(timezone.utc).isoformat()
+        if task_hash is None:
+            task_hash = BeadsSync._task_hash(task)
         
         return {
-            'id': f"obsidian-{BeadsSync._task_hash(task)}",
+            'id': f"obsidian-{task_hash}",
             'title': task['description'],
             'description': f"{task['description']}\n\nSource: {task['file']}:{task['line']}",
             'status': 'open',
@@ -106,56 +140,80 @@ class BeadsSync:
         }
 
 
+def _existing_jsonl_ids(issues_file: Path, candidate_ids: Set[str]) -> Set[str]:
+    """
+    Which candidate ids already appear in issues.jsonl.
+    
+    Legacy path for trees that haven't migrated to SQLite: the mapped file is
+    scanned for obsidian-* id fields with one regex pass, so nothing is
+    JSON-decoded. Escaped quotes inside string values can't match the pattern.
+    """
+    with open(issues_file, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return set()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            found = {m.decode('utf-8') for m in _OBSIDIAN_ID_RE.findall(data)}
+    return found & candidate_ids
+
+
 def sync_obsidian_to_beads(tasks: List[Dict[str, Any]], beads_path: Path) -> int:
     """
     Sync Obsidian tasks to Beads
     
+    Writes to issues.jsonl, or to the SQLite database once the JSONL file
+    has been migrated away (see beads_db.migrate_jsonl_to_sqlite).
+    
     Returns: number of new Beads created
     """
     beads_path = Path(beads_path)
     issues_file = beads_path / '.beads/issues.jsonl'
+    db_file = beads_path / '.beads/beads.sqlite'
+    use_db = not issues_file.exists() and db_file.exists()
     
-    if not issues_file.exists():
+    if not issues_file.exists() and not use_db:
         logger.error(f"Beads issues file not found: {issues_file}")
         return 0
     
     # Load sync state
     sync_state = BeadsSync.load_sync_state(beads_path)
     
-    # Load existing beads
+    # Hash each task once; the hash is both the sync key and the bead id
+    hashes = [BeadsSync._task_hash(task) for task in tasks]
+    
+    # Candidate beads for unseen tasks, keyed by id
+    candidates: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+    for task, task_hash in zip(tasks, hashes):
+        # Check if already synced
+        if task_hash in sync_state:
+            continue
+        
+        bead = BeadsSync.create_bead(task, task_hash)
+        candidates.setdefault(bead['id'], (task_hash, bead))
+    
+    if not candidates:
+        return 0
+    
+    if use_db:
+        return _sync_to_database(beads_path, candidates, sync_state)
+    
+    # Don't create duplicate IDs
     existing_ids = set()
     try:
-        with open(issues_file) as f:
-            for line in f:
-                data = json.loads(line.strip())
-                existing_ids.add(data['id'])
+        existing_ids = _existing_jsonl_ids(issues_file, set(candidates))
     except Exception as e:
         logger.warning(f"Failed to load existing beads: {e}")
     
-    # Create new beads for unseen tasks
     new_beads = []
-    for task in tasks:
-        task_hash = BeadsSync._task_hash(task)
-        
-        # Check if already synced
-        if task_hash in sync_state:
-            continue
-        
-        bead = BeadsSync.create_bead(task)
-        
-        # Don't create duplicate IDs
-        if bead['id'] in existing_ids:
+    for bead_id, (task_hash, bead) in candidates.items():
+        if bead_id in existing_ids:
             continue
-        
         new_beads.append(bead)
-        sync_state[task_hash] = bead['id']
+        sync_state[task_hash] = bead_id
     
     # Append new beads to file
     if new_beads:
         try:
-            with open(issues_file, 'a') as f:
-                for bead in new_beads:
-                    f.write(json.dumps(bead) + '\n')
+            _append_jsonl(issues_file, new_beads)
             
             # Save sync state
             BeadsSync.save_sync_state(beads_path, sync_state)
@@ -169,6 +227,124 @@ def sync_obsidian_to_beads(tasks: List[Dict[str, Any]], beads_path: Path) -> int
     return 0
 
 
+def _append_jsonl(path: Path, records: List[Dict[str, Any]]) -> None:
+    """
+    Append records to a JSONL file in one O_APPEND write, then fsync.
+    
+    A single write keeps the batch from interleaving with lines appended by
+    other processes; an interrupted sync leaves at most one torn tail.
+    """
+    payload = ''.join(json.dumps(record) + '\n' for record in records).encode('utf-8')
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND)
+    try:
+        view = memoryview(payload)
+        while view:
+            view = view[os.write(fd, view):]
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _sync_to_database(
+    beads_path: Path,
+    candidates: Dict[str, Tuple[str, Dict[str, Any]]],
+    sync_state: Dict[str, str],
+) -> int:
+    """Insert candidate beads missing from the SQLite database in one transaction"""
+    db = BeadsDatabase(beads_path)
+    try:
+        existing_ids = db.existing_ids(candidates)
+        new = [(task_hash, bead) for bead_id, (task_hash, bead) in candidates.items()
+               if bead_id not in existing_ids]
+        if not new:
+            return 0
+        
+        created = db.create_tasks([bead for _, bead in new])
+        if not created:
+            return 0
+        for task_hash, bead in new:
+            sync_state[task_hash] = bead['id']
+        BeadsSync.save_sync_state(beads_path, sync_state)
+        
+        logger.info(f"Created {created} new Beads from Obsidian")
+        return created
+    finally:
+        db.close()
+
+
+def _in_progress_index_file(issues_file: Path) -> Path:
+    return Path(issues_file).with_name(IN_PROGRESS_INDEX)
+
+
+def _file_key(path: Path) -> str:
+    """Identity of issues.jsonl; changes whenever the file is replaced"""
+    st = os.stat(path)
+    return f"{st.st_dev}:{st.st_ino}"
+
+
+def load_in_progress_index(issues_file: Path) -> Optional[Dict[str, int]]:
+    """
+    In-progress task id -> byte offset of its record in issues.jsonl.
+
+    Returns None when the index is missing or unreadable, or was written
+    against an issues.jsonl that has since been replaced (compaction or a
+    full rewrite moves every offset).
+    """
+    try:
+        with open(_in_progress_index_file(issues_file)) as f:
+            if f.readline().rstrip('\n') != '#' + _file_key(issues_file):
+                return None
+            entries = {}
+            for line in f:
+                task_id, _, offset = line.rstrip('\n').partition('\t')
+                entries[task_id] = int(offset)
+            return entries
+    except (OSError, ValueError):
+        return None
+
+
+def write_in_progress_index(issues_file: Path, entries: Dict[str, int]) -> None:
+    """Replace the in-progress index (temp file + os.replace)"""
+    index_file = _in_progress_index_file(issues_file)
+    lines = ['#' + _file_key(issues_file)]
+    lines.extend(f"{task_id}\t{offset}" for task_id, offset in entries.items())
+    temp_path = index_file.with_suffix('.index.tmp')
+    temp_path.write_text('\n'.join(lines) + '\n')
+    os.replace(temp_path, index_file)
+
+
+def update_in_progress_index(
+    issues_file: Path, task_id: str, new_status: str, offset: Optional[int] = None
+) -> None:
+    """
+    Record a status transition in the in-progress index.
+
+    Call with the issues.jsonl lock held, after the record is written at
+    offset. A missing index is left missing, and one that can no longer be
+    kept exact (file replaced, offset unknown) is removed; either way the
+    next `ygg status` rebuilds it with a full scan.
+    """
+    index_file = _in_progress_index_file(issues_file)
+    try:
+        entries = load_in_progress_index(issues_file)
+        if entries is None or (new_status == 'in_progress' and offset is None):
+            index_file.unlink(missing_ok=True)
+            return
+        if new_status == 'in_progress':
+            if entries.get(task_id) == offset:
+                return
+            entries[task_id] = offset
+        elif entries.pop(task_id, None) is None:
+            return
+        write_in_progress_index(issues_file, entries)
+    except OSError as e:
+        logger.warning(f"Failed to update in-progress index: {e}")
+        try:
+            index_file.unlink(missing_ok=True)
+        except OSError:
+            pass
+
+
 def get_sync_state(beads_path: Path = None) -> Dict[str, Any]:
     """Get current sync state"""
     if not beads_path:
@@ -195,7 +371,10 @@ def get_beads_stats(beads_path: Path = None) -> Dict[str, int]:
     try:
         with open(issues_file) as f:
             for line in f:
-                data = json.loads(line.strip())
+                line = line.strip()
+                if not line:
+                    continue  # blank or tombstoned record
+                data = json.loads(line)
                 status = data.get('status', 'open')
                 if status in stats:
                     stats[status] += 1
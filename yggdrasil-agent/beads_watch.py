@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Change notification for .beads/issues.jsonl.
+
+The dispatchers wait on an event between passes instead of sleeping out
+their poll interval; this watcher fires it as soon as the file is written
+(new Beads from sync, status updates, compaction). Uses inotify through
+inotify_simple; without it start() returns False and the dispatchers keep
+their poll interval as the only wakeup.
+"""
+
+import sys
+import logging
+import threading
+from pathlib import Path
+from typing import Callable, Optional
+
+try:
+    import inotify_simple
+except ImportError:
+    inotify_simple = None
+
+logger = logging.getLogger(__name__)
+
+# How often the watcher thread checks for stop() (milliseconds)
+STOP_CHECK_MS = 500
+
+
+class BeadsFileWatcher:
+    """
+    Call on_change from a background thread whenever issues.jsonl changes.
+
+    The parent directory is watched rather than the file itself, so the
+    watch survives the file being replaced by rename (compaction, export).
+    """
+
+    def __init__(self, issues_file: Path, on_change: Callable[[], None]):
+        self.issues_file = Path(issues_file)
+        self.on_change = on_change
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> bool:
+        """Start watching; False if inotify is unavailable"""
+        if inotify_simple is None or not sys.platform.startswith('linux'):
+            return False
+
+        flags = inotify_simple.flags
+        mask = flags.CLOSE_WRITE | flags.MODIFY | flags.MOVED_TO | flags.CREATE
+        try:
+            inotify = inotify_simple.INotify()
+            inotify.add_watch(str(self.issues_file.parent), mask)
+        except OSError as e:
+            logger.warning(f"Cannot watch {self.issues_file}: {e}")
+            return False
+
+        self._thread = threading.Thread(
+            target=self._run, args=(inotify,), name='beads-watch', daemon=True
+        )
+        self._thread.start()
+        logger.info(f"Watching {self.issues_file} for new tasks")
+        return True
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=STOP_CHECK_MS / 1000 * 2)
+            self._thread = None
+
+    def _run(self, inotify) -> None:
+        name = self.issues_file.name
+        try:
+            while not self._stop.is_set():
+                # One read drains every queued event; a burst of appends
+                # becomes a single callback
+                events = inotify.read(timeout=STOP_CHECK_MS)
+                if any(event.name == name for event in events):
+                    self.on_change()
+        except Exception as e:
+            logger.warning(f"Beads watcher stopped: {e}")
+        finally:
+            inotify.close()
@@ -1,39 +1,49 @@
 """BeeAI agents for structured task processing using direct ChatModel calls."""
 
+import asyncio
 import logging
-from typing import Optional
+from operator import attrgetter
+from typing import List, Optional, Union
 
 from beeai_framework.backend import ChatModel, UserMessage, SystemMessage
 
+from llm_cache import ExactCache, SemanticCache
+
 logger = logging.getLogger(__name__)
 
+_get_text = attrgetter('text')
+
+# In-flight requests per process_batch call when the host limit is unknown
+DEFAULT_BATCH_CONCURRENCY = 4
+
+# Sampling temperatures at or below this count as deterministic for caching
+DETERMINISTIC_TEMPERATURE = 0.01
+
 
 def extract_text(result) -> str:
     """Extract text content from BeeAI ChatModelOutput."""
-    if not result.output or len(result.output) == 0:
+    if not result.output:
         return "No output generated"
     
-    msg = result.output[0]
+    content = result.output[0].content
     # content is a list of MessageTextContent objects
-    if hasattr(msg.content, '__iter__') and not isinstance(msg.content, str):
-        texts = []
-        for item in msg.content:
-            if hasattr(item, 'text'):
-                texts.append(item.text)
-        return ''.join(texts)
-    return str(msg.content)
+    if isinstance(content, (list, tuple)):
+        try:
+            return ''.join(map(_get_text, content))
+        except AttributeError:
+            # Mixed content (e.g. tool calls); keep only the text parts
+            return ''.join(item.text for item in content if hasattr(item, 'text'))
+    return str(content)
 
 
-class CodeGenerationAgent:
-    """Agent for code generation tasks using BeeAI ChatModel."""
-    
-    def __init__(self, local_llm: ChatModel, fallback_llm: Optional[ChatModel] = None):
-        self.local_llm = local_llm
-        self.fallback_llm = fallback_llm
-        
-    async def process(self, task_description: str, context: dict = None) -> str:
-        """Process a code generation task."""
-        system_prompt = """You are a skilled software engineer. Your task is to:
+def is_deterministic(llm) -> bool:
+    """Whether a ChatModel is configured for greedy decoding (temperature ~ 0)"""
+    temperature = getattr(getattr(llm, 'parameters', None), 'temperature', None)
+    return temperature is not None and temperature <= DETERMINISTIC_TEMPERATURE
+
+
+# System prompts; also part of each agent's response cache key
+_CODEGEN_PROMPT = """You are a skilled software engineer. Your task is to:
 1. Understand the requirements clearly
 2. Generate clean, well-structured code
 3. Include necessary imports and documentation
@@ -42,33 +52,7 @@ class CodeGenerationAgent:
 
 Provide complete, working code."""
 
-        messages = [
-            SystemMessage(content=system_prompt),
-            UserMessage(content=task_description)
-        ]
-        
-        try:
-            result = await self.local_llm.run(messages)
-            return extract_text(result)
-        except Exception as e:
-            logger.error(f"Code generation failed: {e}")
-            if self.fallback_llm:
-                logger.info("Retrying with fallback LLM")
-                result = await self.fallback_llm.run(messages)
-                return extract_text(result)
-            raise
-
-
-class TextProcessingAgent:
-    """Agent for text processing tasks using BeeAI ChatModel."""
-    
-    def __init__(self, local_llm: ChatModel, fallback_llm: Optional[ChatModel] = None):
-        self.local_llm = local_llm
-        self.fallback_llm = fallback_llm
-        
-    async def process(self, task_description: str, context: dict = None) -> str:
-        """Process a text processing task."""
-        system_prompt = """You are an expert at text analysis and processing. Your task is to:
+_TEXT_PROMPT = """You are an expert at text analysis and processing. Your task is to:
 1. Analyze the input thoroughly
 2. Provide clear and structured output
 3. Be comprehensive in your analysis
@@ -76,33 +60,7 @@ class TextProcessingAgent:
 
 Provide detailed and accurate analysis."""
 
-        messages = [
-            SystemMessage(content=system_prompt),
-            UserMessage(content=task_description)
-        ]
-        
-        try:
-            result = await self.local_llm.run(messages)
-            return extract_text(result)
-        except Exception as e:
-            logger.error(f"Text processing failed: {e}")
-            if self.fallback_llm:
-                logger.info("Retrying with fallback LLM")
-                result = await self.fallback_llm.run(messages)
-                return extract_text(result)
-            raise
-
-
-class ReasoningAgent:
-    """Agent for complex reasoning and planning tasks using BeeAI ChatModel."""
-    
-    def __init__(self, local_llm: ChatModel, fallback_llm: Optional[ChatModel] = None):
-        self.local_llm = local_llm
-        self.fallback_llm = fallback_llm
-        
-    async def process(self, task_description: str, context: dict = None) -> str:
-        """Process a reasoning task."""
-        system_prompt = """You are an expert reasoning system. Your task is to:
+_REASONING_PROMPT = """You are an expert reasoning system. Your task is to:
 1. Break down complex problems systematically
 2. Think through each step carefully
 3. Provide clear reasoning and explanations
@@ -111,18 +69,181 @@ class ReasoningAgent:
 
 Provide thorough analysis and clear conclusions."""
 
-        messages = [
-            SystemMessage(content=system_prompt),
+# System messages are immutable, so each agent reuses one instance per call
+_CODEGEN_SYSTEM = SystemMessage(content=_CODEGEN_PROMPT)
+_TEXT_SYSTEM = SystemMessage(content=_TEXT_PROMPT)
+_REASONING_SYSTEM = SystemMessage(content=_REASONING_PROMPT)
+
+
+class _ChatAgent:
+    """
+    Shared ChatModel plumbing: one system prompt, local LLM with fallback.
+    
+    Subclasses set SYSTEM_PROMPT, the SYSTEM_MESSAGE built from it, and
+    TASK_KIND (used in log messages and cache keys). When the local model
+    decodes deterministically, its answers are served from the optional
+    exact/semantic response caches on repeats; a sampling model is always
+    called, so retries get a fresh answer.
+    """
+    
+    SYSTEM_PROMPT = ""
+    SYSTEM_MESSAGE: SystemMessage = None
+    TASK_KIND = "Task"
+    
+    def __init__(
+        self,
+        local_llm: ChatModel,
+        fallback_llm: Optional[ChatModel] = None,
+        exact_cache: Optional[ExactCache] = None,
+        semantic_cache: Optional[SemanticCache] = None,
+        max_concurrency: Optional[int] = None,
+    ):
+        self.local_llm = local_llm
+        self.fallback_llm = fallback_llm
+        # Host's concurrency limit (HostConcurrencyConfig), used by process_batch
+        self.max_concurrency = max_concurrency or DEFAULT_BATCH_CONCURRENCY
+        if not is_deterministic(local_llm):
+            exact_cache = semantic_cache = None
+        self.exact_cache = exact_cache
+        self.semantic_cache = semantic_cache
+        # Cached answers are only valid for the model that produced them
+        model_id = getattr(local_llm, 'model_id', None) or type(local_llm).__name__
+        self._cache_scope = f"beeai:{self.TASK_KIND}:{model_id}"
+    
+    def _messages(self, task_description: str) -> list:
+        return [
+            self.SYSTEM_MESSAGE,
             UserMessage(content=task_description)
         ]
+    
+    async def _cache_get(self, task_description: str) -> Optional[str]:
+        """Cached local answer for this task, looked up off the event loop"""
+        if self.exact_cache is not None:
+            cached = await asyncio.to_thread(
+                self.exact_cache.get, self._cache_scope, task_description, self.SYSTEM_PROMPT
+            )
+            if cached is not None:
+                logger.info(f"{self.TASK_KIND}: exact cache hit")
+                return cached
+        if self.semantic_cache is not None:
+            cached = await asyncio.to_thread(
+                self.semantic_cache.lookup, self._cache_scope, task_description, self.SYSTEM_PROMPT
+            )
+            if cached is not None:
+                logger.info(f"{self.TASK_KIND}: semantic cache hit")
+                return cached
+        return None
+    
+    async def _cache_set(self, task_description: str, response: str) -> None:
+        if self.exact_cache is not None:
+            await asyncio.to_thread(
+                self.exact_cache.set, self._cache_scope, task_description, self.SYSTEM_PROMPT, response
+            )
+        if self.semantic_cache is not None:
+            await asyncio.to_thread(
+                self.semantic_cache.add, self._cache_scope, task_description, self.SYSTEM_PROMPT, response
+            )
+    
+    async def _run_fallback(self, messages: list, error: Exception) -> str:
+        logger.error(f"{self.TASK_KIND} failed: {error}")
+        if not self.fallback_llm:
+            raise error
+        logger.info("Retrying with fallback LLM")
+        result = await self.fallback_llm.run(messages)
+        return extract_text(result)
+    
+    async def process(self, task_description: str, context: dict = None) -> str:
+        """Process a single task, retrying on the fallback LLM if the local one fails."""
+        cached = await self._cache_get(task_description)
+        if cached is not None:
+            return cached
         
+        messages = self._messages(task_description)
         try:
             result = await self.local_llm.run(messages)
-            return extract_text(result)
         except Exception as e:
-            logger.error(f"Reasoning failed: {e}")
-            if self.fallback_llm:
-                logger.info("Retrying with fallback LLM")
-                result = await self.fallback_llm.run(messages)
-                return extract_text(result)
-            raise
+            return await self._run_fallback(messages, e)
+        output = extract_text(result)
+        await self._cache_set(task_description, output)
+        return output
+    
+    async def process_batch(
+        self,
+        tasks: List[str],
+        context: dict = None,
+        max_concurrency: Optional[int] = None,
+        return_exceptions: bool = True,
+    ) -> List[Union[str, Exception]]:
+        """
+        Process several tasks concurrently.
+        
+        At most max_concurrency model calls (local or fallback; default: the
+        host limit given at construction) are in flight at once, so a long
+        ready list cannot flood one host. Cached answers are returned without
+        a model call; failed tasks are retried on the fallback LLM. Results
+        come back in input order; a task that still fails yields its
+        exception, or raises with return_exceptions=False.
+        """
+        semaphore = asyncio.Semaphore(max_concurrency or self.max_concurrency)
+        
+        async def _bounded(coro):
+            async with semaphore:
+                return await coro
+        
+        outputs: List[Union[str, Exception]] = list(
+            await asyncio.gather(*(self._cache_get(t) for t in tasks))
+        )
+        pending = [i for i, output in enumerate(outputs) if output is None]
+        
+        batches = {i: self._messages(tasks[i]) for i in pending}
+        results = await asyncio.gather(
+            *(_bounded(self.local_llm.run(batches[i])) for i in pending),
+            return_exceptions=True,
+        )
+        
+        retries = []
+        fresh = []
+        for i, result in zip(pending, results):
+            if isinstance(result, Exception):
+                retries.append((i, result))
+            elif isinstance(result, BaseException):
+                raise result
+            else:
+                outputs[i] = extract_text(result)
+                fresh.append(i)
+        
+        if fresh:
+            await asyncio.gather(*(self._cache_set(tasks[i], outputs[i]) for i in fresh))
+        
+        if retries:
+            retried = await asyncio.gather(
+                *(_bounded(self._run_fallback(batches[i], error)) for i, error in retries),
+                return_exceptions=return_exceptions,
+            )
+            for (i, _), output in zip(retries, retried):
+                outputs[i] = output
+        return outputs
+
+
+class CodeGenerationAgent(_ChatAgent):
+    """Agent for code generation tasks using BeeAI ChatModel."""
+    
+    TASK_KIND = "Code generation"
+    SYSTEM_PROMPT = _CODEGEN_PROMPT
+    SYSTEM_MESSAGE = _CODEGEN_SYSTEM
+
+
+class TextProcessingAgent(_ChatAgent):
+    """Agent for text processing tasks using BeeAI ChatModel."""
+    
+    TASK_KIND = "Text processing"
+    SYSTEM_PROMPT = _TEXT_PROMPT
+    SYSTEM_MESSAGE = _TEXT_SYSTEM
+
+
+class ReasoningAgent(_ChatAgent):
+    """Agent for complex reasoning and planning tasks using BeeAI ChatModel."""
+    
+    TASK_KIND = "Reasoning"
+    SYSTEM_PROMPT = _REASONING_PROMPT
+    SYSTEM_MESSAGE = _REASONING_SYSTEM
@@ -9,18 +9,106 @@ Commands:
   loop      Run continuous task processing
 """
 
+import os
 import sys
+import json
+import mmap
+import fcntl
 import click
 from pathlib import Path
 
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
 # Add parent to path for imports
 sys.path.insert(0, str(Path(__file__).parent))
 
 from obsidian_parser import parse_obsidian_tasks
-from beads_sync import sync_obsidian_to_beads, get_sync_state
+from beads_sync import (
+    sync_obsidian_to_beads, get_sync_state, load_in_progress_index, write_in_progress_index,
+)
 from agent import YggdrasilAgent
 
 
+def _scan_in_progress(issues_file: Path) -> tuple:
+    """
+    In-progress records from issues.jsonl, and the offset of each.
+    
+    The file is mapped rather than read, and only lines mentioning
+    "in_progress" reach the JSON parser.
+    """
+    in_progress = []
+    offsets = {}
+    with open(issues_file, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return in_progress, offsets
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            while True:
+                offset = mm.tell()
+                line = mm.readline()
+                if not line:
+                    break
+                if b'"in_progress"' not in line:
+                    continue
+                try:
+                    data = _loads(line)
+                except ValueError:
+                    continue  # corrupted or tombstoned line
+                if data.get('status') == 'in_progress':
+                    in_progress.append(data)
+                    offsets[data.get('id')] = offset
+    return in_progress, offsets
+
+
+def _read_indexed(issues_file: Path, entries: dict):
+    """Records at the offsets in the in-progress index; None if any is stale"""
+    in_progress = []
+    with open(issues_file, 'rb') as f:
+        for task_id, offset in entries.items():
+            f.seek(offset)
+            try:
+                data = _loads(f.readline())
+            except ValueError:
+                return None
+            if data.get('id') != task_id or data.get('status') != 'in_progress':
+                return None
+            in_progress.append(data)
+    return in_progress
+
+
+def _read_in_progress(issues_file: Path) -> list:
+    """
+    In-progress records from issues.jsonl.
+    
+    Seeks straight to the records named by .beads/in_progress.index. When
+    the index is missing or stale the whole file is scanned instead and the
+    index rebuilt, under the Beads lock so no status update lands between
+    the scan and the write (skipped if a writer holds the lock).
+    """
+    entries = load_in_progress_index(issues_file)
+    if entries is not None:
+        in_progress = _read_indexed(issues_file, entries)
+        if in_progress is not None:
+            return in_progress
+    
+    with open(issues_file.with_name('issues.jsonl.lock'), 'a') as lock:
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            locked = True
+        except BlockingIOError:
+            locked = False
+        in_progress, offsets = _scan_in_progress(issues_file)
+        if locked:
+            try:
+                write_in_progress_index(issues_file, offsets)
+            except OSError:
+                pass
+    return in_progress
+
+
 @click.group()
 @click.version_option()
 def cli():
@@ -75,7 +163,6 @@ def status():
     from beads_sync import get_beads_stats
     from llm_router import check_llm_health
     from pathlib import Path
-    import json
     
     click.echo("=== Yggdrasil Status ===\n")
     
@@ -95,20 +182,8 @@ def status():
                 break
         
         if beads_path:
-            in_progress = []
             try:
-                with open(beads_path / '.beads/issues.jsonl') as f:
-                    for line in f:
-                        line = line.strip()
-                        if not line:
-                            continue
-                        try:
-                            data = json.loads(line)
-                            if data.get('status') == 'in_progress':
-                                in_progress.append(data)
-                        except json.JSONDecodeError:
-                            # Skip corrupted lines
-                            pass
+                in_progress = _read_in_progress(beads_path / '.beads/issues.jsonl')
             except Exception as e:
                 click.echo(f"  Error reading tasks: {e}", err=True)
                 in_progress = []
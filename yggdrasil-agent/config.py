@@ -12,6 +12,7 @@ Provides:
 
 import json
 import os
+import functools
 from pathlib import Path
 from typing import Optional, Dict, Any, List
 from enum import Enum
@@ -164,6 +165,47 @@ class YggdrasilConfig(BaseModel):
         return v
 
 
+# Top-level sections that can be validated on their own (load_config_section)
+SECTION_MODELS = {
+    'concurrency': HostConcurrencyConfig,
+    'retry': RetryConfig,
+    'observability': ObservabilityConfig,
+    'beeai': BeeAIConfig,
+}
+
+
+# ============================================================================
+# Parsed Config Cache
+# ============================================================================
+# Keyed by path and stat, so an edited file is re-read while repeat loads in
+# one process reuse the parsed YAML and the validated model.
+
+@functools.lru_cache(maxsize=8)
+def _read_yaml(path: str, mtime_ns: int, size: int) -> Dict[str, Any]:
+    """Parse a YAML config file (libyaml's C loader when available)"""
+    import yaml
+    
+    loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+    try:
+        with open(path, 'rb') as f:
+            return yaml.load(f, Loader=loader) or {}
+    except yaml.YAMLError as e:
+        raise ValueError(f"Failed to parse YAML config: {e}")
+
+
+@functools.lru_cache(maxsize=8)
+def _validated_config(path: str, mtime_ns: int, size: int, environment: str) -> YggdrasilConfig:
+    """Validated config for a file; callers share the instance, so don't mutate it"""
+    data = dict(_read_yaml(path, mtime_ns, size))
+    data['environment'] = environment
+    return YggdrasilConfig(**data)
+
+
+def _file_key(config_path: Path) -> tuple:
+    st = os.stat(config_path)
+    return str(Path(config_path).resolve()), st.st_mtime_ns, st.st_size
+
+
 # ============================================================================
 # Configuration Manager
 # ============================================================================
@@ -212,7 +254,21 @@ class ConfigManager:
             FileNotFoundError: If config file specified but not found
             ValidationError: If config is invalid
         """
-        # Determine config file to load
+        config_file = self.find_config_file(config_path)
+        
+        # Load config
+        if config_file:
+            return self._load_from_file(config_file)
+        else:
+            return self._load_defaults()
+    
+    def find_config_file(self, config_path: Optional[str] = None) -> Optional[Path]:
+        """
+        Resolve the config file load() would read (None for built-in defaults).
+        
+        Raises:
+            FileNotFoundError: If config file specified but not found
+        """
         config_file = None
         
         if config_path:
@@ -235,28 +291,13 @@ class ConfigManager:
                     config_file = path
                     break
         
-        # Load config
-        if config_file:
-            return self._load_from_file(config_file)
-        else:
-            return self._load_defaults()
+        return config_file
     
     def _load_from_file(self, config_path: Path) -> YggdrasilConfig:
-        """Load and validate config from YAML file"""
-        import yaml
-        
-        try:
-            with open(config_path) as f:
-                data = yaml.safe_load(f)
-        except yaml.YAMLError as e:
-            raise ValueError(f"Failed to parse YAML config: {e}")
-        
-        # Add environment to config
-        data['environment'] = self.environment
-        
+        """Load and validate config from YAML file (cached until the file changes)"""
         # Validate with Pydantic
         try:
-            config = YggdrasilConfig(**data)
+            config = _validated_config(*_file_key(config_path), self.environment)
             self._config_source = str(config_path)
             self.config = config
             return config
@@ -417,6 +458,43 @@ def load_config(
     return config
 
 
+def load_config_section(
+    section: str,
+    environment: Optional[str] = None,
+    config_path: Optional[str] = None,
+) -> Any:
+    """
+    Load one top-level config section.
+    
+    Sections in SECTION_MODELS are validated on their own, so commands that
+    only need e.g. concurrency limits skip validating hosts and routing.
+    Other sections come from the full (cached) config.
+    
+    Args:
+        section: Attribute name on YggdrasilConfig, e.g. 'concurrency'
+        environment: 'dev', 'staging', or 'prod'
+        config_path: Optional explicit path to config file
+    
+    Returns:
+        The section's config model (or value)
+    
+    Raises:
+        FileNotFoundError: If config file not found
+        ValueError: If the section is invalid
+    """
+    manager = ConfigManager(environment=environment)
+    model = SECTION_MODELS.get(section)
+    config_file = manager.find_config_file(config_path)
+    if model is None or config_file is None:
+        return getattr(manager.load(config_path=config_path), section)
+    
+    data = _read_yaml(*_file_key(config_file)).get(section) or {}
+    try:
+        return model(**data)
+    except ValidationError as e:
+        raise ValueError(f"Invalid {section} config in {config_file}:\n{e}")
+
+
 def validate_environment() -> Dict[str, str]:
     """
     Check environment is properly configured.
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Shared HTTP clients for LLM hosts.
+
+Health checks and generations go through one connection pool per process
+(sync) and per event loop (async), so repeat calls to a host reuse a
+keep-alive connection instead of paying TCP/TLS setup each time. HTTP/2 is
+negotiated when h2 is installed. Without httpx both getters return None
+and callers keep their urllib path.
+"""
+
+import asyncio
+import atexit
+import threading
+import weakref
+from typing import Optional
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+try:
+    import h2  # noqa: F401 - enables HTTP/2 in httpx
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Pool limits, shared by the sync and async clients
+MAX_CONNECTIONS = 64
+MAX_KEEPALIVE_CONNECTIONS = 16
+
+# Default timeouts (seconds); generations pass their own per request
+DEFAULT_TIMEOUT = 10.0
+CONNECT_TIMEOUT = 5.0
+
+_client = None
+_client_lock = threading.Lock()
+_async_clients = weakref.WeakKeyDictionary()  # event loop -> AsyncClient
+
+
+def _client_options() -> dict:
+    return {
+        'http2': HTTP2_AVAILABLE,
+        'limits': httpx.Limits(
+            max_connections=MAX_CONNECTIONS,
+            max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+        ),
+        'timeout': httpx.Timeout(DEFAULT_TIMEOUT, connect=CONNECT_TIMEOUT),
+    }
+
+
+def get_client() -> Optional['httpx.Client']:
+    """Process-wide httpx.Client (safe to share between threads)"""
+    global _client
+    if httpx is None:
+        return None
+    with _client_lock:
+        if _client is None or _client.is_closed:
+            _client = httpx.Client(**_client_options())
+        return _client
+
+
+def get_async_client() -> Optional['httpx.AsyncClient']:
+    """
+    httpx.AsyncClient for the running event loop.
+
+    AsyncClient connections belong to the loop that opened them, so each
+    loop gets its own pool; a CLI command's asyncio.run() never inherits
+    connections from a loop that has already closed.
+    """
+    if httpx is None:
+        return None
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(**_client_options())
+        _async_clients[loop] = client
+    return client
+
+
+async def aclose_async_client() -> None:
+    """Close the running loop's client (call before the loop shuts down)"""
+    client = _async_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+def close_client() -> None:
+    """Close the sync client (registered with atexit)"""
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+            _client = None
+
+
+atexit.register(close_client)
@@ -0,0 +1,391 @@
+#!/usr/bin/env python3
+"""
+Response caches for LLM generation.
+
+Provides:
+1. ExactCache - SHA-256 keyed LRU for byte-identical prompts (first tier)
+2. SemanticCache - embedding similarity lookup for paraphrased prompts
+3. NgramBloom - character 3-gram Bloom filter that lets the semantic
+   cache skip the embedding on obvious misses
+
+Both caches are opt-in, since generation samples at a non-zero temperature
+and a cached answer replaces a fresh sample: retries of a failed task would
+otherwise get the same answer back. The exact cache (YGGDRASIL_LLM_CACHE=1)
+persists through diskcache when it is installed. The semantic cache
+(YGGDRASIL_SEMANTIC_CACHE=1) also pulls in numpy and sentence-transformers
+and returns stored answers for prompts that are similar but not identical.
+"""
+
+import os
+import json
+import atexit
+import hashlib
+import logging
+import threading
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, List, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import diskcache
+except ImportError:
+    diskcache = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = Path.home() / '.cache/yggdrasil'
+
+
+def _scope_key(task_type: str, system: Optional[str]) -> str:
+    """Entries only match prompts with the same task type and system prompt"""
+    return hashlib.sha256(f"{task_type}\0{system or ''}".encode('utf-8')).hexdigest()[:16]
+
+
+def exact_key(task_type: str, prompt: str, system: Optional[str] = None) -> str:
+    """Stable cache key for a (task_type, system, prompt) request"""
+    payload = json.dumps({'t': task_type, 's': system, 'p': prompt}, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class ExactCache:
+    """
+    Exact-match response cache.
+
+    An in-memory LRU sits in front of an optional diskcache.Cache under
+    ~/.cache/yggdrasil/exact, so repeats survive restarts when diskcache
+    is available.
+    """
+
+    def __init__(self, cache_dir: Optional[Path] = None, max_entries: int = 1024, expire: int = 3600):
+        self.max_entries = max_entries
+        self.expire = expire
+        self._lock = threading.Lock()
+        self._memory: OrderedDict = OrderedDict()
+        self._disk = None
+        self.hits = 0
+        self.misses = 0
+
+        if diskcache is not None:
+            try:
+                path = Path(cache_dir) if cache_dir else DEFAULT_CACHE_DIR / 'exact'
+                self._disk = diskcache.Cache(str(path))
+            except Exception as e:
+                logger.warning(f"Persistent LLM cache unavailable: {e}")
+
+    def get(self, task_type: str, prompt: str, system: Optional[str] = None) -> Optional[str]:
+        """Return the cached response for an identical request"""
+        key = exact_key(task_type, prompt, system)
+        with self._lock:
+            value = self._memory.get(key)
+            if value is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return value
+        if self._disk is not None:
+            value = self._disk.get(key)
+            if value is not None:
+                self._remember(key, value)
+                self.hits += 1
+                return value
+        self.misses += 1
+        return None
+
+    def set(self, task_type: str, prompt: str, system: Optional[str], response: str) -> None:
+        """Store a response for an exact request"""
+        key = exact_key(task_type, prompt, system)
+        self._remember(key, response)
+        if self._disk is not None:
+            self._disk.set(key, response, expire=self.expire)
+
+    def _remember(self, key: str, value: str) -> None:
+        with self._lock:
+            self._memory[key] = value
+            self._memory.move_to_end(key)
+            if len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+
+class NgramBloom:
+    """
+    Bloom filter over character 3-grams of cached prompts.
+
+    A prompt that shares few 3-grams with anything cached cannot be a close
+    paraphrase, so lookup() can return early without embedding it. Entries
+    are never removed (evicted prompts just leave harmless false passes).
+    Hashing uses crc32 so the bit array is stable across processes.
+    """
+
+    def __init__(self, num_bits: int = 1 << 23, num_hashes: int = 4):
+        self.num_bits = num_bits
+        self.num_hashes = num_hashes
+        self.bits = bytearray(num_bits // 8)
+
+    @staticmethod
+    def ngrams(text: str, n: int = 3) -> set:
+        text = ' '.join(text.lower().split())
+        return {text[i:i + n].encode('utf-8') for i in range(len(text) - n + 1)}
+
+    def _positions(self, gram: bytes):
+        h1 = zlib.crc32(gram)
+        h2 = zlib.crc32(gram, 0x9E3779B9) | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, text: str) -> None:
+        bits = self.bits
+        for gram in self.ngrams(text):
+            for pos in self._positions(gram):
+                bits[pos >> 3] |= 1 << (pos & 7)
+
+    def overlap(self, text: str) -> float:
+        """Fraction of the text's 3-grams that are (probably) in the filter"""
+        grams = self.ngrams(text)
+        if not grams:
+            return 1.0
+        bits = self.bits
+        present = sum(
+            1 for gram in grams
+            if all(bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(gram))
+        )
+        return present / len(grams)
+
+
+class SemanticCache:
+    """
+    Cosine-similarity cache over prompt embeddings.
+
+    Embeddings are kept as a normalized (N x D) matrix, so a lookup is one
+    matrix-vector product. Entries are evicted least-recently-used once
+    max_entries is reached. State is persisted to semcache.npz plus a
+    parallel responses.jsonl in the cache directory.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[Path] = None,
+        threshold: float = 0.87,
+        max_entries: int = 2048,
+        model_name: str = 'sentence-transformers/all-MiniLM-L6-v2',
+        save_every: int = 32,
+        min_ngram_overlap: float = 0.5,
+    ):
+        self.cache_dir = Path(cache_dir) if cache_dir else DEFAULT_CACHE_DIR
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.model_name = model_name
+        self.save_every = save_every
+        self.min_ngram_overlap = min_ngram_overlap
+
+        self._lock = threading.Lock()
+        self._bloom = NgramBloom()
+        # False when entries were loaded without their filter (prefilter off)
+        self._bloom_complete = True
+        self._model = None
+        self._embeddings = None  # np.ndarray (N x D), rows L2-normalized
+        self._scopes: List[str] = []
+        self._responses: List[str] = []
+        self._last_used: List[int] = []
+        self._clock = 0
+        self._unsaved = 0
+        self.available = np is not None
+
+        if not self.available:
+            logger.warning("numpy not installed, semantic cache disabled")
+            return
+
+        self._load()
+        atexit.register(self.save)
+
+    @property
+    def _npz_path(self) -> Path:
+        return self.cache_dir / 'semcache.npz'
+
+    @property
+    def _responses_path(self) -> Path:
+        return self.cache_dir / 'responses.jsonl'
+
+    @property
+    def _bloom_path(self) -> Path:
+        return self.cache_dir / 'semcache.bloom'
+
+    def _get_model(self):
+        """Load the sentence-transformer on first use"""
+        if self._model is None:
+            try:
+                from sentence_transformers import SentenceTransformer
+                self._model = SentenceTransformer(self.model_name)
+            except Exception as e:
+                logger.warning(f"Semantic cache disabled, embedding model unavailable: {e}")
+                self.available = False
+        return self._model
+
+    def _embed(self, task_type: str, prompt: str, system: Optional[str]):
+        model = self._get_model()
+        if model is None:
+            return None
+        text = f"{task_type}\n{system or ''}\n{prompt}"
+        return model.encode(text, normalize_embeddings=True).astype(np.float32)
+
+    def _load(self) -> None:
+        """Load persisted embeddings and responses, if present and consistent"""
+        if not self._npz_path.exists() or not self._responses_path.exists():
+            return
+        try:
+            data = np.load(self._npz_path)
+            embeddings = data['embeddings']
+            scopes = [str(s) for s in data['scopes']]
+            with open(self._responses_path) as f:
+                responses = [json.loads(line) for line in f if line.strip()]
+            if not (len(embeddings) == len(scopes) == len(responses)):
+                logger.warning("Semantic cache files out of sync, starting empty")
+                return
+            self._embeddings = embeddings
+            self._scopes = scopes
+            self._responses = responses
+            self._last_used = list(range(len(responses)))
+            self._clock = len(responses)
+            logger.info(f"Loaded {len(responses)} semantic cache entries")
+
+            bloom = self._bloom_path.read_bytes() if self._bloom_path.exists() else b''
+            if len(bloom) == len(self._bloom.bits):
+                self._bloom.bits[:] = bloom
+            else:
+                self._bloom_complete = False
+        except Exception as e:
+            logger.warning(f"Failed to load semantic cache: {e}")
+
+    def save(self) -> None:
+        """Persist the cache to disk"""
+        with self._lock:
+            if not self._unsaved or self._embeddings is None:
+                return
+            try:
+                self.cache_dir.mkdir(parents=True, exist_ok=True)
+                np.savez(self._npz_path, embeddings=self._embeddings, scopes=np.array(self._scopes))
+                with open(self._responses_path, 'w') as f:
+                    for response in self._responses:
+                        f.write(json.dumps(response) + '\n')
+                if self._bloom_complete:
+                    self._bloom_path.write_bytes(self._bloom.bits)
+                self._unsaved = 0
+            except Exception as e:
+                logger.warning(f"Failed to save semantic cache: {e}")
+
+    def __len__(self) -> int:
+        return len(self._responses)
+
+    def lookup(self, task_type: str, prompt: str, system: Optional[str] = None) -> Optional[str]:
+        """Return a stored response for a sufficiently similar prompt"""
+        if not self.available or self._embeddings is None:
+            return None
+        # Cheap miss path: too few shared 3-grams to be a paraphrase
+        if self._bloom_complete and self._bloom.overlap(prompt) < self.min_ngram_overlap:
+            return None
+        query = self._embed(task_type, prompt, system)
+        if query is None:
+            return None
+
+        scope = _scope_key(task_type, system)
+        with self._lock:
+            scores = self._embeddings @ query
+            mask = np.fromiter((s == scope for s in self._scopes), dtype=bool, count=len(self._scopes))
+            scores[~mask] = -1.0
+            best = int(np.argmax(scores))
+            if scores[best] < self.threshold:
+                return None
+            self._clock += 1
+            self._last_used[best] = self._clock
+            logger.debug(f"Semantic cache hit (similarity {scores[best]:.3f})")
+            return self._responses[best]
+
+    def add(self, task_type: str, prompt: str, system: Optional[str], response: str) -> None:
+        """Store a response under the prompt's embedding"""
+        if not self.available:
+            return
+        embedding = self._embed(task_type, prompt, system)
+        if embedding is None:
+            return
+
+        with self._lock:
+            self._bloom.add(prompt)
+            self._clock += 1
+            if self._embeddings is None:
+                self._embeddings = embedding[np.newaxis, :]
+            elif len(self._responses) >= self.max_entries:
+                # Overwrite the least recently used slot
+                victim = min(range(len(self._last_used)), key=self._last_used.__getitem__)
+                self._embeddings[victim] = embedding
+                self._scopes[victim] = _scope_key(task_type, system)
+                self._responses[victim] = response
+                self._last_used[victim] = self._clock
+                self._unsaved += 1
+                return
+            else:
+                self._embeddings = np.vstack([self._embeddings, embedding])
+            self._scopes.append(_scope_key(task_type, system))
+            self._responses.append(response)
+            self._last_used.append(self._clock)
+            self._unsaved += 1
+            should_save = self._unsaved >= self.save_every
+
+        if should_save:
+            self.save()
+
+    def add_many(self, entries: List[Tuple[str, str, Optional[str], str]], batch_size: int = 64) -> None:
+        """
+        Store many responses with one batched encode.
+
+        Args:
+            entries: (task_type, prompt, system, response) tuples
+            batch_size: Encoder batch size
+        """
+        if not self.available or not entries:
+            return
+        model = self._get_model()
+        if model is None:
+            return
+
+        texts = [f"{t}\n{system or ''}\n{prompt}" for t, prompt, system, _ in entries]
+        embeddings = model.encode(
+            texts,
+            batch_size=batch_size,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+        ).astype(np.float32)
+
+        # Keep the most recent entries if the batch exceeds capacity
+        with self._lock:
+            room = self.max_entries - len(self._responses)
+            if room <= 0:
+                return
+            entries = entries[-room:]
+            embeddings = embeddings[-room:]
+            if self._embeddings is None:
+                self._embeddings = embeddings
+            else:
+                self._embeddings = np.vstack([self._embeddings, embeddings])
+            for task_type, prompt, system, response in entries:
+                self._bloom.add(prompt)
+                self._clock += 1
+                self._scopes.append(_scope_key(task_type, system))
+                self._responses.append(response)
+                self._last_used.append(self._clock)
+            self._unsaved += len(entries)
+
+        self.save()
+
+
+def exact_cache_enabled() -> bool:
+    """Exact caching is opt-in via YGGDRASIL_LLM_CACHE=1"""
+    return os.environ.get('YGGDRASIL_LLM_CACHE', '0') == '1'
+
+
+def semantic_cache_enabled() -> bool:
+    """Semantic caching is opt-in via YGGDRASIL_SEMANTIC_CACHE=1"""
+    return os.environ.get('YGGDRASIL_SEMANTIC_CACHE', '0') == '1'
@@ -7,12 +7,21 @@ using the sophisticated retry and circuit breaker capabilities from
 llm_client_improved while maintaining compatibility with existing code.
 """
 
+import asyncio
+import functools
 import logging
 import os
 from pathlib import Path
-from typing import Optional, List
+from concurrent.futures import Executor
+from typing import Optional, List, Dict, Any
 import json
 
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+from http_client import get_async_client, aclose_async_client
 from llm_router import LLMRouter, LLMHost
 from llm_client_improved import (
     LLMClient as ImprovedLLMClient,
@@ -23,6 +32,9 @@ from llm_client_improved import (
 
 logger = logging.getLogger(__name__)
 
+# Per-request timeout for local generations (the shared client defaults to 10s)
+GENERATE_TIMEOUT = httpx.Timeout(120, connect=10) if httpx else None
+
 
 class UnifiedLLMClient:
     """
@@ -35,10 +47,18 @@ class UnifiedLLMClient:
     - Circuit breaker to prevent cascading failures
     - Cloud fallback for when all local hosts fail
     - Unified interface for existing code
+    - Async generation (agenerate) over the shared pooled httpx.AsyncClient
     """
     
-    def __init__(self):
-        """Initialize unified LLM client"""
+    def __init__(self, executor: Optional[Executor] = None):
+        """
+        Initialize unified LLM client.
+        
+        Args:
+            executor: Pool that runs blocking generate() calls for agenerate()
+                when httpx is unavailable (default: the loop's executor)
+        """
+        self.executor = executor
         
         # Load router for host discovery
         self.router = LLMRouter()
@@ -180,12 +200,7 @@ class UnifiedLLMClient:
             import urllib.request
             
             url = f'{api_base}/completions'
-            payload = {
-                'model': model,
-                'prompt': prompt,
-                'max_tokens': 2048,
-                'temperature': 0.7,
-            }
+            payload = self._completion_payload(prompt, model)
             
             data = json.dumps(payload).encode('utf-8')
             req = urllib.request.Request(url, data=data, headers={'Content-Type': 'application/json'})
@@ -208,21 +223,14 @@ class UnifiedLLMClient:
             return None
         
         url = 'https://api.anthropic.com/v1/messages'
-        
-        messages = [{'role': 'user', 'content': prompt}]
-        payload = {
-            'model': self.cloud_model,
-            'max_tokens': 4096,
-            'messages': messages,
-        }
+        payload = self._anthropic_payload(prompt)
         
         try:
             import urllib.request
             data = json.dumps(payload).encode('utf-8')
             req = urllib.request.Request(url, data=data, headers={
                 'Content-Type': 'application/json',
-                'x-api-key': self.anthropic_key,
-                'anthropic-version': '2023-06-01'
+                **self._anthropic_headers(),
             })
             with urllib.request.urlopen(req, timeout=60) as resp:
                 result = json.loads(resp.read().decode())
@@ -231,6 +239,116 @@ class UnifiedLLMClient:
             logger.warning(f"Anthropic call failed: {e}")
             return None
 
+    
+    @staticmethod
+    def _completion_payload(prompt: str, model: str) -> Dict[str, Any]:
+        return {
+            'model': model,
+            'prompt': prompt,
+            'max_tokens': 2048,
+            'temperature': 0.7,
+        }
+    
+    def _anthropic_payload(self, prompt: str) -> Dict[str, Any]:
+        return {
+            'model': self.cloud_model,
+            'max_tokens': 4096,
+            'messages': [{'role': 'user', 'content': prompt}],
+        }
+    
+    def _anthropic_headers(self) -> Dict[str, str]:
+        return {
+            'x-api-key': self.anthropic_key,
+            'anthropic-version': '2023-06-01'
+        }
+    
+    def _get_async_client(self):
+        """The running loop's shared AsyncClient (see http_client)"""
+        return get_async_client()
+    
+    async def aclose(self) -> None:
+        """Close the running loop's shared async HTTP client"""
+        await aclose_async_client()
+    
+    async def agenerate(self, prompt: str, task_type: str = 'general', system: str = None) -> str:
+        """
+        Async version of generate().
+        
+        Requests go through the shared httpx.AsyncClient so many generations
+        can be in flight on one event loop. Without httpx, generate() runs
+        in a worker thread instead.
+        """
+        if httpx is None:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self.executor, functools.partial(self.generate, prompt, task_type, system)
+            )
+        
+        full_prompt = f"{system}\n\n{prompt}" if system else prompt
+        
+        host = self.router.get_host_for_task(task_type)
+        if host:
+            logger.info(f"Trying {host.name} ({host.model})...")
+            result = await self._acall_local(full_prompt, host.api_base, host.model)
+            if result:
+                logger.info(f"Local LLM ({host.name}) succeeded")
+                return result
+            
+            # Try backup
+            host.healthy = False
+            host = self.router.get_host_for_task(task_type)
+            if host:
+                logger.info(f"Trying backup: {host.name} ({host.model})...")
+                result = await self._acall_local(full_prompt, host.api_base, host.model)
+                if result:
+                    logger.info(f"Backup LLM ({host.name}) succeeded")
+                    return result
+        
+        # Fall back to cloud
+        logger.info("Falling back to cloud (Anthropic)...")
+        result = await self._acall_anthropic(full_prompt)
+        if result:
+            logger.info("Cloud LLM succeeded")
+            return result
+        
+        return "ERROR: All LLM hosts and cloud fallback failed"
+    
+    async def _acall_local(self, prompt: str, api_base: str, model: str) -> Optional[str]:
+        """Async call to an OpenAI-compatible completions endpoint"""
+        try:
+            resp = await self._get_async_client().post(
+                f'{api_base}/completions',
+                json=self._completion_payload(prompt, model),
+                timeout=GENERATE_TIMEOUT,
+            )
+            resp.raise_for_status()
+            choices = resp.json().get('choices', [])
+            if choices:
+                return choices[0].get('text', '')
+            return None
+        except Exception as e:
+            logger.warning(f"Call failed: {e}")
+            return None
+    
+    async def _acall_anthropic(self, prompt: str) -> Optional[str]:
+        """Async call to the Anthropic Messages API"""
+        if not self.anthropic_key:
+            logger.warning("No Anthropic API key available")
+            return None
+        
+        try:
+            resp = await self._get_async_client().post(
+                'https://api.anthropic.com/v1/messages',
+                json=self._anthropic_payload(prompt),
+                headers=self._anthropic_headers(),
+                timeout=60,
+            )
+            resp.raise_for_status()
+            return resp.json().get('content', [{}])[0].get('text', '')
+        except Exception as e:
+            logger.warning(f"Anthropic call failed: {e}")
+            return None
+
 
 # Export as drop-in replacement
 LLMClient = UnifiedLLMClient
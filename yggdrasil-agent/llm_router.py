@@ -7,6 +7,7 @@ Loads llm_hosts.yaml, checks availability, routes by task capability.
 
 import os
 import json
+import time
 import yaml
 import logging
 import urllib.request
@@ -15,6 +16,8 @@ from pathlib import Path
 from typing import Dict, List, Optional, Any
 from dataclasses import dataclass, field
 
+from http_client import get_client
+
 logger = logging.getLogger(__name__)
 
 
@@ -76,6 +79,10 @@ class LLMRouter:
         self.cloud_providers: List[CloudProvider] = []
         self.routing: Dict[str, List[str]] = {}
         
+        # task_type -> (expiry, ranked hosts); see get_hosts_for_task
+        self.route_cache_ttl = 5.0
+        self._route_cache: Dict[str, tuple] = {}
+        
     def load_config(self) -> bool:
         """Load configuration from YAML file"""
         if not self.config_path.exists():
@@ -119,12 +126,19 @@ class LLMRouter:
         """Check if a host is healthy"""
         try:
             url = f"{host.url}/models"
-            req = urllib.request.Request(url, headers={'Accept': 'application/json'})
-            with urllib.request.urlopen(req, timeout=timeout) as resp:
-                if resp.status == 200:
-                    host.healthy = True
-                    logger.debug(f"Host {host.name} is healthy")
-                    return True
+            headers = {'Accept': 'application/json'}
+            client = get_client()
+            if client is not None:
+                # Shared keep-alive pool: repeat checks skip connection setup
+                ok = client.get(url, headers=headers, timeout=timeout).status_code == 200
+            else:
+                req = urllib.request.Request(url, headers=headers)
+                with urllib.request.urlopen(req, timeout=timeout) as resp:
+                    ok = resp.status == 200
+            if ok:
+                host.healthy = True
+                logger.debug(f"Host {host.name} is healthy")
+                return True
         except Exception as e:
             logger.debug(f"Host {host.name} unhealthy: {e}")
         
@@ -132,13 +146,18 @@ class LLMRouter:
         return False
     
     def health_check(self, timeout: int = 5) -> Dict[str, bool]:
-        """Check all hosts and return health status"""
-        import time
+        """Check all hosts in parallel and return health status"""
+        from concurrent.futures import ThreadPoolExecutor
         
         results = {}
-        for host in self.hosts:
-            results[host.name] = self.check_host(host, timeout)
-            host.last_check = time.time()
+        self._route_cache.clear()
+        if self.hosts:
+            with ThreadPoolExecutor(max_workers=len(self.hosts)) as executor:
+                healthy = list(executor.map(lambda h: self.check_host(h, timeout), self.hosts))
+            now = time.time()
+            for host, ok in zip(self.hosts, healthy):
+                results[host.name] = ok
+                host.last_check = now
         
         healthy_count = sum(1 for h in self.hosts if h.healthy)
         logger.info(f"Health check: {healthy_count}/{len(self.hosts)} hosts healthy")
@@ -152,23 +171,49 @@ class LLMRouter:
             if h.healthy and capability in h.capabilities
         ]
     
-    def get_host_for_task(self, task_type: str) -> Optional[LLMHost]:
+    def get_hosts_for_task(self, task_type: str) -> List[LLMHost]:
         """
-        Get best host for a task type.
+        Get all healthy hosts for a task type, best first.
         
-        Uses routing config to map task_type -> capabilities,
-        then finds healthy host with matching capability.
+        Hosts are ordered by the routing config's capability order, then by
+        priority (lower = better). Each host appears once. Rankings are
+        cached per task type for route_cache_ttl seconds; a cached entry is
+        dropped as soon as one of its hosts is marked unhealthy.
         """
+        cached = self._route_cache.get(task_type)
+        if cached:
+            expires, hosts = cached
+            if time.monotonic() < expires and all(h.healthy for h in hosts):
+                return list(hosts)
+        
+        hosts = self._rank_hosts(task_type)
+        self._route_cache[task_type] = (time.monotonic() + self.route_cache_ttl, hosts)
+        return list(hosts)
+    
+    def _rank_hosts(self, task_type: str) -> List[LLMHost]:
+        """Rank healthy hosts for a task type (uncached)"""
         # Get required capabilities for this task type
         capabilities = self.routing.get(task_type, self.routing.get('default', []))
         
-        # Find healthy hosts with matching capabilities
+        ordered = []
+        seen = set()
         for cap in capabilities:
-            hosts = self.get_hosts_by_capability(cap)
-            if hosts:
-                # Sort by priority (lower = better)
-                hosts.sort(key=lambda h: h.priority)
-                return hosts[0]
+            for host in sorted(self.get_hosts_by_capability(cap), key=lambda h: h.priority):
+                if host.name not in seen:
+                    seen.add(host.name)
+                    ordered.append(host)
+        return ordered
+    
+    def get_host_for_task(self, task_type: str) -> Optional[LLMHost]:
+        """
+        Get best host for a task type.
+        
+        Uses routing config to map task_type -> capabilities,
+        then finds healthy host with matching capability.
+        """
+        hosts = self.get_hosts_for_task(task_type)
+        if hosts:
+            return hosts[0]
         
         # No local host available, return None (caller should use cloud)
         return None
@@ -240,9 +285,12 @@ def check_llm_health() -> Dict[str, Dict[str, Any]]:
     router = LLMRouter()
     router.load_config()
     
+    # All hosts at once rather than one timeout after another
+    checks = router.health_check()
+    
     results = {}
     for host in router.hosts:
-        healthy = router.check_host(host)
+        healthy = checks[host.name]
         results[host.name] = {
             'healthy': healthy,
             'status': 'online' if healthy else 'offline',
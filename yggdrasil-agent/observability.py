@@ -18,7 +18,8 @@ from dataclasses import dataclass, asdict, field
 from datetime import datetime, timezone
 from pathlib import Path
 from enum import Enum
-from logging.handlers import RotatingFileHandler
+from collections import deque
+from logging.handlers import MemoryHandler, RotatingFileHandler
 import asyncio
 
 T = TypeVar('T')
@@ -35,7 +36,7 @@ class TaskStatus(Enum):
     BLOCKED = "blocked"
 
 
-@dataclass
+@dataclass(slots=True)
 class TaskMetrics:
     """Metrics for a single task execution"""
     task_id: str
@@ -76,20 +77,29 @@ class TaskMetrics:
 class StructuredLogger:
     """JSON-structured logging with task context"""
     
-    def __init__(self, name: str, output_file: Optional[Path] = None, max_bytes: int = 10485760, backup_count: int = 5):
+    def __init__(
+        self,
+        name: str,
+        output_file: Optional[Path] = None,
+        max_bytes: int = 10485760,
+        backup_count: int = 5,
+        buffer_capacity: int = 256,
+    ):
         """
         Initialize structured logger.
-        
+
         Args:
             name: Logger name
             output_file: Path to output file
             max_bytes: Max size for rotating log file (default 10MB)
             backup_count: Number of backup files to keep (default 5)
+            buffer_capacity: Records buffered in memory before a write (default 256)
         """
         self.logger = logging.getLogger(name)
         self.output_file = output_file
         self.max_bytes = max_bytes
         self.backup_count = backup_count
+        self.buffer_capacity = buffer_capacity
         
         if output_file:
             # Ensure directory exists
@@ -98,7 +108,13 @@ class StructuredLogger:
             self._setup_rotating_handler(output_file)
     
     def _setup_rotating_handler(self, output_file: Path) -> None:
-        """Set up rotating file handler for the logger"""
+        """
+        Set up rotating file handler for the logger.
+
+        The file handler sits behind a MemoryHandler so records are written
+        in chunks instead of one write per event. Errors flush immediately,
+        and logging.shutdown() flushes whatever is left at exit.
+        """
         try:
             handler = RotatingFileHandler(
                 str(output_file),
@@ -107,7 +123,12 @@ class StructuredLogger:
             )
             formatter = logging.Formatter('%(message)s')
             handler.setFormatter(formatter)
-            self.logger.addHandler(handler)
+            buffered = MemoryHandler(
+                capacity=self.buffer_capacity,
+                flushLevel=logging.ERROR,
+                target=handler,
+            )
+            self.logger.addHandler(buffered)
         except Exception as e:
             logging.warning(f"Failed to set up rotating handler: {e}")
     
@@ -152,9 +173,14 @@ class StructuredLogger:
 class MetricsCollector:
     """Prometheus-style metrics collection"""
     
-    def __init__(self):
+    def __init__(self, max_duration_samples: int = 1000):
+        """
+        Args:
+            max_duration_samples: Recent durations kept per host for percentiles
+        """
+        self.max_duration_samples = max_duration_samples
         self.tasks_total = {}  # {host: {status: count}}
-        self.tasks_duration = {}  # {host: [durations]}
+        self.tasks_duration = {}  # {host: deque of recent durations}
         self.host_active = {}  # {host: count}
         self.token_usage = {}  # {host: {in: count, out: count}}
         self.start_time = time.time()
@@ -171,7 +197,7 @@ class MetricsCollector:
         
         # Duration tracking
         if host not in self.tasks_duration:
-            self.tasks_duration[host] = []
+            self.tasks_duration[host] = deque(maxlen=self.max_duration_samples)
         self.tasks_duration[host].append(metrics.duration_ms)
         
         # Token usage
@@ -436,7 +462,9 @@ class ErrorTracker:
             'timestamp': datetime.now(timezone.utc).isoformat(),
             'error_type': type(error).__name__,
             'error_message': str(error),
-            'traceback': traceback.format_exc(),
+            'traceback': ''.join(
+                traceback.format_exception(type(error), error, error.__traceback__)
+            ),
             'context': context or {},
         }
         
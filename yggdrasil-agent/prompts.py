@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Prompt templates shared by the threaded and async agents.
+
+Keeping each prompt in one place means both dispatchers send byte-identical
+text for the same task, which is what the exact-match response cache and
+Anthropic prompt caching key on.
+"""
+
+from string import Template
+from typing import Dict, Any
+
+CODE_PROMPT = Template("""Generate code for the following task:
+
+Title: $title
+Description: $description
+
+Provide complete, working code with comments. Include any necessary imports.""")
+
+TEXT_PROMPT = Template("$description")
+
+TEXT_TOOLS_PROMPT = Template("""Task: $title
+
+$description
+
+Use tools as needed to read input files or write results.""")
+
+SUMMARIZE_PROMPT = Template("""Please summarize the following:
+
+$description""")
+
+REASONING_PROMPT = Template("""Task: $title
+
+$description
+
+Please analyze this thoroughly and provide clear reasoning.""")
+
+REASONING_AGENT_PROMPT = Template("""Task: $title
+
+$description
+
+Provide thorough analysis and reasoning.""")
+
+GENERAL_PROMPT = Template("""Task: $title
+
+$description
+
+Please complete this task and provide a clear response.""")
+
+
+def render_prompt(template: Template, task: Dict[str, Any]) -> str:
+    """Fill a template from a Beads task's title and description"""
+    return template.substitute(
+        title=task.get('title', ''),
+        description=task.get('description', ''),
+    )